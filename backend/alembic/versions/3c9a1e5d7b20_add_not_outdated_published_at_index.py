@@ -0,0 +1,32 @@
+"""add partial published_at index for mark_outdated to vacancy
+
+Revision ID: 3c9a1e5d7b20
+Revises: 0fc186882d3b
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9a1e5d7b20'
+down_revision: Union[str, None] = '0fc186882d3b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # status IS DISTINCT FROM 'outdated' не использует индекс (status, published_at) - нужен частичный индекс
+    op.create_index(
+        "ix_vacancies_published_at_not_outdated",
+        "vacancies",
+        ["published_at"],
+        postgresql_where=sa.text("hh_id IS NOT NULL AND status IS DISTINCT FROM 'outdated'"),
+        if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_index("ix_vacancies_published_at_not_outdated", table_name="vacancies", if_exists=True)
@@ -0,0 +1,27 @@
+"""add hh.ru response validators to vacancy
+
+Revision ID: 7d2f4b8e1a63
+Revises: 3c9a1e5d7b20
+Create Date: 2026-10-17 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2f4b8e1a63'
+down_revision: Union[str, None] = '3c9a1e5d7b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.add_column("vacancies", sa.Column("hh_etag", sa.String(), nullable=True))
+    op.add_column("vacancies", sa.Column("hh_last_modified", sa.String(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("vacancies", "hh_last_modified")
+    op.drop_column("vacancies", "hh_etag")
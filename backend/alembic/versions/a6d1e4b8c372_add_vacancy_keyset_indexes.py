@@ -0,0 +1,37 @@
+"""add keyset pagination indexes to vacancy
+
+Revision ID: a6d1e4b8c372
+Revises: f3c7a9d2e5b1
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d1e4b8c372'
+down_revision: Union[str, None] = 'f3c7a9d2e5b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_vacancies_created_at_id",
+        "vacancies",
+        ["created_at", "id"],
+        if_not_exists=True
+    )
+    op.create_index(
+        "ix_vacancies_published_sort_id",
+        "vacancies",
+        [sa.text("coalesce(published_at, created_at)"), "id"],
+        if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_index("ix_vacancies_published_sort_id", table_name="vacancies", if_exists=True)
+    op.drop_index("ix_vacancies_created_at_id", table_name="vacancies", if_exists=True)
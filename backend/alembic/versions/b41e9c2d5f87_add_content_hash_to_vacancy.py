@@ -0,0 +1,25 @@
+"""add content_hash to vacancy
+
+Revision ID: b41e9c2d5f87
+Revises: 7d2f4b8e1a63
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b41e9c2d5f87'
+down_revision: Union[str, None] = '7d2f4b8e1a63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.add_column("vacancies", sa.Column("content_hash", sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    op.drop_column("vacancies", "content_hash")
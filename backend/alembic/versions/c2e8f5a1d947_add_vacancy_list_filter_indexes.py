@@ -0,0 +1,36 @@
+"""add list filter indexes to vacancy
+
+Revision ID: c2e8f5a1d947
+Revises: a6d1e4b8c372
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2e8f5a1d947'
+down_revision: Union[str, None] = 'a6d1e4b8c372'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_vacancies_status_created_at_id",
+        "vacancies",
+        ["status", "created_at", "id"],
+        if_not_exists=True
+    )
+    op.create_index(
+        "ix_vacancies_company_name_created_at_id",
+        "vacancies",
+        ["company_name", "created_at", "id"],
+        if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_index("ix_vacancies_company_name_created_at_id", table_name="vacancies", if_exists=True)
+    op.drop_index("ix_vacancies_status_created_at_id", table_name="vacancies", if_exists=True)
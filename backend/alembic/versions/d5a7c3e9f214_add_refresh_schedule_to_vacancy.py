@@ -0,0 +1,32 @@
+"""add refresh schedule columns to vacancy
+
+Revision ID: d5a7c3e9f214
+Revises: b41e9c2d5f87
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a7c3e9f214'
+down_revision: Union[str, None] = 'b41e9c2d5f87'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.add_column("vacancies", sa.Column("next_refresh_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column(
+        "vacancies",
+        sa.Column("unchanged_refreshes", sa.Integer(), nullable=False, server_default="0")
+    )
+    op.create_index("ix_vacancies_next_refresh_at", "vacancies", ["next_refresh_at"], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index("ix_vacancies_next_refresh_at", table_name="vacancies", if_exists=True)
+    op.drop_column("vacancies", "unchanged_refreshes")
+    op.drop_column("vacancies", "next_refresh_at")
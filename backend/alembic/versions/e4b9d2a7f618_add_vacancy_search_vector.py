@@ -0,0 +1,47 @@
+"""add full-text search vector to vacancy
+
+Revision ID: e4b9d2a7f618
+Revises: c2e8f5a1d947
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b9d2a7f618'
+down_revision: Union[str, None] = 'c2e8f5a1d947'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_VECTOR = " || ".join((
+    "setweight(to_tsvector('russian', coalesce(title, '')), 'A')",
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A')",
+    "setweight(to_tsvector('russian', coalesce(company_name, '')), 'B')",
+    "setweight(to_tsvector('english', coalesce(company_name, '')), 'B')",
+    "setweight(to_tsvector('russian', regexp_replace(coalesce(description, ''), '<[^>]*>', ' ', 'g')), 'C')",
+    "setweight(to_tsvector('english', regexp_replace(coalesce(description, ''), '<[^>]*>', ' ', 'g')), 'C')",
+))
+
+
+def upgrade():
+    op.add_column(
+        "vacancies",
+        sa.Column("search_vector", postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True))
+    )
+    op.create_index(
+        "ix_vacancies_search_vector",
+        "vacancies",
+        ["search_vector"],
+        postgresql_using="gin",
+        if_not_exists=True
+    )
+
+
+def downgrade():
+    op.drop_index("ix_vacancies_search_vector", table_name="vacancies", if_exists=True)
+    op.drop_column("vacancies", "search_vector")
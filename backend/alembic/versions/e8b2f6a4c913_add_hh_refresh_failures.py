@@ -0,0 +1,43 @@
+"""add hh refresh failures table
+
+Revision ID: e8b2f6a4c913
+Revises: d5a7c3e9f214
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b2f6a4c913'
+down_revision: Union[str, None] = 'd5a7c3e9f214'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table(
+        "hh_refresh_failures",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column(
+            "vacancy_id",
+            sa.Integer(),
+            sa.ForeignKey("vacancies.id", ondelete="CASCADE"),
+            nullable=False,
+            unique=True
+        ),
+        sa.Column("hh_id", sa.String(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("dead_lettered_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index("ix_hh_refresh_failures_hh_id", "hh_refresh_failures", ["hh_id"])
+
+
+def downgrade():
+    op.drop_index("ix_hh_refresh_failures_hh_id", table_name="hh_refresh_failures")
+    op.drop_table("hh_refresh_failures")
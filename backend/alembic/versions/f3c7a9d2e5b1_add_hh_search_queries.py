@@ -0,0 +1,34 @@
+"""add hh search queries table
+
+Revision ID: f3c7a9d2e5b1
+Revises: e8b2f6a4c913
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c7a9d2e5b1'
+down_revision: Union[str, None] = 'e8b2f6a4c913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table(
+        "hh_search_queries",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("name", sa.String(), nullable=False, unique=True),
+        sa.Column("params", sa.JSON(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column("watermark", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_crawled_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+
+
+def downgrade():
+    op.drop_table("hh_search_queries")
@@ -7,8 +7,18 @@ from app.db.models import User
 from app.db.unit_of_work import UnitOfWork, UnitOfWorkFactory
 from app.exceptions.auth_exceptions import InactiveUserException, TokenValidationException
 from app.services.auth_service import AuthService
+from app.services.hh_search_query_service import HHSearchQueryService
+from app.services.import_job_service import ImportJobService
+from app.services.refresh_job_service import RefreshJobService
+from app.repositories.import_job_repository import ImportJobRepository
+from app.repositories.refresh_job_repository import RefreshJobRepository
 from app.repositories.redis_repository import RedisRepository
+from app.repositories.vacancy_cache_repository import VacancyCacheRepository
+from app.services.vacancy_bulk_service import VacancyBulkService
 from app.services.vacancy_service import VacancyService
+from app.utils.circuit_breaker import HHCircuitBreaker
+from app.utils.hh_parser import HHParser
+from app.utils.task_lock import TaskLockMonitor
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
@@ -112,6 +122,44 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
     return current_user
 
 
-async def get_vacancy_service(uow: UnitOfWork = Depends(get_unit_of_work)) -> VacancyService:
+async def get_hh_parser() -> HHParser:
+    """ Функция-зависимость для получения общего клиента hh.ru """
+    return await HHParser.get_instance()
+
+
+def get_hh_circuit_breaker() -> HHCircuitBreaker:
+    """ Функция-зависимость для получения выключателя интеграции с hh.ru """
+    return HHCircuitBreaker()
+
+
+def get_task_lock_monitor() -> TaskLockMonitor:
+    """ Функция-зависимость для просмотра блокировок задач по расписанию """
+    return TaskLockMonitor()
+
+
+def get_refresh_job_service() -> RefreshJobService:
+    """ Функция-зависимость для фонового обновления вакансий с hh.ru """
+    return RefreshJobService(RefreshJobRepository())
+
+
+def get_import_job_service(uow: UnitOfWork = Depends(get_unit_of_work)) -> ImportJobService:
+    """ Функция-зависимость для массового импорта вакансий с hh.ru """
+    return ImportJobService(uow, ImportJobRepository())
+
+
+def get_vacancy_bulk_service(uow: UnitOfWork = Depends(get_unit_of_work)) -> VacancyBulkService:
+    """ Функция-зависимость для пакетных изменений вакансий """
+    return VacancyBulkService(uow, VacancyCacheRepository())
+
+
+def get_hh_search_query_service(uow: UnitOfWork = Depends(get_unit_of_work)) -> HHSearchQueryService:
+    """ Функция-зависимость для сохраненных поисковых запросов к hh.ru """
+    return HHSearchQueryService(uow)
+
+
+async def get_vacancy_service(
+    uow: UnitOfWork = Depends(get_unit_of_work),
+    hh_parser: HHParser = Depends(get_hh_parser)
+) -> VacancyService:
     """ Функция-зависимость для получения экземпляра VacancyService """
-    return VacancyService(uow)
+    return VacancyService(uow, hh_parser, VacancyCacheRepository())
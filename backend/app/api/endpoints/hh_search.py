@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends, status
+from typing import List
+
+from app.api.deps import get_current_active_user, get_hh_search_query_service
+from app.db.models import User
+from app.schemas.hh_search import HHSearchQuery, HHSearchQueryCreate
+from app.services.hh_search_query_service import HHSearchQueryService
+
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[HHSearchQuery])
+async def list_search_queries(
+    current_user: User = Depends(get_current_active_user),
+    query_service: HHSearchQueryService = Depends(get_hh_search_query_service)
+):
+    """
+    Сохраненные поисковые запросы к HH.ru с отметками последнего обхода
+    """
+    return await query_service.get_queries()
+
+
+@router.post("/", response_model=HHSearchQuery)
+async def create_search_query(
+    query_data: HHSearchQueryCreate,
+    current_user: User = Depends(get_current_active_user),
+    query_service: HHSearchQueryService = Depends(get_hh_search_query_service)
+):
+    """
+    Сохранение поискового запроса к HH.ru
+    - params - параметры поиска /vacancies (text, area, professional_role и т.п.)
+    """
+    return await query_service.create_query(query_data)
+
+
+@router.delete("/{query_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_search_query(
+    query_id: int,
+    current_user: User = Depends(get_current_active_user),
+    query_service: HHSearchQueryService = Depends(get_hh_search_query_service)
+):
+    """
+    Удаление поискового запроса
+    """
+    await query_service.delete_query(query_id)
@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List
+
+from app.api.deps import get_current_active_user, get_hh_circuit_breaker, get_task_lock_monitor
+from app.db.models import User
+from app.schemas.ops import CircuitBreakerStatus, TaskLockStatus
+from app.utils.circuit_breaker import HHCircuitBreaker
+from app.utils.task_lock import TaskLockMonitor
+
+
+router = APIRouter()
+
+
+@router.get("/hh-circuit", response_model=CircuitBreakerStatus)
+async def get_hh_circuit_status(
+    current_user: User = Depends(get_current_active_user),
+    circuit_breaker: HHCircuitBreaker = Depends(get_hh_circuit_breaker)
+):
+    """
+    Состояние выключателя интеграции с HH.ru: closed, open или half_open
+    """
+    state = await circuit_breaker.get_state()
+    if state is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Состояние выключателя недоступно: Redis не отвечает"
+        )
+    return state
+
+
+@router.get("/task-locks", response_model=List[TaskLockStatus])
+async def get_task_locks(
+    current_user: User = Depends(get_current_active_user),
+    monitor: TaskLockMonitor = Depends(get_task_lock_monitor)
+):
+    """
+    Выполняющиеся задачи по расписанию: владелец блокировки, время захвата и остаток аренды
+    """
+    return await monitor.get_status()
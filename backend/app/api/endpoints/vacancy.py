@@ -1,9 +1,21 @@
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Response, status
+from fastapi.responses import JSONResponse
 
+from app.services.import_job_service import ImportJobService
+from app.services.refresh_job_service import RefreshJobService
+from app.services.vacancy_bulk_service import VacancyBulkService
 from app.services.vacancy_service import VacancyService
-from app.api.deps import get_current_active_user, get_vacancy_service
+from app.api.deps import (
+    get_current_active_user, get_import_job_service, get_refresh_job_service, get_vacancy_bulk_service,
+    get_vacancy_service
+)
 from app.db.models import User
-from app.schemas.vacancy import VacancyCreate, Vacancy as VacancySchema, VacancyUpdate
+from app.schemas.job import (
+    HHImportRequest, ImportJobAccepted, ImportJobStatus, JobAccepted, RefreshJobStatus
+)
+from app.schemas.vacancy import (
+    VacancyBulkRequest, VacancyBulkResult, VacancyCreate, Vacancy as VacancySchema, VacancyUpdate
+)
 
 
 router = APIRouter()
@@ -63,13 +75,84 @@ async def delete_vacancy(
     return {"detail": "Вакансия успешно удалена"}
 
 
-@router.post("/refresh-from-hh/{vacancy_id}", response_model=VacancySchema)
+@router.post(
+    "/refresh-from-hh/{vacancy_id}",
+    response_model=VacancySchema,
+    responses={status.HTTP_202_ACCEPTED: {"model": JobAccepted}}
+)
 async def refresh_vacancy_from_hh(
     vacancy_id: int,
+    force: bool = False,
+    background: bool = False,
     current_user: User = Depends(get_current_active_user),
-    vacancy_service: VacancyService = Depends(get_vacancy_service)
+    vacancy_service: VacancyService = Depends(get_vacancy_service),
+    refresh_job_service: RefreshJobService = Depends(get_refresh_job_service)
 ):
     """
     Обновление данных вакансии из HH.ru по сохраненному hh_id
+    - force=true - запрос к HH.ru в обход кэша
+    - background=true - обновление ставится в очередь, ответ 202 с ID задачи
+    """
+    if background:
+        job_id = await refresh_job_service.enqueue(vacancy_id, force)
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"job_id": job_id, "status_url": f"/api/v1/vacancy/refresh-jobs/{job_id}"}
+        )
+    return await vacancy_service.refresh_vacancy_from_hh(vacancy_id, force)
+
+
+@router.get("/refresh-jobs/{job_id}", response_model=RefreshJobStatus)
+async def get_refresh_job_status(
+    job_id: str,
+    current_user: User = Depends(get_current_active_user),
+    refresh_job_service: RefreshJobService = Depends(get_refresh_job_service)
+):
+    """
+    Состояние фонового обновления вакансии: pending, started, success или failed
+    """
+    return await refresh_job_service.get_status(job_id)
+
+
+@router.post("/import-from-hh", response_model=ImportJobAccepted, status_code=status.HTTP_202_ACCEPTED)
+async def import_vacancies_from_hh(
+    import_request: HHImportRequest,
+    current_user: User = Depends(get_current_active_user),
+    import_job_service: ImportJobService = Depends(get_import_job_service)
+):
+    """
+    Массовый импорт вакансий с HH.ru по списку ID
+    Уже существующие вакансии пропускаются, остальные загружаются воркерами в фоне
+    """
+    job = await import_job_service.start_import(import_request.hh_ids)
+    return {**job, "status_url": f"/api/v1/vacancy/import-jobs/{job['job_id']}"}
+
+
+@router.get("/import-jobs/{job_id}", response_model=ImportJobStatus)
+async def get_import_job_status(
+    job_id: str,
+    current_user: User = Depends(get_current_active_user),
+    import_job_service: ImportJobService = Depends(get_import_job_service)
+):
+    """
+    Прогресс массового импорта: счетчики и ошибки по ID с HH.ru
+    """
+    return await import_job_service.get_status(job_id)
+
+
+@router.post("/bulk", response_model=VacancyBulkResult)
+async def bulk_vacancies(
+    bulk_request: VacancyBulkRequest,
+    response: Response,
+    current_user: User = Depends(get_current_active_user),
+    vacancy_bulk_service: VacancyBulkService = Depends(get_vacancy_bulk_service)
+):
+    """
+    Пакетное создание, обновление и удаление вакансий в одной транзакции
+    Результат - по каждой операции. В режиме atomic при любой ошибке ничего не фиксируется (409),
+    иначе успешные операции фиксируются, ошибочные пропускаются
     """
-    return await vacancy_service.refresh_vacancy_from_hh(vacancy_id)
+    result = await vacancy_bulk_service.apply(bulk_request)
+    if not result["committed"]:
+        response.status_code = status.HTTP_409_CONFLICT
+    return result
@@ -1,23 +1,101 @@
-from fastapi import Depends, APIRouter
-from typing import List
+from fastapi import Depends, APIRouter, HTTPException, Query, Response, status
+from typing import List, Optional
 
 from app.api.deps import get_current_active_user, get_vacancy_service
 from app.services.vacancy_service import VacancyService
 from app.db.models import User
-from app.schemas.vacancy import Vacancy as VacancySchema
+from app.schemas.vacancy import (
+    VacancyBatch, VacancyBatchRequest, VacancyListFilter, VacancySearchHit, VacancySummary
+)
+from app.utils.pagination import SortOrder, VacancySortKey
 
 
 router = APIRouter()
 
 
-@router.get("/list", response_model=List[VacancySchema])
+@router.get("/list", response_model=List[VacancySummary], response_model_exclude_unset=True)
 async def list_vacancies(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    sort: Optional[VacancySortKey] = None,
+    order: Optional[SortOrder] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    filters: VacancyListFilter = Depends(),
     current_user: User = Depends(get_current_active_user),
     vacancy_service: VacancyService = Depends(get_vacancy_service)
 ):
     """
     Получение списка вакансий
+    - skip/limit - постранично по смещению, в порядке id (order, по умолчанию asc)
+    - sort и/или cursor - постранично по курсору, по ключу sort (order, по умолчанию desc);
+      курсоры соседних страниц возвращаются в заголовках X-Next-Cursor и X-Prev-Cursor
+    - status, company_name - точное совпадение; published_from/published_to,
+      created_from/created_to - диапазоны дат [from, to)
+    - fields - поля через запятую (id возвращается всегда); описание в список не входит
     """
-    return await vacancy_service.get_vacancies_list(skip, limit)
+    selected = [name.strip() for name in fields.split(",") if name.strip()] if fields else None
+    if sort is None and cursor is None:
+        return await vacancy_service.get_vacancies_list(skip, limit, filters, order or SortOrder.ASC, selected)
+
+    vacancies, next_cursor, prev_cursor = await vacancy_service.get_vacancies_page(
+        limit, sort or VacancySortKey.CREATED_AT, cursor, filters, order or SortOrder.DESC, selected
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if prev_cursor:
+        response.headers["X-Prev-Cursor"] = prev_cursor
+    return vacancies
+
+
+@router.get("/search", response_model=List[VacancySearchHit])
+async def search_vacancies(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_active_user),
+    vacancy_service: VacancyService = Depends(get_vacancy_service)
+):
+    """
+    Полнотекстовый поиск вакансий по названию, компании и описанию
+    Поддерживается синтаксис websearch: "точная фраза", OR, -исключение.
+    Курсор следующей страницы возвращается в заголовке X-Next-Cursor
+    """
+    hits, next_cursor = await vacancy_service.search_vacancies(q, limit, cursor)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return hits
+
+
+@router.get("/batch", response_model=VacancyBatch)
+async def get_vacancies_batch(
+    ids: str = Query(..., description="ID вакансий через запятую"),
+    current_user: User = Depends(get_current_active_user),
+    vacancy_service: VacancyService = Depends(get_vacancy_service)
+):
+    """
+    Получение вакансий по списку ID одним запросом
+    Отсутствующие ID возвращаются в missing
+    """
+    try:
+        vacancy_ids = [int(value) for value in ids.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="ids must be a comma-separated list of integers"
+        )
+    return await vacancy_service.get_vacancies_batch(vacancy_ids)
+
+
+@router.post("/batch", response_model=VacancyBatch)
+async def post_vacancies_batch(
+    request: VacancyBatchRequest,
+    current_user: User = Depends(get_current_active_user),
+    vacancy_service: VacancyService = Depends(get_vacancy_service)
+):
+    """
+    Получение вакансий по списку ID в теле запроса (для длинных списков)
+    """
+    return await vacancy_service.get_vacancies_batch(request.ids)
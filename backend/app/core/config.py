@@ -21,6 +21,89 @@ class Settings:
     DB_ECHO_LOG: bool = os.getenv("DB_ECHO_LOG", "False").lower() == "true"
 
     HH_API_URL: str = os.getenv("HH_API_URL", "https://api.hh.ru/vacancies/")
+    HH_SEARCH_URL: str = os.getenv("HH_SEARCH_URL", "https://api.hh.ru/vacancies")
+
+    # Обход поиска hh.ru по сохраненным запросам
+    HH_SEARCH_CRON: str = os.getenv("HH_SEARCH_CRON", "*/30 * * * *")
+    HH_SEARCH_PER_PAGE: int = int(os.getenv("HH_SEARCH_PER_PAGE", "100"))
+    HH_SEARCH_MAX_PAGES: int = int(os.getenv("HH_SEARCH_MAX_PAGES", "20"))
+
+    # Пул соединений HTTP-клиента hh.ru
+    HH_POOL_LIMIT: int = int(os.getenv("HH_POOL_LIMIT", "100"))
+    HH_POOL_LIMIT_PER_HOST: int = int(os.getenv("HH_POOL_LIMIT_PER_HOST", "20"))
+    HH_DNS_CACHE_TTL: int = int(os.getenv("HH_DNS_CACHE_TTL", "300"))
+    HH_KEEPALIVE_TIMEOUT: float = float(os.getenv("HH_KEEPALIVE_TIMEOUT", "30"))
+    HH_CONNECT_TIMEOUT: float = float(os.getenv("HH_CONNECT_TIMEOUT", "5"))
+    HH_READ_TIMEOUT: float = float(os.getenv("HH_READ_TIMEOUT", "10"))
+    HH_TOTAL_TIMEOUT: float = float(os.getenv("HH_TOTAL_TIMEOUT", "15"))
+
+    # Фоновое обновление вакансий с hh.ru
+    HH_REFRESH_CONCURRENCY: int = int(os.getenv("HH_REFRESH_CONCURRENCY", "10"))
+    HH_REFRESH_BATCH_SIZE: int = int(os.getenv("HH_REFRESH_BATCH_SIZE", "100"))
+    HH_REFRESH_SHARDS: int = int(os.getenv("HH_REFRESH_SHARDS", "4"))
+    HH_REFRESH_SHARD_TIMEOUT: float = float(os.getenv("HH_REFRESH_SHARD_TIMEOUT", "14400"))
+
+    # Интервалы обновления вакансий с hh.ru (секунды) в зависимости от возраста и статуса
+    HH_REFRESH_TICK_CRON: str = os.getenv("HH_REFRESH_TICK_CRON", "*/15 * * * *")
+    HH_REFRESH_INTERVAL_FRESH: int = int(os.getenv("HH_REFRESH_INTERVAL_FRESH", "3600"))
+    HH_REFRESH_INTERVAL_ACTIVE: int = int(os.getenv("HH_REFRESH_INTERVAL_ACTIVE", "14400"))
+    HH_REFRESH_INTERVAL_OLD: int = int(os.getenv("HH_REFRESH_INTERVAL_OLD", "43200"))
+    HH_REFRESH_INTERVAL_OUTDATED: int = int(os.getenv("HH_REFRESH_INTERVAL_OUTDATED", "604800"))
+    HH_REFRESH_INTERVAL_MAX: int = int(os.getenv("HH_REFRESH_INTERVAL_MAX", "86400"))
+
+    # Повторы неудачных обновлений вакансий через брокер (секунды), затем - dead letter.
+    # Экспоненциальная задержка требует плагина RabbitMQ rabbitmq_delayed_message_exchange
+    # (RABBITMQ_DELAYED_MESSAGE_EXCHANGE=True): без него отложенные задачи ждут в одной TTL-очереди,
+    # и короткий повтор за длинным ждет его истечения. Поэтому без плагина задержка фиксированная -
+    # HH_REFRESH_RETRY_BACKOFF_BASE
+    HH_REFRESH_RETRY_MAX_ATTEMPTS: int = int(os.getenv("HH_REFRESH_RETRY_MAX_ATTEMPTS", "5"))
+    HH_REFRESH_RETRY_BACKOFF_BASE: int = int(os.getenv("HH_REFRESH_RETRY_BACKOFF_BASE", "60"))
+    HH_REFRESH_RETRY_BACKOFF_MAX: int = int(os.getenv("HH_REFRESH_RETRY_BACKOFF_MAX", "3600"))
+
+    # Массовый импорт вакансий с hh.ru: максимум ID в запросе и размер пакета на задачу
+    HH_IMPORT_MAX_IDS: int = int(os.getenv("HH_IMPORT_MAX_IDS", "10000"))
+    HH_IMPORT_BATCH_SIZE: int = int(os.getenv("HH_IMPORT_BATCH_SIZE", "100"))
+
+    # Пакетное получение вакансий по id: максимум id в запросе и время жизни кэша вакансий (0 - кэш отключен)
+    VACANCY_BATCH_MAX_IDS: int = int(os.getenv("VACANCY_BATCH_MAX_IDS", "500"))
+    VACANCY_CACHE_TTL: int = int(os.getenv("VACANCY_CACHE_TTL", "60"))
+
+    # Пакетные изменения вакансий: максимум операций в одном запросе
+    VACANCY_BULK_MAX_ITEMS: int = int(os.getenv("VACANCY_BULK_MAX_ITEMS", "1000"))
+
+    # Блокировка запусков задач по расписанию: срок аренды и период продления (секунды)
+    TASK_LOCK_TTL: int = int(os.getenv("TASK_LOCK_TTL", "60"))
+    TASK_LOCK_HEARTBEAT_INTERVAL: int = int(os.getenv("TASK_LOCK_HEARTBEAT_INTERVAL", "20"))
+
+    # Время хранения результатов задач taskiq в Redis
+    TASK_RESULT_TTL: int = int(os.getenv("TASK_RESULT_TTL", "86400"))
+
+    # Время жизни кэша разобранных вакансий hh.ru в Redis, 0 - кэш отключен
+    HH_CACHE_TTL: int = int(os.getenv("HH_CACHE_TTL", "300"))
+
+    # Объединение одновременных запросов одной вакансии к hh.ru
+    HH_SINGLE_FLIGHT_ENABLED: bool = os.getenv("HH_SINGLE_FLIGHT_ENABLED", "True").lower() == "true"
+    HH_SINGLE_FLIGHT_LOCK_TTL: float = float(os.getenv("HH_SINGLE_FLIGHT_LOCK_TTL", "30"))
+    HH_SINGLE_FLIGHT_RESULT_TTL: int = int(os.getenv("HH_SINGLE_FLIGHT_RESULT_TTL", "10"))
+    HH_SINGLE_FLIGHT_WAIT: float = float(os.getenv("HH_SINGLE_FLIGHT_WAIT", "20"))
+    HH_SINGLE_FLIGHT_POLL_INTERVAL: float = float(os.getenv("HH_SINGLE_FLIGHT_POLL_INTERVAL", "0.05"))
+
+    # Автоматический выключатель интеграции с hh.ru
+    HH_CIRCUIT_ENABLED: bool = os.getenv("HH_CIRCUIT_ENABLED", "True").lower() == "true"
+    HH_CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("HH_CIRCUIT_FAILURE_THRESHOLD", "5"))
+    HH_CIRCUIT_FAILURE_WINDOW: float = float(os.getenv("HH_CIRCUIT_FAILURE_WINDOW", "30"))
+    HH_CIRCUIT_RESET_TIMEOUT: float = float(os.getenv("HH_CIRCUIT_RESET_TIMEOUT", "30"))
+    HH_CIRCUIT_PROBE_TIMEOUT: float = float(os.getenv("HH_CIRCUIT_PROBE_TIMEOUT", "20"))
+
+    # Общий для всех процессов лимит запросов к hh.ru (token bucket в Redis)
+    HH_RATE_LIMIT_ENABLED: bool = os.getenv("HH_RATE_LIMIT_ENABLED", "True").lower() == "true"
+    HH_RATE_LIMIT_PER_SECOND: float = float(os.getenv("HH_RATE_LIMIT_PER_SECOND", "5"))
+    HH_RATE_LIMIT_BURST: int = int(os.getenv("HH_RATE_LIMIT_BURST", "10"))
+    HH_RATE_LIMIT_INTERACTIVE_RESERVE: float = float(os.getenv("HH_RATE_LIMIT_INTERACTIVE_RESERVE", "0.3"))
+    HH_RATE_LIMIT_MAX_WAIT: float = float(os.getenv("HH_RATE_LIMIT_MAX_WAIT", "5"))
+    HH_RATE_LIMIT_BACKOFF_BASE: float = float(os.getenv("HH_RATE_LIMIT_BACKOFF_BASE", "1"))
+    HH_RATE_LIMIT_BACKOFF_MAX: float = float(os.getenv("HH_RATE_LIMIT_BACKOFF_MAX", "60"))
+    HH_RATE_LIMIT_RETRIES: int = int(os.getenv("HH_RATE_LIMIT_RETRIES", "2"))
 
     # Предустановленный пользователь
     DEFAULT_USERNAME: str = os.getenv("DEFAULT_USERNAME", "")
@@ -33,6 +116,8 @@ class Settings:
     RABBITMQ_HOST: str = os.getenv("RABBITMQ_HOST", "localhost")
     RABBITMQ_PORT: str = os.getenv("RABBITMQ_PORT", "5672")
     RABBITMQ_VHOST: str = os.getenv("RABBITMQ_VHOST", "/")
+    # Отложенные задачи через плагин rabbitmq_delayed_message_exchange (должен быть включен на сервере)
+    RABBITMQ_DELAYED_MESSAGE_EXCHANGE: bool = os.getenv("RABBITMQ_DELAYED_MESSAGE_EXCHANGE", "False").lower() == "true"
 
     @property
     def RABBITMQ_URL(self) -> str:
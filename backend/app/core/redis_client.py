@@ -0,0 +1,23 @@
+from redis.asyncio import Redis
+
+from app.core.config import settings
+
+
+class RedisClient:
+    """
+    Общий асинхронный клиент Redis для координации между процессами
+    (ограничение частоты запросов к hh.ru и т.п.)
+    """
+    _client: Redis | None = None
+
+    @classmethod
+    def get_client(cls) -> Redis:
+        if cls._client is None:
+            cls._client = Redis.from_url(settings.REDIS_URL)
+        return cls._client
+
+    @classmethod
+    async def close(cls) -> None:
+        if cls._client is not None:
+            await cls._client.aclose()
+        cls._client = None
@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean
+from sqlalchemy import Column, Computed, Integer, String, Text, DateTime, Boolean, Index, ForeignKey, JSON, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 
 from app.db.base import Database
@@ -13,6 +15,19 @@ class User(Database._base):
     is_active = Column(Boolean, default=True)
 
 
+# Полнотекстовый индекс вакансии: название (A), компания (B) и текст описания без HTML-разметки (C),
+# в русской и английской конфигурациях
+VACANCY_SEARCH_VECTOR = " || ".join(
+    f"setweight(to_tsvector('{config}', {source}), '{weight}')"
+    for source, weight in (
+        ("coalesce(title, '')", "A"),
+        ("coalesce(company_name, '')", "B"),
+        ("regexp_replace(coalesce(description, ''), '<[^>]*>', ' ', 'g')", "C"),
+    )
+    for config in ("russian", "english")
+)
+
+
 class Vacancy(Database._base):
     __tablename__ = "vacancies"
 
@@ -27,3 +42,58 @@ class Vacancy(Database._base):
     description = Column(Text)
     hh_id = Column(String, unique=True, index=True, nullable=True) # ID вакансии на hh.ru
     published_at = Column(DateTime(timezone=True), nullable=True) # Дата публикации с hh.ru
+    hh_etag = Column(String, nullable=True) # ETag последнего ответа hh.ru
+    hh_last_modified = Column(String, nullable=True) # Last-Modified последнего ответа hh.ru
+    content_hash = Column(String(64), nullable=True) # SHA-256 нормализованного содержимого вакансии
+    next_refresh_at = Column(DateTime(timezone=True), nullable=True, index=True) # Плановое обновление с hh.ru
+    unchanged_refreshes = Column(Integer, nullable=False, default=0, server_default="0") # Обновлений без изменений подряд
+    search_vector = deferred(Column(TSVECTOR, Computed(VACANCY_SEARCH_VECTOR, persisted=True))) # Генерируется PostgreSQL
+
+    __table_args__ = (
+        # Вакансии с HH.ru, еще не помеченные устаревшими (mark_outdated): предикат совпадает с условием UPDATE
+        Index(
+            "ix_vacancies_published_at_not_outdated",
+            "published_at",
+            postgresql_where=text("hh_id IS NOT NULL AND status IS DISTINCT FROM 'outdated'")
+        ),
+        # Постраничная выдача по курсору: (created_at, id) и (coalesce(published_at, created_at), id)
+        Index("ix_vacancies_created_at_id", "created_at", "id"),
+        Index("ix_vacancies_published_sort_id", func.coalesce(published_at, created_at), id),
+        # Фильтры списка по статусу и компании с сортировкой по дате создания
+        Index("ix_vacancies_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_vacancies_company_name_created_at_id", "company_name", "created_at", "id"),
+        Index("ix_vacancies_search_vector", search_vector, postgresql_using="gin"),
+    )
+
+
+class HHRefreshFailure(Database._base):
+    """
+    Неудачные обновления вакансий с hh.ru
+    Запись с dead_lettered_at - вакансия отложена (dead letter) и не обновляется
+    """
+    __tablename__ = "hh_refresh_failures"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    vacancy_id = Column(Integer, ForeignKey("vacancies.id", ondelete="CASCADE"), nullable=False, unique=True)
+    hh_id = Column(String, nullable=False, index=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0") # Неудачных попыток подряд
+    last_error = Column(Text, nullable=True)
+    dead_lettered_at = Column(DateTime(timezone=True), nullable=True) # Когда вакансия отложена
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class HHSearchQuery(Database._base):
+    """
+    Сохраненный поисковый запрос к hh.ru для регулярного обхода
+    watermark - дата публикации самой свежей загруженной вакансии, следующий обход начинается с нее
+    """
+    __tablename__ = "hh_search_queries"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String, nullable=False, unique=True)
+    params = Column(JSON, nullable=False, default=dict) # Параметры поиска hh.ru: text, area и т.п.
+    is_active = Column(Boolean, nullable=False, default=True, server_default="true")
+    watermark = Column(DateTime(timezone=True), nullable=True)
+    last_crawled_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,5 +1,5 @@
 from typing import Dict, Type
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, AsyncSessionTransaction
 from sqlalchemy.orm import sessionmaker
 
 from app.repositories.base_repository import BaseRepository
@@ -33,6 +33,13 @@ class UnitOfWork:
             self._repositories[repository_class] = repository_class(self._session)
         return self._repositories[repository_class]
 
+    def savepoint(self) -> AsyncSessionTransaction:
+        """
+        Вложенная транзакция (SAVEPOINT) внутри текущей: async with uow.savepoint() откатывает
+        только свои изменения при исключении
+        """
+        return self.session.begin_nested()
+
     @property
     def session(self) -> AsyncSession:
         """ Получение текущей сессии """
@@ -0,0 +1,38 @@
+from typing import Optional
+
+
+class HHParserError(Exception):
+    """ Базовый класс для ошибок интеграции с hh.ru """
+    pass
+
+
+class HHRateLimitError(HHParserError):
+    """ Исключение для превышения лимита запросов к hh.ru """
+    def __init__(self, retry_after: Optional[float] = None):
+        self.retry_after = retry_after
+        super().__init__(
+            f"Превышен лимит запросов к HH.ru, повторите через {retry_after:.1f} с" if retry_after
+            else "Превышен лимит запросов к HH.ru"
+        )
+
+
+class HHLocalRateLimitError(HHRateLimitError):
+    """ Исключение локального ограничителя частоты: запрос к hh.ru не отправлялся """
+    pass
+
+
+class HHUnavailableError(HHParserError):
+    """ Исключение для недоступности hh.ru: сетевая ошибка, таймаут или ответ 5xx """
+    pass
+
+
+class HHVacancyNotFoundError(HHParserError):
+    """ Исключение для вакансии, удаленной с hh.ru или не существующей (404, 410) """
+    pass
+
+
+class HHCircuitOpenError(HHParserError):
+    """ Исключение для разомкнутого выключателя: запросы к hh.ru временно не выполняются """
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        super().__init__(f"HH.ru временно недоступен, повторите через {retry_after:.1f} с")
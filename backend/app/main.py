@@ -7,11 +7,14 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.endpoints import auth, vacancy, vacancy_list
+from app.api.endpoints import auth, hh_search, ops, vacancy, vacancy_list
 from app.core.config import settings
+from app.core.redis_client import RedisClient
 from app.core.security import PasswordHelper
 from app.db.base import Database
 from app.repositories.user_repository import UserRepository
+from app.tasks.taskiq import broker
+from app.utils.hh_parser import HHParser
 
 
 @asynccontextmanager
@@ -24,9 +27,22 @@ async def lifespan(app: FastAPI):
     # Дефолтный юзер
     await create_default_user()
 
+    # Общий keep-alive клиент hh.ru
+    await HHParser.startup()
+
+    # Брокер taskiq для постановки фоновых задач из API
+    if not broker.is_worker_process:
+        await broker.startup()
+
     # Подключение к БД
-    async with Database.get_engine().connect() as connection:
-        yield
+    try:
+        async with Database.get_engine().connect() as connection:
+            yield
+    finally:
+        if not broker.is_worker_process:
+            await broker.shutdown()
+        await HHParser.shutdown()
+        await RedisClient.close()
 
 
 async def create_default_user():
@@ -59,12 +75,15 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "X-Prev-Cursor"],
     )
 
     # Регистрация роутеров
     app.include_router(auth.router, prefix="/auth", tags=["authentication"])
     app.include_router(vacancy.router, prefix="/api/v1/vacancy", tags=["vacancies"])
     app.include_router(vacancy_list.router, prefix="/api/v1/vacancies", tags=["vacancies-list"])
+    app.include_router(hh_search.router, prefix="/api/v1/hh-search-queries", tags=["hh-search"])
+    app.include_router(ops.router, prefix="/api/v1/ops", tags=["ops"])
 
     @app.get("/")
     async def root():
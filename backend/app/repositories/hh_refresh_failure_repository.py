@@ -0,0 +1,101 @@
+from sqlalchemy import delete, case, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from typing import Optional, List, Dict, Any, Tuple
+
+from app.db.models import HHRefreshFailure
+from app.repositories.base_repository import BaseRepository
+
+
+class HHRefreshFailureRepository(BaseRepository):
+    """
+    Репозиторий неудачных обновлений вакансий с HH.ru
+    Одна запись на вакансию: счетчик попыток подряд и отметка dead letter
+    """
+    def __init__(self, session: AsyncSession):
+        super().__init__(session)
+
+    async def get_by_id(self, failure_id: int) -> Optional[HHRefreshFailure]:
+        """ Получение записи по ID """
+        stmt = select(HHRefreshFailure).where(HHRefreshFailure.id == failure_id)
+        result = await self._session.execute(stmt)
+        return result.scalars().first()
+
+    async def create(self, failure_data: Dict[str, Any]) -> HHRefreshFailure:
+        """ Создание записи """
+        failure = HHRefreshFailure(**failure_data)
+        self._session.add(failure)
+        await self._session.flush()
+        return failure
+
+    async def update(self, failure_id: int, update_data: Dict[str, Any]) -> Optional[HHRefreshFailure]:
+        """ Обновление записи """
+        failure = await self.get_by_id(failure_id)
+        if failure:
+            for key, value in update_data.items():
+                setattr(failure, key, value)
+            await self._session.flush()
+        return failure
+
+    async def delete(self, failure_id: int) -> bool:
+        """ Удаление записи по ID """
+        failure = await self.get_by_id(failure_id)
+        if failure:
+            await self._session.delete(failure)
+            await self._session.flush()
+            return True
+        return False
+
+    async def record_failure(
+        self,
+        vacancy_id: int,
+        hh_id: str,
+        error: str,
+        permanent: bool,
+        max_attempts: int
+    ) -> Tuple[int, bool]:
+        """
+        Регистрация неудачного обновления одним upsert
+        Вакансия откладывается (dead letter) при постоянной ошибке или после max_attempts попыток подряд.
+        Возвращает число попыток и признак dead letter
+        """
+        table = HHRefreshFailure.__table__
+        stmt = insert(table).values(
+            vacancy_id=vacancy_id,
+            hh_id=hh_id,
+            attempts=1,
+            last_error=error,
+            dead_lettered_at=func.now() if permanent or max_attempts <= 1 else None
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.vacancy_id],
+            set_={
+                "hh_id": stmt.excluded.hh_id,
+                "attempts": table.c.attempts + 1,
+                "last_error": stmt.excluded.last_error,
+                "dead_lettered_at": case(
+                    (table.c.dead_lettered_at.is_not(None), table.c.dead_lettered_at),
+                    (table.c.attempts + 1 >= max_attempts, func.now()),
+                    else_=stmt.excluded.dead_lettered_at
+                ),
+                "updated_at": func.now(),
+            }
+        ).returning(table.c.attempts, table.c.dead_lettered_at.is_not(None))
+        result = await self._session.execute(stmt)
+        attempts, dead = result.one()
+        return attempts, dead
+
+    async def clear(self, vacancy_ids: List[int]) -> int:
+        """ Удаление записей после успешного обновления вакансий (в том числе снятие dead letter) """
+        if not vacancy_ids:
+            return 0
+
+        stmt = (
+            delete(HHRefreshFailure)
+            .where(HHRefreshFailure.vacancy_id.in_(vacancy_ids))
+            .returning(HHRefreshFailure.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self._session.execute(stmt)
+        return len(result.all())
@@ -0,0 +1,70 @@
+from datetime import datetime
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from typing import Optional, List, Dict, Any
+
+from app.db.models import HHSearchQuery
+from app.repositories.base_repository import BaseRepository
+
+
+class HHSearchQueryRepository(BaseRepository):
+    """
+    Репозиторий сохраненных поисковых запросов к HH.ru
+    """
+    def __init__(self, session: AsyncSession):
+        super().__init__(session)
+
+    async def get_by_id(self, query_id: int) -> Optional[HHSearchQuery]:
+        """ Получение запроса по ID """
+        stmt = select(HHSearchQuery).where(HHSearchQuery.id == query_id)
+        result = await self._session.execute(stmt)
+        return result.scalars().first()
+
+    async def get_by_name(self, name: str) -> Optional[HHSearchQuery]:
+        """ Получение запроса по имени """
+        stmt = select(HHSearchQuery).where(HHSearchQuery.name == name)
+        result = await self._session.execute(stmt)
+        return result.scalars().first()
+
+    async def create(self, query_data: Dict[str, Any]) -> HHSearchQuery:
+        """ Создание запроса """
+        query = HHSearchQuery(**query_data)
+        self._session.add(query)
+        await self._session.flush()
+        return query
+
+    async def update(self, query_id: int, update_data: Dict[str, Any]) -> Optional[HHSearchQuery]:
+        """ Обновление запроса """
+        query = await self.get_by_id(query_id)
+        if query:
+            for key, value in update_data.items():
+                if hasattr(query, key) and value is not None:
+                    setattr(query, key, value)
+            await self._session.flush()
+        return query
+
+    async def delete(self, query_id: int) -> bool:
+        """ Удаление запроса по ID """
+        query = await self.get_by_id(query_id)
+        if query:
+            await self._session.delete(query)
+            await self._session.flush()
+            return True
+        return False
+
+    async def get_list(self, active_only: bool = False) -> List[HHSearchQuery]:
+        """ Получение списка запросов """
+        stmt = select(HHSearchQuery).order_by(HHSearchQuery.id)
+        if active_only:
+            stmt = stmt.where(HHSearchQuery.is_active.is_(True))
+        result = await self._session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def set_watermark(self, query_id: int, watermark: Optional[datetime], crawled_at: datetime) -> None:
+        """ Сохранение отметки обхода, watermark=None - отметка не меняется """
+        values = {"last_crawled_at": crawled_at}
+        if watermark is not None:
+            values["watermark"] = watermark
+        stmt = update(HHSearchQuery).where(HHSearchQuery.id == query_id).values(**values)
+        await self._session.execute(stmt)
@@ -0,0 +1,43 @@
+import json
+import logging
+from typing import Optional, Dict, Any
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis_client import RedisClient
+
+
+logger = logging.getLogger(__name__)
+
+
+class HHVacancyCacheRepository:
+    """
+    Кэш разобранных ответов hh.ru по hh_id в Redis
+    Недоступность Redis не ломает запросы - они идут в hh.ru
+    """
+    PREFIX = "hh_vacancy"
+
+    def __init__(self, redis_client: Optional[Redis] = None, ttl: Optional[int] = None):
+        self._redis = redis_client or RedisClient.get_client()
+        self._ttl = settings.HH_CACHE_TTL if ttl is None else ttl
+
+    async def get(self, hh_id: str) -> Optional[Dict[str, Any]]:
+        """ Закэшированный ответ hh.ru по вакансии """
+        try:
+            value = await self._redis.get(self._key(hh_id))
+        except RedisError as e:
+            logger.warning("HH vacancy cache unavailable: %s", e)
+            return None
+        return json.loads(value) if value is not None else None
+
+    async def set(self, hh_id: str, data: Dict[str, Any]) -> None:
+        """ Кэширование разобранного ответа hh.ru на HH_CACHE_TTL секунд """
+        try:
+            await self._redis.setex(self._key(hh_id), self._ttl, json.dumps(data))
+        except RedisError as e:
+            logger.warning("HH vacancy cache unavailable: %s", e)
+
+    def _key(self, hh_id: str) -> str:
+        return f"{self.PREFIX}:{hh_id}"
@@ -0,0 +1,61 @@
+from typing import Optional, Dict, Any
+
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.core.redis_client import RedisClient
+
+
+class ImportJobRepository:
+    """
+    Хранилище прогресса массового импорта вакансий с HH.ru в Redis
+    Пакеты импорта выполняются разными воркерами и накапливают счетчики атомарно
+    """
+    PREFIX = "hh_import"
+
+    def __init__(self, redis_client: Optional[Redis] = None):
+        self._redis = redis_client or RedisClient.get_client()
+
+    async def create(self, job_id: str, requested: int, duplicates: int, queued: int, batches: int) -> None:
+        """ Регистрация задачи импорта """
+        key = f"{self.PREFIX}:{job_id}"
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={
+                "requested": requested,
+                "duplicates": duplicates,
+                "queued": queued,
+                "batches": batches,
+                "batches_done": 0,
+                "imported": 0,
+                "failed": 0,
+            })
+            pipe.expire(key, settings.TASK_RESULT_TTL)
+            await pipe.execute()
+
+    async def record_batch(self, job_id: str, imported: int, duplicates: int, errors: Dict[str, str]) -> None:
+        """ Учет результата одного пакета: счетчики и ошибки по hh_id """
+        key = f"{self.PREFIX}:{job_id}"
+        errors_key = f"{key}:errors"
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hincrby(key, "imported", imported)
+            pipe.hincrby(key, "duplicates", duplicates)
+            pipe.hincrby(key, "failed", len(errors))
+            pipe.hincrby(key, "batches_done", 1)
+            if errors:
+                pipe.hset(errors_key, mapping=errors)
+                pipe.expire(errors_key, settings.TASK_RESULT_TTL)
+            await pipe.execute()
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """ Прогресс задачи импорта, None - задача не найдена или истекла """
+        key = f"{self.PREFIX}:{job_id}"
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.hgetall(key)
+            pipe.hgetall(f"{key}:errors")
+            counters, errors = await pipe.execute()
+        if not counters:
+            return None
+
+        job = {name.decode(): int(value) for name, value in counters.items()}
+        job["errors"] = {hh_id.decode(): error.decode() for hh_id, error in errors.items()}
+        return job
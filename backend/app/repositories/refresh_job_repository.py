@@ -0,0 +1,25 @@
+from typing import Optional
+
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.core.redis_client import RedisClient
+
+
+class RefreshJobRepository:
+    """
+    Реестр поставленных задач фонового обновления вакансий в Redis
+    Отличает задачу в очереди от неизвестного job_id; запись живет столько же, сколько результат задачи
+    """
+    PREFIX = "hh_refresh_job"
+
+    def __init__(self, redis_client: Optional[Redis] = None):
+        self._redis = redis_client or RedisClient.get_client()
+
+    async def create(self, job_id: str, vacancy_id: int) -> None:
+        """ Регистрация поставленной задачи """
+        await self._redis.set(f"{self.PREFIX}:{job_id}", vacancy_id, ex=settings.TASK_RESULT_TTL)
+
+    async def exists(self, job_id: str) -> bool:
+        """ Ставилась ли задача (и не истекла ли запись о ней) """
+        return bool(await self._redis.exists(f"{self.PREFIX}:{job_id}"))
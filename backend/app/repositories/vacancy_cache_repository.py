@@ -0,0 +1,68 @@
+import json
+import logging
+from typing import Optional, Dict, Any, Iterable, List
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis_client import RedisClient
+
+
+logger = logging.getLogger(__name__)
+
+
+class VacancyCacheRepository:
+    """
+    Кэш вакансий по id в Redis для пакетного получения
+    Недоступность Redis не ломает запросы - они идут в базу данных
+    """
+    PREFIX = "vacancy"
+
+    def __init__(self, redis_client: Optional[Redis] = None, ttl: Optional[int] = None):
+        self._redis = redis_client or RedisClient.get_client()
+        self._ttl = settings.VACANCY_CACHE_TTL if ttl is None else ttl
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl > 0
+
+    async def get_many(self, vacancy_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """ Закэшированные вакансии одним MGET, отсутствующие в кэше не возвращаются """
+        if not self.enabled or not vacancy_ids:
+            return {}
+        try:
+            values = await self._redis.mget([self._key(vacancy_id) for vacancy_id in vacancy_ids])
+        except RedisError as e:
+            logger.warning("Vacancy cache unavailable: %s", e)
+            return {}
+        return {
+            vacancy_id: json.loads(value)
+            for vacancy_id, value in zip(vacancy_ids, values)
+            if value is not None
+        }
+
+    async def set_many(self, vacancies: Dict[int, Dict[str, Any]]) -> None:
+        """ Кэширование вакансий (JSON-совместимые словари) одним конвейером """
+        if not self.enabled or not vacancies:
+            return
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for vacancy_id, data in vacancies.items():
+                    pipe.setex(self._key(vacancy_id), self._ttl, json.dumps(data))
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning("Vacancy cache unavailable: %s", e)
+
+    async def invalidate(self, vacancy_ids: Iterable[int]) -> None:
+        """ Удаление вакансий из кэша после изменения или удаления """
+        keys = [self._key(vacancy_id) for vacancy_id in vacancy_ids]
+        if not self.enabled or not keys:
+            return
+        try:
+            await self._redis.delete(*keys)
+        except RedisError as e:
+            logger.warning("Vacancy cache invalidation failed: %s", e)
+
+    def _key(self, vacancy_id: int) -> str:
+        return f"{self.PREFIX}:{vacancy_id}"
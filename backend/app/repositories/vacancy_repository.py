@@ -1,10 +1,18 @@
 from datetime import datetime, timezone
+from sqlalchemy import update, delete, func, bindparam, or_, exists, any_, cast, literal, literal_column, tuple_, Integer, String
+from sqlalchemy.dialects.postgresql import ARRAY, REAL, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Sequence, Set, Tuple
+from sqlalchemy.engine import Row
 
-from app.db.models import Vacancy
+from app.db.models import Vacancy, HHRefreshFailure
 from app.repositories.base_repository import BaseRepository
+from app.utils.pagination import Cursor, VacancySortKey
+
+
+# Фрагменты описания с подсвеченными совпадениями для результатов поиска
+SEARCH_HEADLINE_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxWords=35, MinWords=15, MaxFragments=2"
 
 
 class VacancyRepository(BaseRepository):
@@ -23,43 +31,402 @@ class VacancyRepository(BaseRepository):
         await self._session.flush()
         return vacancy
 
+    async def upsert(
+        self,
+        vacancy_data: Dict[str, Any],
+        update_existing: bool = True,
+        columns: Sequence[str] = ("id",)
+    ) -> Optional[Row]:
+        """
+        Создание вакансии или обновление существующей с тем же hh_id одним INSERT ... ON CONFLICT
+        Возвращает колонки columns затронутой строки. update_existing=False - существующая вакансия
+        не меняется и возвращается None. При обновлении строка не перезаписывается,
+        если content_hash не изменился (тоже None)
+        """
+        stmt = self._upsert_statement([vacancy_data], update_existing).returning(
+            *[getattr(Vacancy, name) for name in columns]
+        )
+        result = await self._session.execute(stmt)
+        return result.first()
+
+    async def bulk_upsert(self, rows: List[Dict[str, Any]], update_existing: bool = True) -> List[Tuple[str, bool]]:
+        """
+        Пакетный upsert вакансий по hh_id одним INSERT ... ON CONFLICT
+        У всех rows должен быть одинаковый набор ключей. Возвращает (hh_id, создана ли)
+        для затронутых строк; пропущенные (существующие или без изменений) не возвращаются
+        """
+        if not rows:
+            return []
+
+        # Один hh_id не может обновляться дважды в одном INSERT - последняя версия выигрывает
+        rows = list({row["hh_id"]: row for row in rows}.values())
+        stmt = self._upsert_statement(rows, update_existing).returning(
+            Vacancy.hh_id,
+            literal_column("xmax = 0").label("inserted")
+        )
+        result = await self._session.execute(stmt)
+        return [(row.hh_id, row.inserted) for row in result]
+
+    @staticmethod
+    def _upsert_statement(rows: List[Dict[str, Any]], update_existing: bool):
+        stmt = insert(Vacancy).values(rows)
+        if not update_existing:
+            return stmt.on_conflict_do_nothing(index_elements=[Vacancy.hh_id])
+
+        columns = [name for name in rows[0] if name not in ("id", "hh_id", "created_at", "updated_at")]
+        return stmt.on_conflict_do_update(
+            index_elements=[Vacancy.hh_id],
+            set_={**{name: stmt.excluded[name] for name in columns}, "updated_at": func.now()},
+            where=Vacancy.content_hash.is_distinct_from(stmt.excluded.content_hash) if "content_hash" in columns else None
+        )
+
+    async def bulk_create(self, rows: List[Dict[str, Any]]) -> List[int]:
+        """
+        Пакетное создание вакансий одним INSERT ... RETURNING id
+        У всех rows должен быть одинаковый набор ключей; ID возвращаются в порядке rows
+        """
+        if not rows:
+            return []
+
+        stmt = insert(Vacancy).returning(Vacancy.id, sort_by_parameter_order=True)
+        result = await self._session.execute(stmt, rows)
+        return list(result.scalars().all())
+
     async def get_by_id(self, vacancy_id: int) -> Optional[Vacancy]:
         """ Получение вакансии по ID """
         stmt = select(Vacancy).where(Vacancy.id == vacancy_id)
         result = await self._session.execute(stmt)
         return result.scalars().first()
 
+    async def get_by_ids(self, vacancy_ids: List[int]) -> List[Vacancy]:
+        """ Получение вакансий по списку ID одним запросом (WHERE id = ANY), порядок не гарантируется """
+        if not vacancy_ids:
+            return []
+
+        stmt = select(Vacancy).where(Vacancy.id == any_(literal(vacancy_ids, ARRAY(Integer))))
+        result = await self._session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def get_existing_ids(self, vacancy_ids: List[int]) -> Set[int]:
+        """ Какие из vacancy_ids есть в базе, одним запросом без загрузки вакансий """
+        if not vacancy_ids:
+            return set()
+
+        stmt = select(Vacancy.id).where(Vacancy.id == any_(literal(vacancy_ids, ARRAY(Integer))))
+        result = await self._session.execute(stmt)
+        return set(result.scalars().all())
+
     async def get_by_hh_id(self, hh_id: str) -> Optional[Vacancy]:
         """ Получение вакансии по ID с HH.ru """
         stmt = select(Vacancy).where(Vacancy.hh_id == hh_id)
         result = await self._session.execute(stmt)
         return result.scalars().first()
 
-    async def update(self, vacancy_id: int, update_data: Dict[str, Any]) -> Optional[Vacancy]:
-        """ Обновление данных вакансии """
-        vacancy = await self.get_by_id(vacancy_id)
-        if vacancy:
-            # Дата обновления
-            update_data["updated_at"] = datetime.now(timezone.utc)
+    async def get_existing_hh_ids(self, hh_ids: List[str]) -> Set[str]:
+        """ Какие из hh_ids уже есть в базе, одним запросом """
+        if not hh_ids:
+            return set()
 
-            for key, value in update_data.items():
-                if hasattr(vacancy, key) and value is not None:
-                    setattr(vacancy, key, value)
+        stmt = select(Vacancy.hh_id).where(Vacancy.hh_id == any_(literal(hh_ids, ARRAY(String))))
+        result = await self._session.execute(stmt)
+        return set(result.scalars().all())
 
-            await self._session.flush()
-        return vacancy
+    async def get_hh_link(self, vacancy_id: int) -> Optional[Row]:
+        """ hh_id вакансии без загрузки остальных колонок, None - вакансия не найдена """
+        stmt = select(Vacancy.id, Vacancy.hh_id).where(Vacancy.id == vacancy_id)
+        result = await self._session.execute(stmt)
+        return result.first()
+
+    async def update(
+        self,
+        vacancy_id: int,
+        update_data: Dict[str, Any],
+        skip_unchanged: bool = False,
+        reset: Sequence[str] = ()
+    ) -> Optional[Vacancy]:
+        """
+        Обновление данных вакансии одним UPDATE ... RETURNING
+        Поля со значением None не меняются, колонки из reset (если не переданы в update_data) сбрасываются в NULL.
+        None - вакансия не найдена, либо (skip_unchanged=True) все значения совпадают с текущими
+        """
+        values = {key: value for key, value in update_data.items() if hasattr(Vacancy, key) and value is not None}
+        if skip_unchanged and not values:
+            return None
+
+        stmt = update(Vacancy).where(Vacancy.id == vacancy_id)
+        if skip_unchanged:
+            stmt = stmt.where(or_(*(getattr(Vacancy, key).is_distinct_from(value) for key, value in values.items())))
+
+        stmt = (
+            stmt.values(**values, **{key: None for key in reset if key not in values}, updated_at=datetime.now(timezone.utc))
+            .returning(Vacancy)
+            # Уже загруженный в сессию объект получает значения из RETURNING
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        result = await self._session.execute(stmt)
+        return result.scalars().first()
+
+    async def bulk_update(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Пакетное обновление вакансий по ID одним executemany
+        Каждый элемент rows должен содержать ключ id
+        """
+        if not rows:
+            return 0
+
+        now = datetime.now(timezone.utc)
+        await self._session.execute(update(Vacancy), [{**row, "updated_at": now} for row in rows])
+        return len(rows)
+
+    async def bulk_update_schedule(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Пакетная запись расписания обновления с HH.ru (next_refresh_at, unchanged_refreshes)
+        и валидаторов последнего ответа (hh_etag, hh_last_modified).
+        Содержимое вакансии не меняется, поэтому updated_at сохраняется
+        """
+        if not rows:
+            return 0
+
+        table = Vacancy.__table__
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("b_id"))
+            .values(
+                next_refresh_at=bindparam("b_next_refresh_at"),
+                unchanged_refreshes=bindparam("b_unchanged_refreshes"),
+                hh_etag=bindparam("b_hh_etag"),
+                hh_last_modified=bindparam("b_hh_last_modified"),
+                updated_at=table.c.updated_at
+            )
+        )
+        await self._session.execute(stmt, [
+            {
+                "b_id": row["id"],
+                "b_next_refresh_at": row["next_refresh_at"],
+                "b_unchanged_refreshes": row["unchanged_refreshes"],
+                "b_hh_etag": row["hh_etag"],
+                "b_hh_last_modified": row["hh_last_modified"],
+            }
+            for row in rows
+        ])
+        return len(rows)
 
     async def delete(self, vacancy_id: int) -> bool:
-        """ Удаление вакансии по ID """
-        vacancy = await self.get_by_id(vacancy_id)
-        if vacancy:
-            await self._session.delete(vacancy)
-            await self._session.flush()
-            return True
-        return False
-
-    async def get_list(self, skip: int = 0, limit: int = 100) -> List[Vacancy]:
-        """ Получение списка вакансий с поддержкой пагинации """
-        stmt = select(Vacancy).offset(skip).limit(limit)
+        """ Удаление вакансии по ID одним DELETE ... RETURNING """
+        stmt = (
+            delete(Vacancy)
+            .where(Vacancy.id == vacancy_id)
+            .returning(Vacancy.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self._session.execute(stmt)
+        return result.first() is not None
+
+    async def bulk_delete(self, vacancy_ids: List[int]) -> List[int]:
+        """ Удаление вакансий по списку ID одним DELETE ... RETURNING, возвращает удаленные ID """
+        if not vacancy_ids:
+            return []
+
+        stmt = (
+            delete(Vacancy)
+            .where(Vacancy.id == any_(literal(vacancy_ids, ARRAY(Integer))))
+            .returning(Vacancy.id)
+            .execution_options(synchronize_session=False)
+        )
         result = await self._session.execute(stmt)
         return list(result.scalars().all())
+
+    async def get_list(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        filters: Optional[Dict[str, Any]] = None,
+        descending: bool = False,
+        columns: Optional[Sequence[str]] = None
+    ) -> List[Any]:
+        """
+        Получение списка вакансий с поддержкой пагинации и фильтрации, в порядке id
+        columns - загрузить только эти колонки (строки вместо объектов Vacancy)
+        """
+        order = Vacancy.id.desc() if descending else Vacancy.id.asc()
+        stmt = self._filtered(self._projection(columns), filters).order_by(order).offset(skip).limit(limit)
+        result = await self._session.execute(stmt)
+        return list(result.all() if columns else result.scalars().all())
+
+    @staticmethod
+    def _projection(columns: Optional[Sequence[str]]):
+        """ SELECT вакансий целиком либо только колонок columns """
+        if not columns:
+            return select(Vacancy)
+        return select(*[getattr(Vacancy, name) for name in columns])
+
+    @staticmethod
+    def _filtered(stmt, filters: Optional[Dict[str, Any]]):
+        """
+        Условия фильтров списка: status и company_name - точное совпадение,
+        *_from/*_to - полуинтервалы [from, to) по published_at и created_at
+        """
+        filters = filters or {}
+        if filters.get("status") is not None:
+            stmt = stmt.where(Vacancy.status == filters["status"])
+        if filters.get("company_name") is not None:
+            stmt = stmt.where(Vacancy.company_name == filters["company_name"])
+        for column, name in ((Vacancy.published_at, "published"), (Vacancy.created_at, "created")):
+            if filters.get(f"{name}_from") is not None:
+                stmt = stmt.where(column >= filters[f"{name}_from"])
+            if filters.get(f"{name}_to") is not None:
+                stmt = stmt.where(column < filters[f"{name}_to"])
+        return stmt
+
+    @staticmethod
+    def sort_expression(sort: VacancySortKey):
+        """ Выражение ключа сортировки, совпадающее с индексом (ix_vacancies_created_at_id / ix_vacancies_published_sort_id) """
+        if sort == VacancySortKey.PUBLISHED_AT:
+            return func.coalesce(Vacancy.published_at, Vacancy.created_at)
+        return Vacancy.created_at
+
+    async def get_page(
+        self,
+        sort: VacancySortKey,
+        limit: int,
+        cursor: Optional[Cursor] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        descending: bool = True,
+        columns: Optional[Sequence[str]] = None
+    ) -> Tuple[List[Any], bool]:
+        """
+        Страница вакансий по курсору (keyset), упорядоченных по (ключ сортировки, id)
+        Возвращает вакансии в порядке выдачи и признак наличия записей дальше в направлении курсора.
+        columns - загрузить только эти колонки (строки вместо объектов Vacancy)
+        """
+        key = self.sort_expression(sort)
+        backward = cursor is not None and cursor.backward
+        # Предыдущая страница выбирается в обратном порядке и разворачивается
+        scan_descending = descending != backward
+
+        stmt = self._filtered(self._projection(columns), filters)
+        if cursor is not None:
+            position = tuple_(key, Vacancy.id)
+            boundary = tuple_(literal(cursor.value, Vacancy.created_at.type), literal(cursor.id))
+            stmt = stmt.where(position < boundary if scan_descending else position > boundary)
+        if scan_descending:
+            stmt = stmt.order_by(key.desc(), Vacancy.id.desc())
+        else:
+            stmt = stmt.order_by(key.asc(), Vacancy.id.asc())
+        # Лишняя запись - признак следующей страницы без COUNT
+        stmt = stmt.limit(limit + 1)
+
+        result = await self._session.execute(stmt)
+        vacancies = list(result.all() if columns else result.scalars().all())
+        has_more = len(vacancies) > limit
+        vacancies = vacancies[:limit]
+        if backward:
+            vacancies.reverse()
+        return vacancies, has_more
+
+    async def search(
+        self,
+        query: str,
+        limit: int,
+        after: Optional[Tuple[float, int]] = None
+    ) -> Tuple[List[Row], bool]:
+        """
+        Полнотекстовый поиск по search_vector (GIN-индекс) в русской и английской конфигурациях
+        Результаты упорядочены по (релевантность, id) по убыванию; after - (rank, id) последней
+        выданной записи. Возвращает строки (Vacancy, rank, headline) и признак следующей страницы
+        """
+        ts_query = func.websearch_to_tsquery("russian", query).op("||")(func.websearch_to_tsquery("english", query))
+        rank = func.ts_rank(Vacancy.search_vector, ts_query)
+
+        matches = select(Vacancy.id, rank.label("rank")).where(Vacancy.search_vector.op("@@")(ts_query))
+        if after is not None:
+            matches = matches.where(tuple_(rank, Vacancy.id) < tuple_(cast(literal(after[0]), REAL), literal(after[1])))
+        matches = matches.order_by(rank.desc(), Vacancy.id.desc()).limit(limit + 1).subquery()
+
+        # ts_headline дорогой - считается только для записей страницы
+        headline = func.ts_headline(
+            "russian",
+            func.regexp_replace(func.coalesce(Vacancy.description, ""), "<[^>]*>", " ", "g"),
+            ts_query,
+            SEARCH_HEADLINE_OPTIONS
+        )
+        stmt = (
+            select(Vacancy, matches.c.rank, headline.label("headline"))
+            .join(matches, matches.c.id == Vacancy.id)
+            .order_by(matches.c.rank.desc(), Vacancy.id.desc())
+        )
+        result = await self._session.execute(stmt)
+        rows = list(result.all())
+        return rows[:limit], len(rows) > limit
+
+    async def get_hh_id_bounds(self) -> Optional[Tuple[int, int]]:
+        """ Минимальный и максимальный id вакансий, привязанных к HH.ru """
+        stmt = select(func.min(Vacancy.id), func.max(Vacancy.id)).where(Vacancy.hh_id.is_not(None))
+        result = await self._session.execute(stmt)
+        min_id, max_id = result.one()
+        if min_id is None:
+            return None
+        return min_id, max_id
+
+    async def get_hh_linked_chunk(
+        self,
+        columns: Sequence[str] = ("hh_id",),
+        limit: int = 1000,
+        after_id: int = 0,
+        id_to: Optional[int] = None,
+        due_before: Optional[datetime] = None
+    ) -> List[Row]:
+        """
+        Порция вакансий, привязанных к HH.ru, с id больше after_id по возрастанию id (keyset)
+        Загружаются только колонки id и columns. id_to - верхняя граница id включительно,
+        due_before - только вакансии, плановое обновление которых наступило (или еще не назначалось).
+        Отложенные вакансии (dead letter) пропускаются
+        """
+        selected = [Vacancy.id] + [getattr(Vacancy, name) for name in columns if name != "id"]
+        dead_lettered = exists().where(
+            HHRefreshFailure.vacancy_id == Vacancy.id,
+            HHRefreshFailure.dead_lettered_at.is_not(None)
+        )
+        stmt = (
+            select(*selected)
+            .where(Vacancy.hh_id.is_not(None), Vacancy.id > after_id, ~dead_lettered)
+            .order_by(Vacancy.id)
+            .limit(limit)
+        )
+        if id_to is not None:
+            stmt = stmt.where(Vacancy.id <= id_to)
+        if due_before is not None:
+            stmt = stmt.where(or_(Vacancy.next_refresh_at.is_(None), Vacancy.next_refresh_at <= due_before))
+        result = await self._session.execute(stmt)
+        return list(result)
+
+    async def fill_missing_published_at(self, published_at: datetime) -> int:
+        """ Заполнение даты публикации у вакансий с HH.ru, для которых она не известна """
+        stmt = (
+            update(Vacancy)
+            .where(Vacancy.hh_id.is_not(None), Vacancy.published_at.is_(None))
+            .values(published_at=published_at)
+            .returning(Vacancy.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self._session.execute(stmt)
+        return len(result.all())
+
+    async def mark_outdated(self, published_before: datetime) -> int:
+        """
+        Назначение статуса 'outdated' вакансиям с HH.ru, опубликованным раньше published_before
+        Один UPDATE, затрагивает только строки, у которых статус действительно меняется
+        """
+        stmt = (
+            update(Vacancy)
+            .where(
+                Vacancy.hh_id.is_not(None),
+                Vacancy.published_at < published_before,
+                Vacancy.status.is_distinct_from("outdated")
+            )
+            .values(status="outdated", updated_at=func.now())
+            .returning(Vacancy.id)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self._session.execute(stmt)
+        return len(result.all())
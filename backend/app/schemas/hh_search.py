@@ -0,0 +1,19 @@
+from datetime import datetime
+from pydantic import BaseModel
+from typing import Optional, Dict, Any
+
+
+class HHSearchQueryCreate(BaseModel):
+    name: str
+    params: Dict[str, Any]
+    is_active: bool = True
+
+
+class HHSearchQuery(HHSearchQueryCreate):
+    id: int
+    watermark: Optional[datetime] = None
+    last_crawled_at: Optional[datetime] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
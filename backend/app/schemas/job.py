@@ -0,0 +1,41 @@
+from pydantic import BaseModel
+from typing import Optional, Dict, Any, List
+
+from app.schemas.vacancy import Vacancy
+
+
+class JobAccepted(BaseModel):
+    job_id: str
+    status_url: str
+
+
+class RefreshJobStatus(BaseModel):
+    job_id: str
+    state: str
+    progress: Optional[Dict[str, Any]] = None
+    vacancy: Optional[Vacancy] = None
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+
+
+class HHImportRequest(BaseModel):
+    hh_ids: List[str]
+
+
+class ImportJobAccepted(JobAccepted):
+    requested: int
+    duplicates: int
+    queued: int
+
+
+class ImportJobStatus(BaseModel):
+    job_id: str
+    state: str
+    requested: int
+    duplicates: int
+    queued: int
+    batches: int
+    batches_done: int
+    imported: int
+    failed: int
+    errors: Dict[str, str] = {}
@@ -0,0 +1,17 @@
+from datetime import datetime
+from pydantic import BaseModel
+from typing import Optional
+
+
+class CircuitBreakerStatus(BaseModel):
+    state: str
+    failures: int
+    retry_after: float
+
+
+class TaskLockStatus(BaseModel):
+    name: str
+    owner: Optional[str] = None
+    acquired_at: Optional[datetime] = None
+    expires_in: float
+    rerun_requested: bool
@@ -1,6 +1,6 @@
 from datetime import datetime
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 
 class VacancyBase(BaseModel):
@@ -40,3 +40,76 @@ class VacancyInDB(VacancyBase):
 
 class Vacancy(VacancyInDB):
     pass
+
+
+class VacancySummary(BaseModel):
+    """ Вакансия в списке: без описания; при выборе полей (fields=) заполнены только запрошенные """
+    id: Optional[int] = None
+    title: Optional[str] = None
+    company_name: Optional[str] = None
+    company_address: Optional[str] = None
+    company_logo: Optional[str] = None
+    status: Optional[str] = None
+    hh_id: Optional[str] = None
+    published_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class VacancyListFilter(BaseModel):
+    """ Фильтры списка вакансий (query-параметры) """
+    status: Optional[str] = None
+    company_name: Optional[str] = None
+    published_from: Optional[datetime] = None
+    published_to: Optional[datetime] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+
+
+class VacancySearchHit(BaseModel):
+    """ Результат полнотекстового поиска: вакансия, релевантность и фрагменты описания с подсветкой """
+    vacancy: Vacancy
+    rank: float
+    headline: Optional[str] = None
+
+
+class VacancyBatchRequest(BaseModel):
+    ids: List[int]
+
+
+class VacancyBatch(BaseModel):
+    """ Результат пакетного получения: найденные вакансии в порядке запроса и отсутствующие ID """
+    vacancies: List[Vacancy]
+    missing: List[int]
+
+
+class VacancyBulkUpdateItem(VacancyUpdate):
+    id: int
+
+
+class VacancyBulkRequest(BaseModel):
+    """
+    Пакет изменений вакансий в одной транзакции
+    atomic=True - все или ничего; False - успешные операции фиксируются, ошибочные пропускаются
+    """
+    create: List[VacancyCreate] = []
+    update: List[VacancyBulkUpdateItem] = []
+    delete: List[int] = []
+    atomic: bool = True
+
+
+class VacancyBulkItemResult(BaseModel):
+    """ Результат одной операции пакета: ok, error или rolled_back (откачена вместе с пакетом) """
+    operation: str
+    index: int
+    id: Optional[int] = None
+    status: str
+    error: Optional[str] = None
+
+
+class VacancyBulkResult(BaseModel):
+    committed: bool
+    results: List[VacancyBulkItemResult]
@@ -0,0 +1,77 @@
+import logging
+from datetime import datetime, timezone
+from typing import List, Dict, Any
+
+from app.db.models import HHSearchQuery
+from app.db.unit_of_work import UnitOfWorkFactory
+from app.repositories.hh_search_query_repository import HHSearchQueryRepository
+from app.repositories.vacancy_repository import VacancyRepository
+from app.schemas.vacancy import VacancyCreate
+from app.utils.hh_parser import HHParser
+
+
+logger = logging.getLogger(__name__)
+
+
+class HHCrawlerService:
+    """
+    Сервис обхода поиска HH.ru по сохраненным запросам
+    Страницы выдачи обрабатываются по мере получения, новые вакансии создаются одним INSERT на страницу.
+    Выдача не содержит полного описания, поэтому созданные вакансии сразу становятся
+    в очередь планового обновления, которое догрузит их целиком
+    """
+    def __init__(self, uow_factory: UnitOfWorkFactory, hh_parser: HHParser):
+        self._uow_factory = uow_factory
+        self._hh_parser = hh_parser
+
+    async def crawl_all(self) -> List[Dict[str, Any]]:
+        """ Обход всех активных запросов; ошибка одного запроса не останавливает остальные """
+        uow = self._uow_factory.create()
+        async with uow:
+            queries = await uow.get_repository(HHSearchQueryRepository).get_list(active_only=True)
+
+        results = []
+        for query in queries:
+            try:
+                results.append(await self.crawl_query(query))
+            except Exception as e:
+                logger.error("Error crawling HH search query %s (%s): %s", query.id, query.name, e)
+                results.append({"query_id": query.id, "name": query.name, "error": str(e)})
+        return results
+
+    async def crawl_query(self, query: HHSearchQuery) -> Dict[str, Any]:
+        """
+        Обход одного запроса начиная с его watermark
+        Выдача глубже предела hh.ru проходится окнами по дате публикации (HHParser.iter_search_pages),
+        поэтому отметка - самая свежая полученная вакансия. Отметка сохраняется только после полного обхода,
+        иначе следующий запуск повторит пропущенное
+        """
+        crawled_at = datetime.now(timezone.utc)
+        watermark = query.watermark
+        stats = {"query_id": query.id, "name": query.name, "pages": 0, "found": 0, "inserted": 0}
+
+        async for vacancies in self._hh_parser.iter_search_pages(query.params, date_from=query.watermark):
+            stats["pages"] += 1
+            stats["found"] += len(vacancies)
+            stats["inserted"] += await self._insert_page(vacancies)
+
+            published = [vacancy.published_at for vacancy in vacancies if vacancy.published_at]
+            if published and (watermark is None or max(published) > watermark):
+                watermark = max(published)
+
+        uow = self._uow_factory.create()
+        async with uow:
+            await uow.get_repository(HHSearchQueryRepository).set_watermark(query.id, watermark, crawled_at)
+
+        stats["watermark"] = watermark.isoformat() if watermark else None
+        return stats
+
+    async def _insert_page(self, vacancies: List[VacancyCreate]) -> int:
+        """ Создание новых вакансий страницы, уже существующие hh_id пропускаются """
+        rows = [
+            {**vacancy.dict(), "next_refresh_at": None}
+            for vacancy in vacancies if vacancy.hh_id
+        ]
+        uow = self._uow_factory.create()
+        async with uow:
+            return len(await uow.get_repository(VacancyRepository).bulk_upsert(rows, update_existing=False))
@@ -0,0 +1,40 @@
+from fastapi import HTTPException, status
+from typing import List
+
+from app.db.models import HHSearchQuery
+from app.db.unit_of_work import UnitOfWork
+from app.repositories.hh_search_query_repository import HHSearchQueryRepository
+from app.schemas.hh_search import HHSearchQueryCreate
+
+
+class HHSearchQueryService:
+    """
+    Сервис сохраненных поисковых запросов к HH.ru
+    """
+    def __init__(self, uow: UnitOfWork):
+        self._uow = uow
+
+    async def create_query(self, query_data: HHSearchQueryCreate) -> HHSearchQuery:
+        """ Создание поискового запроса """
+        async with self._uow:
+            query_repo = self._uow.get_repository(HHSearchQueryRepository)
+            if await query_repo.get_by_name(query_data.name):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Поисковый запрос {query_data.name} уже существует"
+                )
+            return await query_repo.create(query_data.dict())
+
+    async def get_queries(self) -> List[HHSearchQuery]:
+        """ Получение списка поисковых запросов """
+        async with self._uow:
+            return await self._uow.get_repository(HHSearchQueryRepository).get_list()
+
+    async def delete_query(self, query_id: int) -> None:
+        """ Удаление поискового запроса """
+        async with self._uow:
+            if not await self._uow.get_repository(HHSearchQueryRepository).delete(query_id):
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Поисковый запрос с ID {query_id} не найден"
+                )
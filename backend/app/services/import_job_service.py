@@ -0,0 +1,68 @@
+import uuid
+from fastapi import HTTPException, status
+from typing import List, Dict, Any
+
+from app.core.config import settings
+from app.db.unit_of_work import UnitOfWork
+from app.repositories.import_job_repository import ImportJobRepository
+from app.repositories.vacancy_repository import VacancyRepository
+from app.tasks.taskiq import import_vacancies_batch
+
+
+class ImportJobService:
+    """
+    Сервис массового импорта вакансий с HH.ru
+    Отсекает уже существующие hh_id одним запросом и раздает остальные пакетами воркерам taskiq
+    """
+    def __init__(self, uow: UnitOfWork, job_repository: ImportJobRepository):
+        self._uow = uow
+        self._job_repository = job_repository
+
+    async def start_import(self, hh_ids: List[str]) -> Dict[str, Any]:
+        """ Постановка импорта в очередь, возвращает ID задачи и число поставленных вакансий """
+        unique_ids = list(dict.fromkeys(hh_id.strip() for hh_id in hh_ids if hh_id and hh_id.strip()))
+        if not unique_ids:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Необходимо передать хотя бы один ID с HH.ru"
+            )
+        if len(unique_ids) > settings.HH_IMPORT_MAX_IDS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"За один запрос можно импортировать не более {settings.HH_IMPORT_MAX_IDS} вакансий"
+            )
+
+        async with self._uow:
+            existing = await self._uow.get_repository(VacancyRepository).get_existing_hh_ids(unique_ids)
+        new_ids = [hh_id for hh_id in unique_ids if hh_id not in existing]
+
+        batch_size = settings.HH_IMPORT_BATCH_SIZE
+        batches = [new_ids[i:i + batch_size] for i in range(0, len(new_ids), batch_size)]
+
+        job_id = uuid.uuid4().hex
+        await self._job_repository.create(
+            job_id,
+            requested=len(unique_ids),
+            duplicates=len(existing),
+            queued=len(new_ids),
+            batches=len(batches)
+        )
+        for batch in batches:
+            await import_vacancies_batch.kiq(job_id, batch)
+
+        return {"job_id": job_id, "requested": len(unique_ids), "duplicates": len(existing), "queued": len(new_ids)}
+
+    async def get_status(self, job_id: str) -> Dict[str, Any]:
+        """ Прогресс импорта: счетчики и ошибки по hh_id """
+        job = await self._job_repository.get(job_id)
+        if job is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Задача импорта {job_id} не найдена"
+            )
+
+        return {
+            "job_id": job_id,
+            "state": "completed" if job["batches_done"] >= job["batches"] else "running",
+            **job
+        }
@@ -0,0 +1,54 @@
+from fastapi import HTTPException, status
+from typing import Dict, Any
+
+from app.repositories.refresh_job_repository import RefreshJobRepository
+from app.tasks.taskiq import broker, refresh_vacancy_job
+
+
+class RefreshJobService:
+    """
+    Сервис фонового обновления вакансий с HH.ru
+    Запрос ставится в очередь taskiq, состояние и результат читаются из бэкенда результатов
+    """
+    def __init__(self, job_repository: RefreshJobRepository):
+        self._result_backend = broker.result_backend
+        self._job_repository = job_repository
+
+    async def enqueue(self, vacancy_id: int, force: bool = False) -> str:
+        """ Постановка обновления в очередь, возвращает ID задачи """
+        task = await refresh_vacancy_job.kiq(vacancy_id, force)
+        await self._job_repository.create(task.task_id, vacancy_id)
+        return task.task_id
+
+    async def get_status(self, job_id: str) -> Dict[str, Any]:
+        """
+        Состояние задачи: pending (в очереди), started, success, failed; неизвестная задача - 404
+        """
+        if not await self._job_repository.exists(job_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Задача обновления {job_id} не найдена"
+            )
+
+        job_status = {"job_id": job_id, "state": "pending"}
+
+        progress = await self._result_backend.get_progress(job_id)
+        if progress is not None:
+            job_status["state"] = "started"
+            job_status["progress"] = progress.meta
+
+        if not await self._result_backend.is_result_ready(job_id):
+            return job_status
+
+        result = await self._result_backend.get_result(job_id)
+        if result.is_err:
+            job_status.update(state="failed", status_code=500, error=str(result.error))
+        elif result.return_value["status"] == "failed":
+            job_status.update(
+                state="failed",
+                status_code=result.return_value["status_code"],
+                error=result.return_value["detail"]
+            )
+        else:
+            job_status.update(state="success", vacancy=result.return_value["vacancy"])
+        return job_status
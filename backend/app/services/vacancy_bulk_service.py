@@ -0,0 +1,165 @@
+import logging
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any, Tuple, Callable, Awaitable
+from fastapi import HTTPException, status
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.config import settings
+from app.db.unit_of_work import UnitOfWork
+from app.repositories.vacancy_cache_repository import VacancyCacheRepository
+from app.repositories.vacancy_repository import VacancyRepository
+from app.schemas.vacancy import VacancyBulkRequest, VacancyBulkUpdateItem, VacancyCreate
+from app.utils.content_hash import vacancy_content_hash
+from app.utils.refresh_schedule import next_refresh_at
+
+
+logger = logging.getLogger(__name__)
+
+Item = Tuple[int, Any]
+
+
+class VacancyBulkService:
+    """
+    Пакетные изменения вакансий в одной транзакции
+    Каждая группа операций (create, update, delete) выполняется одним-двумя запросами в SAVEPOINT.
+    Если запрос группы падает с ошибкой базы данных, группа повторяется по одной операции,
+    каждая в своем SAVEPOINT, чтобы указать ошибочные операции
+    """
+    def __init__(self, uow: UnitOfWork, cache: Optional[VacancyCacheRepository] = None):
+        self._uow = uow
+        self._cache = cache
+
+    async def apply(self, request: VacancyBulkRequest) -> Dict[str, Any]:
+        """
+        Выполнение пакета изменений
+        atomic - при любой ошибке откатываются все операции (их статус - rolled_back)
+        """
+        total = len(request.create) + len(request.update) + len(request.delete)
+        if total > settings.VACANCY_BULK_MAX_ITEMS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Не более {settings.VACANCY_BULK_MAX_ITEMS} операций в одном запросе"
+            )
+
+        async with self._uow:
+            vacancy_repo = self._uow.get_repository(VacancyRepository)
+            batch = await self._uow.savepoint()
+            results = [
+                *await self._run("create", request.create, lambda items: self._create(vacancy_repo, items)),
+                *await self._run("update", request.update, lambda items: self._update(vacancy_repo, items)),
+                *await self._run("delete", request.delete, lambda items: self._delete(vacancy_repo, items)),
+            ]
+
+            committed = not (request.atomic and any(result["status"] == "error" for result in results))
+            if committed:
+                await batch.commit()
+            else:
+                await batch.rollback()
+                for result in results:
+                    if result["status"] == "ok":
+                        result["status"] = "rolled_back"
+
+        if committed and self._cache:
+            await self._cache.invalidate(
+                result["id"] for result in results
+                if result["operation"] in ("update", "delete") and result["status"] == "ok"
+            )
+        return {"committed": committed, "results": results}
+
+    async def _run(
+        self,
+        operation: str,
+        payloads: List[Any],
+        execute: Callable[[List[Item]], Awaitable[List[Dict[str, Any]]]]
+    ) -> List[Dict[str, Any]]:
+        """ Группа операций одним вызовом execute, при ошибке базы данных - по одной """
+        items = list(enumerate(payloads))
+        if not items:
+            return []
+        try:
+            async with self._uow.savepoint():
+                results = await execute(items)
+        except SQLAlchemyError as e:
+            logger.warning("Bulk %s of %s vacancies failed, retrying one by one: %s", operation, len(items), e)
+            results = []
+            for item in items:
+                try:
+                    async with self._uow.savepoint():
+                        results += await execute([item])
+                except SQLAlchemyError as item_error:
+                    index, payload = item
+                    vacancy_id = payload if isinstance(payload, int) else getattr(payload, "id", None)
+                    results.append(self._result(
+                        operation, index, vacancy_id, error=str(getattr(item_error, "orig", item_error))
+                    ))
+        return sorted(results, key=lambda result: result["index"])
+
+    async def _create(self, vacancy_repo: VacancyRepository, items: List[Tuple[int, VacancyCreate]]) -> List[Dict[str, Any]]:
+        """ Создание одним INSERT; дубликаты hh_id (в базе и внутри пакета) - ошибки операций """
+        existing = await vacancy_repo.get_existing_hh_ids([item.hh_id for _, item in items if item.hh_id])
+        now = datetime.now(timezone.utc)
+
+        results, rows, indexes = [], [], []
+        for index, item in items:
+            if item.hh_id and item.hh_id in existing:
+                results.append(self._result("create", index, error=f"Вакансия с ID {item.hh_id} с HH.ru уже существует"))
+                continue
+            if item.hh_id:
+                existing.add(item.hh_id)
+            rows.append({
+                **item.dict(),
+                "content_hash": vacancy_content_hash(item),
+                "next_refresh_at": next_refresh_at(now, item.status, item.published_at) if item.hh_id else None
+            })
+            indexes.append(index)
+
+        created_ids = await vacancy_repo.bulk_create(rows)
+        results += [self._result("create", index, vacancy_id) for index, vacancy_id in zip(indexes, created_ids)]
+        return results
+
+    async def _update(self, vacancy_repo: VacancyRepository, items: List[Tuple[int, VacancyBulkUpdateItem]]) -> List[Dict[str, Any]]:
+        """
+        Обновление одним executemany по ID; поля со значением None не меняются,
+        content_hash и валидаторы HH.ru сбрасываются.
+        Смена hh_id требует загрузки с HH.ru и в пакете не поддерживается
+        """
+        existing = await vacancy_repo.get_existing_ids([item.id for _, item in items])
+
+        results, rows = [], []
+        for index, item in items:
+            if item.id not in existing:
+                results.append(self._result("update", index, item.id, error=f"Вакансия с ID {item.id} не найдена"))
+                continue
+            values = {key: value for key, value in item.dict(exclude_unset=True, exclude={"id"}).items() if value is not None}
+            if "hh_id" in values:
+                results.append(self._result(
+                    "update", index, item.id,
+                    error="Привязка к HH.ru меняется только через /api/v1/vacancy/update"
+                ))
+                continue
+            if values:
+                rows.append({"id": item.id, **values, "content_hash": None, "hh_etag": None, "hh_last_modified": None})
+            results.append(self._result("update", index, item.id))
+
+        await vacancy_repo.bulk_update(rows)
+        return results
+
+    async def _delete(self, vacancy_repo: VacancyRepository, items: List[Tuple[int, int]]) -> List[Dict[str, Any]]:
+        """ Удаление одним DELETE ... RETURNING """
+        deleted = set(await vacancy_repo.bulk_delete([vacancy_id for _, vacancy_id in items]))
+        return [
+            self._result("delete", index, vacancy_id)
+            if vacancy_id in deleted
+            else self._result("delete", index, vacancy_id, error=f"Вакансия с ID {vacancy_id} не найдена")
+            for index, vacancy_id in items
+        ]
+
+    @staticmethod
+    def _result(operation: str, index: int, vacancy_id: Optional[int] = None, error: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            "operation": operation,
+            "index": index,
+            "id": vacancy_id,
+            "status": "error" if error else "ok",
+            "error": error,
+        }
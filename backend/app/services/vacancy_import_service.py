@@ -0,0 +1,73 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any
+
+from app.core.config import settings
+from app.db.unit_of_work import UnitOfWorkFactory
+from app.repositories.import_job_repository import ImportJobRepository
+from app.repositories.vacancy_repository import VacancyRepository
+from app.utils.content_hash import vacancy_content_hash
+from app.utils.hh_parser import HHParser, HHVacancyResult
+from app.utils.rate_limiter import HHPriority
+from app.utils.refresh_schedule import next_refresh_at
+
+
+logger = logging.getLogger(__name__)
+
+
+class VacancyImportService:
+    """
+    Сервис импорта пакета вакансий с HH.ru на воркере
+    Вакансии загружаются с ограниченной параллельностью и записываются одним upsert на пакет
+    """
+    def __init__(
+        self,
+        uow_factory: UnitOfWorkFactory,
+        hh_parser: HHParser,
+        job_repository: ImportJobRepository,
+        concurrency: Optional[int] = None
+    ):
+        self._uow_factory = uow_factory
+        self._hh_parser = hh_parser
+        self._job_repository = job_repository
+        self._semaphore = asyncio.Semaphore(concurrency or settings.HH_REFRESH_CONCURRENCY)
+
+    async def import_batch(self, job_id: str, hh_ids: List[str]) -> Dict[str, Any]:
+        """ Загрузка и создание пакета вакансий, результат учитывается в прогрессе задачи импорта """
+        results = await asyncio.gather(*(self._fetch(hh_id) for hh_id in hh_ids), return_exceptions=True)
+        now = datetime.now(timezone.utc)
+
+        rows, errors = [], {}
+        for hh_id, result in zip(hh_ids, results):
+            if isinstance(result, Exception):
+                errors[hh_id] = str(result)
+                continue
+            vacancy = result.vacancy
+            rows.append({
+                **vacancy.dict(),
+                **result.validators(),
+                "content_hash": vacancy_content_hash(vacancy),
+                "next_refresh_at": next_refresh_at(now, vacancy.status, vacancy.published_at),
+            })
+
+        imported = 0
+        if rows:
+            try:
+                uow = self._uow_factory.create()
+                async with uow:
+                    upserted = await uow.get_repository(VacancyRepository).bulk_upsert(rows)
+                imported = sum(1 for _, inserted in upserted if inserted)
+            except Exception as e:
+                logger.error("Error inserting batch of %s vacancies for import %s: %s", len(rows), job_id, e)
+                errors.update({row["hh_id"]: f"Ошибка записи: {e}" for row in rows})
+                rows = []
+
+        # Вакансии, созданные другим запросом, пока пакет ждал в очереди - обновлены свежими данными
+        duplicates = len(rows) - imported
+        await self._job_repository.record_batch(job_id, imported, duplicates, errors)
+        return {"imported": imported, "duplicates": duplicates, "failed": len(errors)}
+
+    async def _fetch(self, hh_id: str) -> HHVacancyResult:
+        async with self._semaphore:
+            return await self._hh_parser.fetch_vacancy(hh_id, priority=HHPriority.BACKGROUND)
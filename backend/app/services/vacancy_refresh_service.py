@@ -0,0 +1,303 @@
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timezone, timedelta
+from typing import Optional, List, Dict, Any, Tuple, Callable, Awaitable
+from sqlalchemy.engine import Row
+
+from app.core.config import settings
+from app.db.unit_of_work import UnitOfWorkFactory
+from app.exceptions.hh_exceptions import HHCircuitOpenError, HHRateLimitError, HHVacancyNotFoundError
+from app.repositories.hh_refresh_failure_repository import HHRefreshFailureRepository
+from app.repositories.vacancy_cache_repository import VacancyCacheRepository
+from app.repositories.vacancy_repository import VacancyRepository
+from app.utils.content_hash import vacancy_content_hash
+from app.utils.hh_parser import HHParser, HHVacancyResult
+from app.utils.rate_limiter import HHPriority
+from app.utils.refresh_schedule import next_refresh_at
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RefreshStats:
+    """ Статистика одного прогона обновления """
+    total: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    skipped: int = 0
+    retried: int = 0
+    dead_lettered: int = 0
+    paused: bool = False
+    started_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    _started: float = field(default_factory=time.monotonic, repr=False)
+
+    def as_dict(self) -> Dict[str, Any]:
+        duration = time.monotonic() - self._started
+        return {
+            "total": self.total,
+            "changed": self.changed,
+            "unchanged": self.unchanged,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "retried": self.retried,
+            "dead_lettered": self.dead_lettered,
+            "paused": self.paused,
+            "duration_seconds": round(duration, 3),
+            "throughput_per_second": round(self.total / duration, 2) if duration > 0 else 0.0,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+
+class VacancyRefreshService:
+    """
+    Сервис массового обновления вакансий с HH.ru
+    Загрузка идет с ограниченной параллельностью, запись - пакетами, одна транзакция на пакет.
+    Каждой обновленной вакансии назначается время следующего обновления (next_refresh_at)
+    """
+    def __init__(
+        self,
+        uow_factory: UnitOfWorkFactory,
+        hh_parser: HHParser,
+        concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        retry_scheduler: Optional[Callable[[int, int], Awaitable[Any]]] = None,
+        cache: Optional[VacancyCacheRepository] = None
+    ):
+        """
+        retry_scheduler(vacancy_id, delay) ставит повтор обновления одной вакансии через брокер,
+        cache - кэш вакансий по id, сбрасывается для измененных вакансий
+        """
+        self._uow_factory = uow_factory
+        self._hh_parser = hh_parser
+        self._semaphore = asyncio.Semaphore(concurrency or settings.HH_REFRESH_CONCURRENCY)
+        self._batch_size = batch_size or settings.HH_REFRESH_BATCH_SIZE
+        self._retry_scheduler = retry_scheduler
+        self._cache = cache
+
+    async def refresh(
+        self,
+        id_from: Optional[int] = None,
+        id_to: Optional[int] = None,
+        due_only: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Обновление вакансий, привязанных к HH.ru, в диапазоне id (по умолчанию - всех)
+        due_only - только вакансии, время планового обновления которых наступило.
+        Каждая порция читается в своей короткой транзакции, чтобы соединение не простаивало
+        открытым на время загрузки с HH.ru. Прогон приостанавливается, если выключатель hh.ru разомкнут
+        """
+        stats = RefreshStats()
+        due_before = stats.started_at if due_only else None
+
+        last_id = (id_from - 1) if id_from is not None else 0
+        while True:
+            uow = self._uow_factory.create()
+            async with uow:
+                chunk = await uow.get_repository(VacancyRepository).get_hh_linked_chunk(
+                    columns=(
+                        "hh_id", "hh_etag", "hh_last_modified", "content_hash",
+                        "status", "published_at", "unchanged_refreshes"
+                    ),
+                    limit=self._batch_size,
+                    after_id=last_id,
+                    id_to=id_to,
+                    due_before=due_before
+                )
+            if not chunk:
+                break
+
+            if not await self._hh_parser.is_available():
+                logger.warning("HH.ru circuit is open, refresh paused after %s vacancies", stats.total)
+                stats.paused = True
+                break
+            await self._refresh_batch(chunk, stats)
+
+            if len(chunk) < self._batch_size:
+                break
+            last_id = chunk[-1].id
+
+        return stats.as_dict()
+
+    async def get_shards(self, shards_count: int) -> List[Tuple[int, int]]:
+        """ Разбиение вакансий, привязанных к HH.ru, на непересекающиеся диапазоны id """
+        if shards_count < 1:
+            raise ValueError(f"HH_REFRESH_SHARDS must be at least 1, got {shards_count}")
+
+        uow = self._uow_factory.create()
+        async with uow:
+            bounds = await uow.get_repository(VacancyRepository).get_hh_id_bounds()
+        if bounds is None:
+            return []
+
+        min_id, max_id = bounds
+        step = max((max_id - min_id + 1) // shards_count, 1)
+        shards = []
+        id_from = min_id
+        while id_from <= max_id:
+            id_to = max_id if len(shards) == shards_count - 1 else min(id_from + step - 1, max_id)
+            shards.append((id_from, id_to))
+            id_from = id_to + 1
+        return shards
+
+    @staticmethod
+    def merge_stats(shard_stats: List[Dict[str, Any]], started_at: datetime, duration: float) -> Dict[str, Any]:
+        """ Сведение статистики прогонов по шардам в статистику всего обновления """
+        merged = RefreshStats(started_at=started_at, _started=time.monotonic() - duration)
+        counters = [stats_field.name for stats_field in fields(RefreshStats) if stats_field.type is int]
+        for stats in shard_stats:
+            for name in counters:
+                setattr(merged, name, getattr(merged, name) + stats[name])
+            merged.paused = merged.paused or stats["paused"]
+        return merged.as_dict()
+
+    async def _refresh_batch(self, vacancies: List[Row], stats: RefreshStats) -> None:
+        """ Параллельная загрузка пакета вакансий и запись результата одной транзакцией """
+        results = await asyncio.gather(*(self._fetch(vacancy) for vacancy in vacancies), return_exceptions=True)
+        now = datetime.now(timezone.utc)
+
+        rows, schedule_rows, failures = [], [], []
+        for vacancy, result in zip(vacancies, results):
+            if isinstance(result, HHCircuitOpenError):
+                stats.skipped += 1
+                continue
+            if isinstance(result, Exception):
+                logger.warning("Error updating vacancy %s (hh_id=%s): %s", vacancy.id, vacancy.hh_id, result)
+                failures.append((vacancy, result))
+                continue
+
+            # 304 от hh.ru либо совпадение дайджеста - содержимое не пишется, интервал растет.
+            # Новые валидаторы сохраняются, чтобы следующий запрос снова мог получить 304
+            content_hash = None if result.not_modified else vacancy_content_hash(result.vacancy)
+            if content_hash is None or content_hash == vacancy.content_hash:
+                unchanged_refreshes = vacancy.unchanged_refreshes + 1
+                schedule_rows.append({
+                    "id": vacancy.id,
+                    "next_refresh_at": next_refresh_at(now, vacancy.status, vacancy.published_at, unchanged_refreshes),
+                    "unchanged_refreshes": unchanged_refreshes,
+                    **result.validators()
+                })
+                stats.unchanged += 1
+                continue
+
+            rows.append({
+                "id": vacancy.id,
+                **result.vacancy.dict(),
+                **result.validators(),
+                "content_hash": content_hash,
+                "next_refresh_at": next_refresh_at(now, result.vacancy.status, result.vacancy.published_at),
+                "unchanged_refreshes": 0
+            })
+
+        stats.total += len(vacancies)
+        if rows or schedule_rows:
+            try:
+                await self._write(rows, schedule_rows)
+                stats.changed += len(rows)
+            except Exception as e:
+                # Одна некорректная строка не должна терять весь пакет - запись по одной
+                logger.error("Error writing batch of %s vacancies, writing one by one: %s", len(rows) + len(schedule_rows), e)
+                vacancies_by_id = {vacancy.id: vacancy for vacancy in vacancies}
+                for row in rows:
+                    try:
+                        await self._write([row], [])
+                        stats.changed += 1
+                    except Exception as row_error:
+                        failures.append((vacancies_by_id[row["id"]], row_error))
+                for row in schedule_rows:
+                    try:
+                        await self._write([], [row])
+                    except Exception as row_error:
+                        logger.error("Error writing refresh schedule of vacancy %s: %s", row["id"], row_error)
+
+        for vacancy, error in failures:
+            await self._handle_failure(vacancy, error, now, stats)
+
+    async def _write(self, rows: List[Dict[str, Any]], schedule_rows: List[Dict[str, Any]]) -> None:
+        """ Запись обновленных вакансий и расписания одной транзакцией, сброс счетчиков ошибок """
+        uow = self._uow_factory.create()
+        async with uow:
+            vacancy_repo = uow.get_repository(VacancyRepository)
+            await vacancy_repo.bulk_update(rows)
+            await vacancy_repo.bulk_update_schedule(schedule_rows)
+            await uow.get_repository(HHRefreshFailureRepository).clear(
+                [row["id"] for row in rows] + [row["id"] for row in schedule_rows]
+            )
+        # Расписание в кэшированные поля не входит - сбрасываются только измененные вакансии
+        if self._cache and rows:
+            await self._cache.invalidate([row["id"] for row in rows])
+
+    async def _handle_failure(self, vacancy: Row, error: Exception, now: datetime, stats: RefreshStats) -> None:
+        """
+        Регистрация неудачного обновления вакансии
+        Вакансия, удаленная с hh.ru, и вакансия, исчерпавшая HH_REFRESH_RETRY_MAX_ATTEMPTS попыток,
+        откладываются (dead letter); остальные повторяются через брокер с экспоненциальной задержкой
+        """
+        stats.failed += 1
+        try:
+            uow = self._uow_factory.create()
+            async with uow:
+                attempts, dead = await uow.get_repository(HHRefreshFailureRepository).record_failure(
+                    vacancy.id,
+                    vacancy.hh_id,
+                    str(error),
+                    permanent=isinstance(error, HHVacancyNotFoundError),
+                    max_attempts=settings.HH_REFRESH_RETRY_MAX_ATTEMPTS
+                )
+                delay = self._retry_delay(attempts, error)
+                if not dead:
+                    # Плановое обновление не раньше повтора, чтобы не запрашивать вакансию дважды
+                    await uow.get_repository(VacancyRepository).bulk_update_schedule([{
+                        "id": vacancy.id,
+                        "next_refresh_at": now + timedelta(seconds=delay),
+                        "unchanged_refreshes": vacancy.unchanged_refreshes,
+                        "hh_etag": vacancy.hh_etag,
+                        "hh_last_modified": vacancy.hh_last_modified
+                    }])
+        except Exception as e:
+            logger.error("Error recording refresh failure of vacancy %s: %s", vacancy.id, e)
+            return
+
+        if dead:
+            logger.warning("Vacancy %s (hh_id=%s) moved to dead letters after %s attempts", vacancy.id, vacancy.hh_id, attempts)
+            stats.dead_lettered += 1
+            return
+
+        if self._retry_scheduler is None:
+            return
+        try:
+            await self._retry_scheduler(vacancy.id, delay)
+            stats.retried += 1
+        except Exception as e:
+            logger.error("Error scheduling refresh retry of vacancy %s: %s", vacancy.id, e)
+
+    @staticmethod
+    def _retry_delay(attempts: int, error: Exception) -> int:
+        """
+        Экспоненциальная задержка повтора, не меньше Retry-After ответа 429
+        Без плагина отложенных сообщений RabbitMQ задержка фиксированная, чтобы повторы в TTL-очереди не ждали друг друга
+        """
+        if not settings.RABBITMQ_DELAYED_MESSAGE_EXCHANGE:
+            return settings.HH_REFRESH_RETRY_BACKOFF_BASE
+        delay = min(
+            settings.HH_REFRESH_RETRY_BACKOFF_BASE * 2 ** (attempts - 1),
+            settings.HH_REFRESH_RETRY_BACKOFF_MAX
+        )
+        if isinstance(error, HHRateLimitError) and error.retry_after:
+            delay = max(delay, error.retry_after)
+        return math.ceil(delay)
+
+    async def _fetch(self, vacancy: Row) -> HHVacancyResult:
+        """ Условная загрузка одной вакансии с ограничением числа одновременных запросов """
+        async with self._semaphore:
+            return await self._hh_parser.fetch_vacancy(
+                vacancy.hh_id,
+                vacancy.hh_etag,
+                vacancy.hh_last_modified,
+                priority=HHPriority.BACKGROUND
+            )
@@ -1,10 +1,21 @@
+from datetime import datetime, timezone
 from fastapi import HTTPException, status
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 
 from app.db.unit_of_work import UnitOfWork
+from app.exceptions.hh_exceptions import HHCircuitOpenError, HHRateLimitError
+from app.core.config import settings
+from app.repositories.hh_refresh_failure_repository import HHRefreshFailureRepository
+from app.repositories.vacancy_cache_repository import VacancyCacheRepository
 from app.repositories.vacancy_repository import VacancyRepository
-from app.schemas.vacancy import VacancyCreate, VacancyUpdate
-from app.utils.hh_parser import HHParser
+from app.schemas.vacancy import Vacancy as VacancySchema, VacancyCreate, VacancyListFilter, VacancySummary, VacancyUpdate
+from app.utils.content_hash import vacancy_content_hash
+from app.utils.hh_parser import HHParser, HHVacancyResult
+from app.utils.pagination import (
+    Cursor, InvalidCursorError, SearchCursor, SortOrder, VacancySortKey,
+    decode_cursor, decode_search_cursor, encode_cursor, encode_search_cursor, query_fingerprint
+)
+from app.utils.refresh_schedule import next_refresh_at
 
 
 class VacancyService:
@@ -12,23 +23,60 @@ class VacancyService:
     Сервис для работы с вакансиями
     Логика работы с вакансиями, используя репозиторий для доступа к данным
     """
-    def __init__(self, uow: UnitOfWork):
-        """ Инициализация с сессией БД и репозиторием """
+    def __init__(
+        self,
+        uow: UnitOfWork,
+        hh_parser: Optional[HHParser] = None,
+        cache: Optional[VacancyCacheRepository] = None
+    ):
+        """ Инициализация с сессией БД, клиентом hh.ru и кэшем вакансий по id """
         self._uow = uow
+        self._hh_parser = hh_parser
+        self._cache = cache
+
+    async def _fetch_from_hh(
+        self,
+        hh_id: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        use_cache: bool = True
+    ) -> HHVacancyResult:
+        """
+        Получение вакансии с HH.ru через переданный клиент либо общий клиент процесса
+        Ошибки hh.ru преобразуются в HTTPException
+        """
+        if self._hh_parser is None:
+            self._hh_parser = await HHParser.get_instance()
+        try:
+            return await self._hh_parser.fetch_vacancy(hh_id, etag, last_modified, use_cache=use_cache)
+        except HHCircuitOpenError as e:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=str(e),
+                headers={"Retry-After": str(int(e.retry_after) or 1)}
+            )
+        except HHRateLimitError as e:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=str(e),
+                headers={"Retry-After": str(int(e.retry_after or 1))}
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Ошибка при получении вакансии с HH.ru: {str(e)}"
+            )
 
     async def create_vacancy(self, vacancy_data: Optional[VacancyCreate] = None, hh_id: Optional[str] = None) -> Dict[str, Any]:
         """ Создание вакансии из данных или путем парсинга с HH.ru """
         # Получение данных с HH.ru по ID
         async with self._uow:
             vacancy_repo = self._uow.get_repository(VacancyRepository)
+            hh_validators = {}
             if hh_id:
-                try:
-                    vacancy_data = await HHParser.get_vacancy_from_hh(hh_id)
-                except Exception as e:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Ошибка при получении вакансии с HH.ru: {str(e)}"
-                    )
+                hh_result = await self._fetch_from_hh(hh_id)
+                vacancy_data = hh_result.vacancy
+                hh_validators = hh_result.validators()
 
             # Проверка наличия данных
             if not vacancy_data:
@@ -37,52 +85,65 @@ class VacancyService:
                     detail="Неоходимо предоставить либо данные вакансии, либо ID с HH.ru"
                 )
 
-            # Проверка существования вакансии с таким hh_id
+            # Создание вакансии, привязанной к HH.ru - с плановым временем обновления
             if vacancy_data.hh_id:
-                existing_vacancy = await vacancy_repo.get_by_hh_id(vacancy_data.hh_id)
-                if existing_vacancy:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Вакансия с ID {vacancy_data.hh_id} с HH.ru уже существует"
-                    )
+                hh_validators["next_refresh_at"] = next_refresh_at(
+                    datetime.now(timezone.utc), vacancy_data.status, vacancy_data.published_at
+                )
 
-            # Создание вакансии
-            vacancy = await vacancy_repo.create(vacancy_data.dict())
+            # Один INSERT ... ON CONFLICT DO NOTHING: дубликат hh_id не создается и при гонке запросов
+            vacancy = await vacancy_repo.upsert({
+                **vacancy_data.dict(),
+                **hh_validators,
+                "content_hash": vacancy_content_hash(vacancy_data)
+            }, update_existing=False, columns=tuple(VacancySchema.model_fields))
+            if vacancy is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Вакансия с ID {vacancy_data.hh_id} с HH.ru уже существует"
+                )
             return vacancy
 
     async def update_vacancy(self, vacancy_id: int, vacancy_data: VacancyUpdate) -> Dict[str, Any]:
-        """ Обновление данных вакансии """
+        """
+        Обновление данных вакансии
+        Содержимое меняется вручную, поэтому content_hash и валидаторы HH.ru (ETag, Last-Modified)
+        сбрасываются - следующее обновление с HH.ru получит данные безусловным запросом и сравнит их заново
+        """
         async with self._uow:
             vacancy_repo = self._uow.get_repository(VacancyRepository)
-            # Поиск вакансии
-            db_vacancy = await vacancy_repo.get_by_id(vacancy_id)
-            if not db_vacancy:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Вакансия с ID {vacancy_id} не найдена"
-                )
 
-            # Обновление данных с HH.ru, если запрошено
+            # Обновление данных с HH.ru, если привязка к HH.ru меняется
             update_data = vacancy_data.dict(exclude_unset=True)
-            if vacancy_data.hh_id and vacancy_data.hh_id != db_vacancy.hh_id:
-                try:
-                    hh_data = await HHParser.get_vacancy_from_hh(vacancy_data.hh_id)
-                    hh_data_dict = hh_data.dict()
+            if vacancy_data.hh_id:
+                hh_link = await vacancy_repo.get_hh_link(vacancy_id)
+                if not hh_link:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail=f"Вакансия с ID {vacancy_id} не найдена"
+                    )
+                if vacancy_data.hh_id != hh_link.hh_id:
+                    hh_result = await self._fetch_from_hh(vacancy_data.hh_id)
+                    update_data.update(hh_result.validators())
 
                     # Обновляем только те поля, которые не были указаны в vacancy_data
-                    for key, value in hh_data_dict.items():
+                    for key, value in hh_result.vacancy.dict().items():
                         if key not in update_data or update_data[key] is None:
                             update_data[key] = value
 
-                except Exception as e:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Ошибка при получении вакансии с HH.ru: {str(e)}"
-                    )
-
-            # Обновление вакансии
-            updated_vacancy = await vacancy_repo.update(vacancy_id, update_data)
-            return updated_vacancy
+            # Один UPDATE ... RETURNING; строка не перезаписывается, если значения не изменились
+            updated_vacancy = await vacancy_repo.update(
+                vacancy_id, update_data, skip_unchanged=True, reset=("content_hash", "hh_etag", "hh_last_modified")
+            )
+            if updated_vacancy is None:
+                updated_vacancy = await vacancy_repo.get_by_id(vacancy_id)
+            if updated_vacancy is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Вакансия с ID {vacancy_id} не найдена"
+                )
+        await self._invalidate_cache([vacancy_id])
+        return updated_vacancy
 
     async def get_vacancy(self, vacancy_id: int) -> Dict[str, Any]:
         """ Получение вакансии по ID """
@@ -106,9 +167,13 @@ class VacancyService:
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail=f"Вакансия с ID {vacancy_id} не найдена"
                 )
+        await self._invalidate_cache([vacancy_id])
 
-    async def refresh_vacancy_from_hh(self, vacancy_id: int) -> Dict[str, Any]:
-        """ Обновление данных с вакансии из HH.ru по сохраненному hh_id """
+    async def refresh_vacancy_from_hh(self, vacancy_id: int, force: bool = False) -> Dict[str, Any]:
+        """
+        Обновление данных с вакансии из HH.ru по сохраненному hh_id
+        force - безусловный запрос к hh.ru: в обход кэша и без If-None-Match / If-Modified-Since
+        """
         async with self._uow:
             vacancy_repo = self._uow.get_repository(VacancyRepository)
             vacancy = await vacancy_repo.get_by_id(vacancy_id)
@@ -124,21 +189,207 @@ class VacancyService:
                     detail="Эта вакансия не имеет привязки к ID с HH.ru"
                 )
 
+            # Получение обновленных данных с HH.ru, 304 - данные не изменились, запись не нужна
+            hh_result = await self._fetch_from_hh(
+                vacancy.hh_id,
+                None if force else vacancy.hh_etag,
+                None if force else vacancy.hh_last_modified,
+                use_cache=not force
+            )
+            # Успешный ответ hh.ru снимает вакансию с повторов и из dead letters
+            await self._uow.get_repository(HHRefreshFailureRepository).clear([vacancy_id])
+
+            # 304 либо данные совпадают с сохраненными - пишутся только расписание и новые валидаторы
+            content_hash = None if hh_result.not_modified else vacancy_content_hash(hh_result.vacancy)
+            if content_hash is None or content_hash == vacancy.content_hash:
+                unchanged_refreshes = (vacancy.unchanged_refreshes or 0) + 1
+                await vacancy_repo.bulk_update_schedule([{
+                    "id": vacancy_id,
+                    "next_refresh_at": next_refresh_at(
+                        datetime.now(timezone.utc), vacancy.status, vacancy.published_at, unchanged_refreshes
+                    ),
+                    "unchanged_refreshes": unchanged_refreshes,
+                    **hh_result.validators()
+                }])
+                return vacancy
+
+            update_data = {
+                **hh_result.vacancy.dict(),
+                **hh_result.validators(),
+                "content_hash": content_hash,
+                "next_refresh_at": next_refresh_at(
+                    datetime.now(timezone.utc), hh_result.vacancy.status, hh_result.vacancy.published_at
+                ),
+                "unchanged_refreshes": 0
+            }
+            updated_vacancy = await vacancy_repo.update(vacancy_id, update_data)
+        await self._invalidate_cache([vacancy_id])
+        return updated_vacancy
+
+    async def get_vacancies_batch(self, vacancy_ids: List[int]) -> Dict[str, Any]:
+        """
+        Получение вакансий по списку ID: сначала из кэша, остальные - одним запросом к базе
+        Возвращает найденные вакансии в порядке запроса и ID, которых нет
+        """
+        vacancy_ids = list(dict.fromkeys(vacancy_ids))
+        if len(vacancy_ids) > settings.VACANCY_BATCH_MAX_IDS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Не более {settings.VACANCY_BATCH_MAX_IDS} ID в одном запросе"
+            )
+
+        found = await self._cache.get_many(vacancy_ids) if self._cache else {}
+        not_cached = [vacancy_id for vacancy_id in vacancy_ids if vacancy_id not in found]
+        if not_cached:
+            async with self._uow:
+                vacancies = await self._uow.get_repository(VacancyRepository).get_by_ids(not_cached)
+            loaded = {
+                vacancy.id: VacancySchema.model_validate(vacancy).model_dump(mode="json")
+                for vacancy in vacancies
+            }
+            if self._cache:
+                await self._cache.set_many(loaded)
+            found.update(loaded)
+
+        return {
+            "vacancies": [found[vacancy_id] for vacancy_id in vacancy_ids if vacancy_id in found],
+            "missing": [vacancy_id for vacancy_id in vacancy_ids if vacancy_id not in found],
+        }
+
+    async def get_vacancies_list(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        filters: Optional[VacancyListFilter] = None,
+        order: SortOrder = SortOrder.ASC,
+        fields: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Получение списка вакансий с поддержкой пагинации и фильтрации
+        Загружаются только колонки VacancySummary (без описания), fields - только запрошенные из них
+        """
+        selected = self._summary_fields(fields)
+        async with self._uow:
+            vacancy_repo = self._uow.get_repository(VacancyRepository)
+            rows = await vacancy_repo.get_list(
+                skip, limit, self._filter_values(filters), descending=order == SortOrder.DESC, columns=selected
+            )
+        return [dict(row._mapping) for row in rows]
+
+    async def get_vacancies_page(
+        self,
+        limit: int = 100,
+        sort: VacancySortKey = VacancySortKey.CREATED_AT,
+        cursor: Optional[str] = None,
+        filters: Optional[VacancyListFilter] = None,
+        order: SortOrder = SortOrder.DESC,
+        fields: Optional[List[str]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str], Optional[str]]:
+        """
+        Постраничное получение вакансий по курсору
+        Возвращает вакансии (колонки VacancySummary или fields) и курсоры следующей
+        и предыдущей страниц (None - страницы нет)
+        """
+        selected = self._summary_fields(fields)
+        position = None
+        if cursor is not None:
             try:
-                # Получение обновленных данных с HH.ru
-                updated_data = await HHParser.get_vacancy_from_hh(vacancy.hh_id)
-                updated_vacancy = await vacancy_repo.update(vacancy_id, updated_data.dict())
-                return updated_vacancy
+                position = decode_cursor(cursor)
+            except InvalidCursorError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid cursor"
+                )
+            if position.sort != sort or position.order != order:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Cursor was issued for a different sort order"
+                )
 
-            except Exception as e:
+        async with self._uow:
+            vacancy_repo = self._uow.get_repository(VacancyRepository)
+            # Ключ сортировки нужен для курсоров, даже если не запрошен
+            rows, has_more = await vacancy_repo.get_page(
+                sort, limit, position, self._filter_values(filters), descending=order == SortOrder.DESC,
+                columns=list(dict.fromkeys(selected + ["created_at", "published_at"]))
+            )
+
+        if not rows:
+            return [], None, None
+
+        def boundary(vacancy, backward: bool) -> str:
+            value = vacancy.created_at
+            if sort == VacancySortKey.PUBLISHED_AT and vacancy.published_at is not None:
+                value = vacancy.published_at
+            return encode_cursor(Cursor(sort=sort, value=value, id=vacancy.id, backward=backward, order=order))
+
+        backward = position is not None and position.backward
+        # В направлении курсора страница есть, если нашлась лишняя запись; в обратном - если курсор был
+        has_next = has_more if not backward else True
+        has_prev = has_more if backward else position is not None
+        next_cursor = boundary(rows[-1], False) if has_next else None
+        prev_cursor = boundary(rows[0], True) if has_prev else None
+        vacancies = [{name: row._mapping[name] for name in selected} for row in rows]
+        return vacancies, next_cursor, prev_cursor
+
+    async def search_vacancies(
+        self,
+        query: str,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Полнотекстовый поиск вакансий, от более релевантных к менее
+        Возвращает результаты (vacancy, rank, headline) и курсор следующей страницы
+        """
+        fingerprint = query_fingerprint(query)
+        after = None
+        if cursor is not None:
+            try:
+                position = decode_search_cursor(cursor)
+            except InvalidCursorError:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Ошибка при получении вакансии с HH.ru: {str(e)}"
+                    detail="Invalid cursor"
                 )
+            if position.query != fingerprint:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Cursor was issued for a different search query"
+                )
+            after = (position.rank, position.id)
 
-    async def get_vacancies_list(self, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
-        """ Получение списка вакансий с поддержкой пагинации """
         async with self._uow:
             vacancy_repo = self._uow.get_repository(VacancyRepository)
-            vacancies = await vacancy_repo.get_list(skip, limit)
-            return vacancies
+            rows, has_more = await vacancy_repo.search(query, limit, after)
+
+        hits = [{"vacancy": vacancy, "rank": rank, "headline": headline} for vacancy, rank, headline in rows]
+        next_cursor = None
+        if has_more and hits:
+            last = hits[-1]
+            next_cursor = encode_search_cursor(SearchCursor(query=fingerprint, rank=last["rank"], id=last["vacancy"].id))
+        return hits, next_cursor
+
+    async def _invalidate_cache(self, vacancy_ids: List[int]) -> None:
+        """ Сброс кэша вакансий после фиксации изменений """
+        if self._cache:
+            await self._cache.invalidate(vacancy_ids)
+
+    @staticmethod
+    def _summary_fields(fields: Optional[List[str]]) -> List[str]:
+        """ Колонки для списка: запрошенные поля VacancySummary (id - всегда) либо все """
+        allowed = list(VacancySummary.model_fields)
+        if not fields:
+            return allowed
+        unknown = sorted(set(fields) - set(allowed))
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}"
+            )
+        return ["id"] + [name for name in allowed if name in fields and name != "id"]
+
+    @staticmethod
+    def _filter_values(filters: Optional[VacancyListFilter]) -> Dict[str, Any]:
+        """ Заданные фильтры списка в виде словаря для репозитория """
+        return filters.dict(exclude_none=True) if filters is not None else {}
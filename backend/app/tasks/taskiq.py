@@ -1,17 +1,38 @@
-from taskiq import TaskiqScheduler
+import asyncio
+import logging
+import time
+from fastapi import HTTPException
+from taskiq import TaskiqDepends, TaskiqEvents, TaskiqScheduler, TaskiqState
+from taskiq.depends.progress_tracker import ProgressTracker, TaskState
 from taskiq.schedule_sources import LabelScheduleSource
 from taskiq_aio_pika import AioPikaBroker
+from taskiq_redis import RedisAsyncResultBackend
+from redis.exceptions import RedisError
 from datetime import datetime, timezone, timedelta
-from sqlalchemy.future import select
+from typing import List
 
+from app.core.redis_client import RedisClient
 from app.db.base import Database
-from app.db.models import Vacancy
+from app.repositories.import_job_repository import ImportJobRepository
+from app.repositories.vacancy_cache_repository import VacancyCacheRepository
+from app.repositories.vacancy_repository import VacancyRepository
+from app.schemas.vacancy import Vacancy as VacancySchema
+from app.services.hh_crawler_service import HHCrawlerService
+from app.services.vacancy_import_service import VacancyImportService
+from app.services.vacancy_refresh_service import VacancyRefreshService
+from app.services.vacancy_service import VacancyService
 from app.utils.hh_parser import HHParser
+from app.utils.task_lock import TaskLock, TaskLockMonitor, single_run
 from app.core.config import settings
 
 
+logger = logging.getLogger(__name__)
+
 broker = AioPikaBroker(
-    settings.RABBITMQ_URL
+    settings.RABBITMQ_URL,
+    delayed_message_exchange_plugin=settings.RABBITMQ_DELAYED_MESSAGE_EXCHANGE
+).with_result_backend(
+    RedisAsyncResultBackend(settings.REDIS_URL, result_ex_time=settings.TASK_RESULT_TTL)
 )
 
 
@@ -21,53 +42,195 @@ scheduler = TaskiqScheduler(
 )
 
 
-@broker.task(schedule=[{"cron": "0 */4 * * *"}])
-async def update_all_vacancies_from_hh():
-    """ Обновление информации обо всех вакансиях с HH.ru """
-    async for session in Database.get_db():
-        stmt = select(Vacancy).where(Vacancy.hh_id.is_not(None))
-        result = await session.execute(stmt)
-        vacancies = result.scalars().all()
-
-        for vacancy in vacancies:
-            try:
-                update_data = await HHParser.get_vacancy_from_hh(vacancy.hh_id)
-
-                for key, value in update_data.dict().items():
-                    if hasattr(vacancy, key):
-                        setattr(vacancy, key, value)
+@broker.on_event(TaskiqEvents.WORKER_STARTUP)
+async def worker_startup(state: TaskiqState) -> None:
+    """ Общий keep-alive клиент hh.ru на время жизни воркера """
+    await HHParser.startup()
+
+
+@broker.on_event(TaskiqEvents.WORKER_SHUTDOWN)
+async def worker_shutdown(state: TaskiqState) -> None:
+    await HHParser.shutdown()
+    await RedisClient.close()
+
+
+async def get_refresh_service() -> VacancyRefreshService:
+    """ Сервис обновления вакансий на общем клиенте hh.ru воркера """
+    return VacancyRefreshService(
+        Database.get_unit_of_work_factory(),
+        await HHParser.get_instance(),
+        retry_scheduler=schedule_refresh_retry,
+        cache=VacancyCacheRepository()
+    )
+
+
+async def schedule_refresh_retry(vacancy_id: int, delay: int) -> None:
+    """ Отложенный повтор обновления одной вакансии через брокер """
+    await retry_vacancy_refresh.kicker().with_labels(delay=delay).kiq(vacancy_id)
+
+
+# Префикс блокировок шардов: каждый шард держит свою блокировку, пока выполняется
+SHARD_LOCK_PREFIX = "hh_refresh_shard"
+
+
+async def run_sharded_refresh(due_only: bool) -> dict:
+    """
+    Координатор обновления: делит вакансии на диапазоны id, ставит по задаче на диапазон
+    (их разбирают все воркеры) и сводит результаты.
+    Шард, не уложившийся в HH_REFRESH_SHARD_TIMEOUT, продолжает работать под своей блокировкой,
+    и следующий прогон не начинается, пока не завершатся все шарды предыдущего
+    """
+    started_at = datetime.now(timezone.utc)
+    started = time.monotonic()
+
+    try:
+        shards_running = await TaskLockMonitor().is_running(f"{SHARD_LOCK_PREFIX}:")
+    except RedisError as e:
+        logger.warning("Shard locks unavailable, refresh starts without the check: %s", e)
+        shards_running = False
+    if shards_running:
+        logger.info("Shards of the previous HH refresh are still running, run skipped")
+        return {"status": "skipped", "lock": SHARD_LOCK_PREFIX}
+
+    refresh_service = await get_refresh_service()
+    shards = await refresh_service.get_shards(settings.HH_REFRESH_SHARDS)
+    shard_tasks = [await refresh_vacancies_shard.kiq(id_from, id_to, due_only) for id_from, id_to in shards]
+    results = await asyncio.gather(
+        *(task.wait_result(check_interval=1, timeout=settings.HH_REFRESH_SHARD_TIMEOUT) for task in shard_tasks),
+        return_exceptions=True
+    )
+
+    shard_stats, shard_errors = [], []
+    for (id_from, id_to), result in zip(shards, results):
+        if isinstance(result, Exception) or result.is_err:
+            error = result if isinstance(result, Exception) else result.error
+            shard_errors.append({"id_from": id_from, "id_to": id_to, "error": str(error)})
+        elif result.return_value.get("status") == "skipped":
+            shard_errors.append({"id_from": id_from, "id_to": id_to, "error": "shard is already being refreshed"})
+        else:
+            shard_stats.append(result.return_value)
+
+    stats = VacancyRefreshService.merge_stats(shard_stats, started_at, time.monotonic() - started)
+    return {
+        "status": "success" if not shard_errors else "partial",
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+        "shards": len(shards),
+        "shard_errors": shard_errors,
+        **stats
+    }
 
-                vacancy.updated_at = datetime.now(timezone.utc)
 
-                await session.commit()
-                await session.refresh(vacancy)
+@broker.task(schedule=[{"cron": settings.HH_REFRESH_TICK_CRON}])
+@single_run("hh_refresh")
+async def refresh_due_vacancies():
+    """
+    Плановое обновление с HH.ru: только вакансии, для которых наступило next_refresh_at
+    Интервал каждой вакансии зависит от ее возраста, статуса и частоты изменений
+    """
+    return await run_sharded_refresh(due_only=True)
 
-            except Exception as e:
-                print(f"Error updating vacancy {vacancy.id}: {str(e)}")
 
-        return {"status": "success", "updated_at": datetime.now(timezone.utc).isoformat()}
+@broker.task
+@single_run("hh_refresh")
+async def update_all_vacancies_from_hh():
+    """ Обновление информации обо всех вакансиях с HH.ru независимо от расписания """
+    return await run_sharded_refresh(due_only=False)
+
+
+@broker.task
+async def refresh_vacancies_shard(id_from: int, id_to: int, due_only: bool = False):
+    """
+    Обновление с HH.ru вакансий с id в диапазоне [id_from, id_to]
+    Блокировка шарда удерживается до конца обновления, даже если координатор перестал ждать.
+    Шард, который уже обновляет другой воркер, пропускается
+    """
+    lock_name = f"{SHARD_LOCK_PREFIX}:{id_from}-{id_to}"
+    lock = TaskLock(lock_name)
+    try:
+        acquired = await lock.acquire()
+    except RedisError as e:
+        logger.warning("Shard lock unavailable, running without lock: %s", e)
+        acquired = False
+    else:
+        if not acquired:
+            logger.info("Shard %s-%s is already being refreshed, skipped", id_from, id_to)
+            return {"status": "skipped", "lock": lock_name}
+    try:
+        refresh_service = await get_refresh_service()
+        return await refresh_service.refresh(id_from, id_to, due_only)
+    finally:
+        if acquired:
+            await lock.release()
+
+
+@broker.task
+async def retry_vacancy_refresh(vacancy_id: int):
+    """ Повтор неудачного обновления вакансии с HH.ru; при новой ошибке ставится следующий повтор """
+    refresh_service = await get_refresh_service()
+    return await refresh_service.refresh(vacancy_id, vacancy_id)
+
+
+@broker.task
+async def refresh_vacancy_job(
+    vacancy_id: int,
+    force: bool = False,
+    progress: ProgressTracker[dict] = TaskiqDepends()
+):
+    """
+    Фоновое обновление одной вакансии с HH.ru по запросу API
+    Ошибки сервиса (404, 429, 503 и т.п.) возвращаются в результате задачи с их HTTP-статусом
+    """
+    await progress.set_progress(TaskState.STARTED, {"vacancy_id": vacancy_id, "stage": "fetching"})
+
+    vacancy_service = VacancyService(
+        Database.get_unit_of_work_factory().create(), await HHParser.get_instance(), VacancyCacheRepository()
+    )
+    try:
+        vacancy = await vacancy_service.refresh_vacancy_from_hh(vacancy_id, force)
+    except HTTPException as e:
+        await progress.set_progress(TaskState.FAILURE, {"vacancy_id": vacancy_id, "stage": "failed"})
+        return {"status": "failed", "status_code": e.status_code, "detail": e.detail}
+
+    await progress.set_progress(TaskState.SUCCESS, {"vacancy_id": vacancy_id, "stage": "done"})
+    return {"status": "success", "vacancy": VacancySchema.model_validate(vacancy).model_dump(mode="json")}
+
+
+@broker.task
+async def import_vacancies_batch(job_id: str, hh_ids: List[str]):
+    """ Импорт пакета вакансий с HH.ru в рамках задачи массового импорта job_id """
+    import_service = VacancyImportService(
+        Database.get_unit_of_work_factory(),
+        await HHParser.get_instance(),
+        ImportJobRepository()
+    )
+    return await import_service.import_batch(job_id, hh_ids)
+
+
+@broker.task(schedule=[{"cron": settings.HH_SEARCH_CRON}])
+@single_run("hh_crawl")
+async def crawl_hh_search_queries():
+    """ Загрузка новых вакансий по сохраненным поисковым запросам к HH.ru """
+    crawler = HHCrawlerService(Database.get_unit_of_work_factory(), await HHParser.get_instance())
+    queries = await crawler.crawl_all()
+    return {
+        "status": "success" if not any("error" in query for query in queries) else "partial",
+        "inserted": sum(query.get("inserted", 0) for query in queries),
+        "queries": queries,
+        "executed_at": datetime.now(timezone.utc).isoformat()
+    }
 
 
 @broker.task(schedule=[{"cron": "0 0 * * *"}])
+@single_run("mark_outdated", coalesce=True)
 async def mark_outdated_vacancies():
     """ Назначение статуса 'outdated' для вакансий, опубликованных на hh.ru более 2 недель назад """
-    async for session in Database.get_db():
-        stmt = select(Vacancy).where(Vacancy.hh_id.is_not(None))
-        result = await session.execute(stmt)
-        vacancies = result.scalars().all()
-
-        two_weeks_ago = datetime.now(timezone.utc) - timedelta(weeks=2)
-        updated_count = 0
-
-        for vacancy in vacancies:
-            if vacancy.published_at is None:
-                    vacancy.published_at = datetime.now(timezone.utc)
-
-            if vacancy.published_at < two_weeks_ago:
-                vacancy.status = "outdated"
-                updated_count += 1
+    now = datetime.now(timezone.utc)
 
-        await session.commit()
+    uow = Database.get_unit_of_work_factory().create()
+    async with uow:
+        vacancy_repo = uow.get_repository(VacancyRepository)
+        await vacancy_repo.fill_missing_published_at(now)
+        updated_count = await vacancy_repo.mark_outdated(now - timedelta(weeks=2))
 
     return {
         "status": "success",
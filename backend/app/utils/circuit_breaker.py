@@ -0,0 +1,160 @@
+import enum
+import logging
+from typing import Optional, Dict, Any
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis_client import RedisClient
+from app.exceptions.hh_exceptions import HHCircuitOpenError
+
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, enum.Enum):
+    """ Состояние автоматического выключателя """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+# KEYS: open, tripped, probe. Возвращает состояние, право на пробный запрос и оставшееся время
+_BEFORE_CALL_SCRIPT = """
+local open_ttl = redis.call('PTTL', KEYS[1])
+if open_ttl > 0 then
+    return {'open', 0, open_ttl}
+end
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    if redis.call('SET', KEYS[3], '1', 'NX', 'PX', ARGV[1]) then
+        return {'half_open', 1, 0}
+    end
+    return {'half_open', 0, redis.call('PTTL', KEYS[3])}
+end
+return {'closed', 0, 0}
+"""
+
+# KEYS: open, tripped, probe, failures. Возвращает 1, если выключатель разомкнулся
+_RECORD_FAILURE_SCRIPT = """
+local failures = redis.call('INCR', KEYS[4])
+if failures == 1 then
+    redis.call('PEXPIRE', KEYS[4], ARGV[1])
+end
+if ARGV[4] == '1' or failures >= tonumber(ARGV[2]) then
+    redis.call('SET', KEYS[1], '1', 'PX', ARGV[3])
+    redis.call('SET', KEYS[2], '1')
+    redis.call('DEL', KEYS[3], KEYS[4])
+    return 1
+end
+return 0
+"""
+
+
+class HHCircuitBreaker:
+    """
+    Автоматический выключатель для интеграции с hh.ru, общий для всех процессов через Redis
+    closed - запросы идут как обычно; open - после HH_CIRCUIT_FAILURE_THRESHOLD ошибок за окно
+    запросы сразу отклоняются; half_open - по истечении HH_CIRCUIT_RESET_TIMEOUT пропускается
+    один пробный запрос, его успех замыкает выключатель, ошибка снова размыкает
+    """
+    OPEN_KEY = "hh_circuit:open"
+    TRIPPED_KEY = "hh_circuit:tripped"
+    PROBE_KEY = "hh_circuit:probe"
+    FAILURES_KEY = "hh_circuit:failures"
+
+    def __init__(self, redis_client: Optional[Redis] = None):
+        self._redis = redis_client or RedisClient.get_client()
+        self._before_call_script = self._redis.register_script(_BEFORE_CALL_SCRIPT)
+        self._record_failure_script = self._redis.register_script(_RECORD_FAILURE_SCRIPT)
+        self._keys = [self.OPEN_KEY, self.TRIPPED_KEY, self.PROBE_KEY, self.FAILURES_KEY]
+
+    async def before_call(self) -> bool:
+        """
+        Проверка перед запросом к hh.ru
+        Возвращает True, если запрос пробный; при разомкнутом выключателе - HHCircuitOpenError
+        """
+        try:
+            state, probe, retry_after_ms = await self._before_call_script(
+                keys=self._keys[:3],
+                args=[int(settings.HH_CIRCUIT_PROBE_TIMEOUT * 1000)]
+            )
+        except RedisError as e:
+            logger.warning("HH circuit breaker unavailable, request is allowed: %s", e)
+            return False
+
+        if int(probe):
+            return True
+        if state.decode() != CircuitState.CLOSED.value:
+            raise HHCircuitOpenError(max(int(retry_after_ms), 0) / 1000 or settings.HH_CIRCUIT_RESET_TIMEOUT)
+        return False
+
+    async def record_success(self, probe: bool) -> None:
+        """ Успешный ответ hh.ru: пробный запрос замыкает выключатель """
+        if not probe:
+            return
+        try:
+            await self._redis.delete(self.TRIPPED_KEY, self.PROBE_KEY, self.FAILURES_KEY)
+        except RedisError as e:
+            logger.warning("HH circuit breaker unavailable: %s", e)
+
+    async def release(self, probe: bool) -> None:
+        """ Запрос не дошел до hh.ru: пробный запрос освобождается, состояние не меняется """
+        if not probe:
+            return
+        try:
+            await self._redis.delete(self.PROBE_KEY)
+        except RedisError as e:
+            logger.warning("HH circuit breaker unavailable: %s", e)
+
+    async def record_failure(self, probe: bool) -> None:
+        """ Ошибка hh.ru (сеть, таймаут, 5xx): при превышении порога выключатель размыкается """
+        try:
+            opened = await self._record_failure_script(
+                keys=self._keys,
+                args=[
+                    int(settings.HH_CIRCUIT_FAILURE_WINDOW * 1000),
+                    settings.HH_CIRCUIT_FAILURE_THRESHOLD,
+                    int(settings.HH_CIRCUIT_RESET_TIMEOUT * 1000),
+                    1 if probe else 0
+                ]
+            )
+        except RedisError as e:
+            logger.warning("HH circuit breaker unavailable: %s", e)
+            return
+
+        if opened:
+            logger.warning("HH circuit breaker opened for %s s", settings.HH_CIRCUIT_RESET_TIMEOUT)
+
+    async def get_state(self) -> Optional[Dict[str, Any]]:
+        """ Текущее состояние выключателя для мониторинга, None - Redis недоступен """
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                pipe.pttl(self.OPEN_KEY)
+                pipe.exists(self.TRIPPED_KEY)
+                pipe.get(self.FAILURES_KEY)
+                open_ttl, tripped, failures = await pipe.execute()
+        except RedisError as e:
+            logger.warning("HH circuit breaker unavailable: %s", e)
+            return None
+
+        if open_ttl > 0:
+            state = CircuitState.OPEN
+        elif tripped:
+            state = CircuitState.HALF_OPEN
+        else:
+            state = CircuitState.CLOSED
+
+        return {
+            "state": state,
+            "failures": int(failures or 0),
+            "retry_after": open_ttl / 1000 if open_ttl > 0 else 0.0,
+        }
+
+    async def is_open(self) -> bool:
+        """ Разомкнут ли выключатель (фоновые задачи приостанавливаются) """
+        try:
+            return await self._redis.pttl(self.OPEN_KEY) > 0
+        except RedisError as e:
+            logger.warning("HH circuit breaker unavailable: %s", e)
+            return False
@@ -0,0 +1,17 @@
+import hashlib
+import json
+
+from app.schemas.vacancy import VacancyCreate
+
+
+def vacancy_content_hash(vacancy_data: VacancyCreate) -> str:
+    """
+    Нормализованный SHA-256 дайджест содержимого вакансии
+    Строки обрезаются по краям, ключи сортируются, даты приводятся к ISO 8601
+    """
+    payload = {
+        key: value.strip() if isinstance(value, str) else value
+        for key, value in vacancy_data.model_dump(mode="json").items()
+    }
+    normalized = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
@@ -1,68 +1,427 @@
 import aiohttp
+import asyncio
 import certifi
+import hashlib
+import json
+import logging
 import ssl
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Dict, Any, AsyncIterator, Awaitable, Callable, List, TypeVar
 
 from app.core.config import settings
+from app.core.redis_client import RedisClient
+from app.exceptions.hh_exceptions import (
+    HHLocalRateLimitError, HHParserError, HHRateLimitError, HHUnavailableError, HHVacancyNotFoundError
+)
+from app.repositories.hh_vacancy_cache_repository import HHVacancyCacheRepository
 from app.schemas.vacancy import VacancyCreate
+from app.utils.circuit_breaker import HHCircuitBreaker
+from app.utils.rate_limiter import HHPriority, HHRateLimiter
+from app.utils.single_flight import SingleFlight
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class HHVacancyResult:
+    """
+    Результат запроса вакансии к hh.ru
+    vacancy равно None, если hh.ru ответил 304 Not Modified
+    """
+    vacancy: Optional[VacancyCreate]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def not_modified(self) -> bool:
+        return self.vacancy is None
+
+    def validators(self) -> Dict[str, Optional[str]]:
+        """ Валидаторы ответа в виде полей модели Vacancy """
+        return {"hh_etag": self.etag, "hh_last_modified": self.last_modified}
+
+    def to_cache(self) -> Dict[str, Any]:
+        return {
+            "vacancy": self.vacancy.model_dump(mode="json") if self.vacancy else None,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+        }
+
+    @classmethod
+    def from_cache(cls, data: Dict[str, Any]) -> "HHVacancyResult":
+        return cls(
+            vacancy=VacancyCreate(**data["vacancy"]) if data.get("vacancy") else None,
+            etag=data.get("etag"),
+            last_modified=data.get("last_modified"),
+        )
 
 
 class HHParser:
     """
     Класс для работы с API hh.ru
+    Держит долгоживущую keep-alive сессию: TLS-соединения переиспользуются между запросами
     """
-    def __init__(self):
-        self.session = None
+    _instance: Optional["HHParser"] = None
+
+    def __init__(
+        self,
+        rate_limiter: Optional[HHRateLimiter] = None,
+        cache: Optional[HHVacancyCacheRepository] = None,
+        single_flight: Optional[SingleFlight[HHVacancyResult]] = None,
+        circuit_breaker: Optional[HHCircuitBreaker] = None
+    ):
+        self.session: Optional[aiohttp.ClientSession] = None
         self.ssl_context = ssl.create_default_context(cafile=certifi.where())
-        self.connector = aiohttp.TCPConnector(ssl=self.ssl_context)
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.single_flight = single_flight
+        self.circuit_breaker = circuit_breaker
 
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession(connector=self.connector)
+        await self.start()
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def start(self) -> None:
+        """ Создание пула соединений и HTTP-сессии """
+        if self.session is not None and not self.session.closed:
+            return
+
+        connector = aiohttp.TCPConnector(
+            ssl=self.ssl_context,
+            limit=settings.HH_POOL_LIMIT,
+            limit_per_host=settings.HH_POOL_LIMIT_PER_HOST,
+            use_dns_cache=True,
+            ttl_dns_cache=settings.HH_DNS_CACHE_TTL,
+            keepalive_timeout=settings.HH_KEEPALIVE_TIMEOUT,
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=settings.HH_TOTAL_TIMEOUT,
+            sock_connect=settings.HH_CONNECT_TIMEOUT,
+            sock_read=settings.HH_READ_TIMEOUT,
+        )
+        self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    async def close(self) -> None:
+        """ Закрытие HTTP-сессии вместе с пулом соединений """
         if self.session:
             await self.session.close()
         self.session = None
 
-    async def get_vacancy(self, vacancy_id: str) -> VacancyCreate:
+    @classmethod
+    async def startup(cls) -> "HHParser":
+        """ Инициализация общего клиента при старте приложения или воркера """
+        if cls._instance is None:
+            cls._instance = cls(
+                rate_limiter=HHRateLimiter() if settings.HH_RATE_LIMIT_ENABLED else None,
+                cache=HHVacancyCacheRepository() if settings.HH_CACHE_TTL > 0 else None,
+                single_flight=SingleFlight(
+                    "hh_vacancy",
+                    dumps=lambda result: json.dumps(result.to_cache()),
+                    loads=lambda data: HHVacancyResult.from_cache(json.loads(data)),
+                    redis_client=RedisClient.get_client()
+                ) if settings.HH_SINGLE_FLIGHT_ENABLED else None,
+                circuit_breaker=HHCircuitBreaker() if settings.HH_CIRCUIT_ENABLED else None
+            )
+        await cls._instance.start()
+        return cls._instance
+
+    @classmethod
+    async def shutdown(cls) -> None:
+        """ Закрытие общего клиента при остановке приложения или воркера """
+        if cls._instance is not None:
+            await cls._instance.close()
+        cls._instance = None
+
+    @classmethod
+    async def get_instance(cls) -> "HHParser":
+        """ Получение общего клиента, инициализируется при первом обращении """
+        if cls._instance is None or cls._instance.session is None or cls._instance.session.closed:
+            return await cls.startup()
+        return cls._instance
+
+    async def get_vacancy(
+        self,
+        vacancy_id: str,
+        priority: HHPriority = HHPriority.INTERACTIVE,
+        use_cache: bool = True
+    ) -> VacancyCreate:
         """
         Получение данных о вакансии с hh.ru по ID
         """
+        result = await self.fetch_vacancy(vacancy_id, priority=priority, use_cache=use_cache)
+        return result.vacancy
+
+    async def fetch_vacancy(
+        self,
+        vacancy_id: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        priority: HHPriority = HHPriority.INTERACTIVE,
+        use_cache: bool = True
+    ) -> HHVacancyResult:
+        """
+        Условный запрос вакансии с hh.ru по ID
+        Сначала проверяется кэш в Redis (use_cache=False - принудительный запрос к hh.ru).
+        Одновременные запросы одной вакансии с одинаковыми валидаторами объединяются в один.
+        При переданных валидаторах отправляются If-None-Match / If-Modified-Since,
+        ответ 304 возвращается как результат без данных
+        """
+        if use_cache and self.cache:
+            cached = await self.cache.get(vacancy_id)
+            if cached is not None:
+                cached = HHVacancyResult.from_cache(cached)
+                if etag and cached.etag == etag:
+                    return HHVacancyResult(None, cached.etag, cached.last_modified)
+                return cached
+
+        async def request() -> HHVacancyResult:
+            result = await self._request_vacancy(vacancy_id, etag, last_modified, priority)
+            if self.cache and not result.not_modified:
+                await self.cache.set(vacancy_id, result.to_cache())
+            return result
+
+        if self.single_flight is None:
+            return await request()
+
+        validators_digest = hashlib.sha1(f"{etag}|{last_modified}".encode("utf-8")).hexdigest()[:16]
+        return await self.single_flight.run(f"{vacancy_id}:{validators_digest}", request)
+
+    async def is_available(self) -> bool:
+        """ Можно ли обращаться к hh.ru: False, пока выключатель разомкнут """
+        if self.circuit_breaker is None:
+            return True
+        return not await self.circuit_breaker.is_open()
+
+    async def iter_search_pages(
+        self,
+        params: Dict[str, Any],
+        date_from: Optional[datetime] = None,
+        priority: HHPriority = HHPriority.BACKGROUND
+    ) -> AsyncIterator[List[VacancyCreate]]:
+        """
+        Постраничный обход поиска вакансий hh.ru, свежие вакансии первыми
+        Асинхронный генератор: следующая страница запрашивается, когда обработана предыдущая.
+        date_from - только вакансии, опубликованные не раньше этой даты. hh.ru отдает не глубже
+        2000 результатов, поэтому в одном окне не больше HH_SEARCH_MAX_PAGES страниц; при достижении
+        предела обход продолжается окном date_to до самой старой полученной вакансии, пока выдача
+        не будет пройдена целиком. Если окно сузить нельзя - HHParserError
+        """
+        if settings.HH_SEARCH_MAX_PAGES <= 0:
+            logger.warning("HH search disabled: HH_SEARCH_MAX_PAGES is %s", settings.HH_SEARCH_MAX_PAGES)
+            return
+
+        query = {**params, "per_page": settings.HH_SEARCH_PER_PAGE, "order_by": "publication_time"}
+        if date_from is not None:
+            query["date_from"] = self._format_search_date(date_from)
+
+        date_to: Optional[datetime] = None
+        while True:
+            window = {**query, "date_to": self._format_search_date(date_to)} if date_to else query
+            oldest: Optional[datetime] = None
+            page = 0
+            while page < settings.HH_SEARCH_MAX_PAGES:
+                data = await self._guarded(lambda: self._send_search_request({**window, "page": page}, priority))
+                items = data.get("items") or []
+                if not items:
+                    return
+
+                vacancies = [self._parse_search_item(item) for item in items]
+                yield vacancies
+
+                published = [vacancy.published_at for vacancy in vacancies if vacancy.published_at]
+                if published:
+                    oldest = min(published) if oldest is None else min(oldest, *published)
+
+                page += 1
+                if page >= data.get("pages", 0):
+                    return
+
+            if oldest is None or (date_to is not None and oldest >= date_to):
+                raise HHParserError(f"HH search cannot be split below the depth limit for {params}")
+            logger.info(
+                "HH search reached depth limit, %s vacancies found for %s, continuing before %s",
+                data.get("found"), params, oldest
+            )
+            date_to = oldest
+
+    @staticmethod
+    def _format_search_date(value: datetime) -> str:
+        return value.strftime("%Y-%m-%dT%H:%M:%S%z")
+
+    async def _request_vacancy(
+        self,
+        vacancy_id: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        priority: HHPriority
+    ) -> HHVacancyResult:
+        """ Запрос вакансии к API hh.ru через автоматический выключатель """
+        return await self._guarded(lambda: self._send_request(vacancy_id, etag, last_modified, priority))
+
+    async def _guarded(self, send: Callable[[], Awaitable[T]]) -> T:
+        """
+        Запрос к hh.ru через автоматический выключатель
+        При разомкнутом выключателе сразу HHCircuitOpenError; сетевые ошибки, таймауты
+        и ответы 5xx засчитываются как сбои hh.ru. Если запрос не был отправлен (локальный
+        ограничитель частоты, отмена задачи), состояние не меняется, пробный запрос освобождается
+        """
+        if self.circuit_breaker is None:
+            return await send()
+
+        probe = await self.circuit_breaker.before_call()
+        try:
+            result = await send()
+        except HHUnavailableError:
+            await self.circuit_breaker.record_failure(probe)
+            raise
+        except HHLocalRateLimitError:
+            await self.circuit_breaker.release(probe)
+            raise
+        except HHParserError:
+            # hh.ru ответил (404, 429 и т.п.) - сервис доступен
+            await self.circuit_breaker.record_success(probe)
+            raise
+        except BaseException:
+            await self.circuit_breaker.release(probe)
+            raise
+        await self.circuit_breaker.record_success(probe)
+        return result
+
+    async def _send_request(
+        self,
+        vacancy_id: str,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        priority: HHPriority
+    ) -> HHVacancyResult:
+        """ HTTP-запрос вакансии к API hh.ru, условный при переданных валидаторах """
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        async def handle(response: aiohttp.ClientResponse) -> HHVacancyResult:
+            response_etag = response.headers.get("ETag", etag)
+            response_last_modified = response.headers.get("Last-Modified", last_modified)
+
+            if response.status == 304:
+                return HHVacancyResult(None, response_etag, response_last_modified)
+            elif response.status == 200:
+                data = await response.json()
+                return HHVacancyResult(self._parse_vacancy(data), response_etag, response_last_modified)
+            elif response.status in (404, 410):
+                raise HHVacancyNotFoundError(f"Vacancy {vacancy_id} not found on HH.ru. Status: {response.status}")
+            elif response.status >= 500:
+                raise HHUnavailableError(f"Failed to fetch vacancy from HH.ru. Status: {response.status}")
+            raise HHParserError(f"Failed to fetch vacancy from HH.ru. Status: {response.status}")
+
+        return await self._get(f"{settings.HH_API_URL}{vacancy_id}", priority, handle, headers=headers)
+
+    async def _send_search_request(self, params: Dict[str, Any], priority: HHPriority) -> Dict[str, Any]:
+        """ HTTP-запрос одной страницы поиска вакансий hh.ru """
+        async def handle(response: aiohttp.ClientResponse) -> Dict[str, Any]:
+            if response.status == 200:
+                return await response.json()
+            elif response.status >= 500:
+                raise HHUnavailableError(f"Failed to search vacancies on HH.ru. Status: {response.status}")
+            raise HHParserError(f"Failed to search vacancies on HH.ru. Status: {response.status}")
+
+        query = {key: str(value) for key, value in params.items()}
+        return await self._get(settings.HH_SEARCH_URL, priority, handle, params=query)
+
+    async def _get(
+        self,
+        url: str,
+        priority: HHPriority,
+        handle: Callable[[aiohttp.ClientResponse], Awaitable[T]],
+        headers: Optional[Dict[str, str]] = None,
+        params: Optional[Dict[str, str]] = None
+    ) -> T:
+        """
+        GET-запрос к hh.ru через ограничитель частоты, ответ (кроме 429) разбирает handle
+        Фоновые запросы после 429 повторяются (не более HH_RATE_LIMIT_RETRIES раз),
+        интерактивные сразу завершаются HHRateLimitError
+        """
         if not self.session:
             raise RuntimeError("Session is not initialized.")
 
-        async with self.session.get(f"{settings.HH_API_URL}{vacancy_id}") as response:
-            if response.status == 200:
-                data = await response.json()
+        attempt = 0
+        while True:
+            if self.rate_limiter:
+                await self.rate_limiter.acquire(priority)
+
+            try:
+                async with self.session.get(url, headers=headers, params=params) as response:
+                    if response.status != 429:
+                        return await handle(response)
+                    retry_after = await self._handle_throttled(response.headers.get("Retry-After"))
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                raise HHUnavailableError(f"HH.ru request failed: {e!r}") from e
 
-                published_at = data.get("published_at")
-                if published_at == "":
-                    published_at = None
-
-                # Извлечение данных из ответа API hh.ru
-                return VacancyCreate(
-                    title=data.get("name", ""),
-                    company_name=data.get("employer", {}).get("name", ""),
-                    company_address=data.get("address", {}).get("raw", "") if data.get("address") else "",
-                    company_logo=data.get("employer", {}).get("logo_urls", {}).get("original", "") \
-                        if data.get("employer", {}).get("logo_urls") else "",
-                    description=data.get("description", ""),
-                    status="active",
-                    hh_id=str(data.get("id", "")),
-                    published_at=published_at
-                )
-            else:
-                raise Exception(f"Failed to fetch vacancy from HH.ru. Status: {response.status}")
+            if priority != HHPriority.BACKGROUND or attempt >= settings.HH_RATE_LIMIT_RETRIES:
+                raise HHRateLimitError(retry_after)
+            attempt += 1
+            if not self.rate_limiter:
+                await asyncio.sleep(retry_after)
+
+    async def _handle_throttled(self, retry_after_header: Optional[str]) -> float:
+        """ Обработка ответа 429: пауза для всех процессов через ограничитель, возвращает время ожидания """
+        try:
+            retry_after = float(retry_after_header) if retry_after_header else None
+        except ValueError:
+            retry_after = None
+
+        if self.rate_limiter:
+            return await self.rate_limiter.report_throttled(retry_after)
+        return retry_after or settings.HH_RATE_LIMIT_BACKOFF_BASE
+
+    @staticmethod
+    def _parse_vacancy(data: Dict[str, Any]) -> VacancyCreate:
+        """ Извлечение данных из ответа API hh.ru """
+        published_at = data.get("published_at")
+        if published_at == "":
+            published_at = None
+
+        return VacancyCreate(
+            title=data.get("name", ""),
+            company_name=data.get("employer", {}).get("name", ""),
+            company_address=data.get("address", {}).get("raw", "") if data.get("address") else "",
+            company_logo=data.get("employer", {}).get("logo_urls", {}).get("original", "") \
+                if data.get("employer", {}).get("logo_urls") else "",
+            description=data.get("description", ""),
+            status="active",
+            hh_id=str(data.get("id", "")),
+            published_at=published_at
+        )
 
     @classmethod
-    async def get_vacancy_from_hh(cls, vacancy_id: str) -> VacancyCreate:
+    def _parse_search_item(cls, item: Dict[str, Any]) -> VacancyCreate:
         """
-        Статический метод для использования без контекстного менеджера
-        Временная сессия для одного запроса
+        Извлечение данных из элемента выдачи поиска hh.ru
+        Полного описания в выдаче нет - вместо него фрагменты требований и обязанностей
         """
-        parser = cls()
-        await parser.__aenter__()
-        try:
-            return await parser.get_vacancy(vacancy_id)
-        finally:
-            await parser.__aexit__(None, None, None)
+        snippet = item.get("snippet") or {}
+        description = "\n".join(part for part in (snippet.get("requirement"), snippet.get("responsibility")) if part)
+        return cls._parse_vacancy({**item, "description": description})
+
+    @classmethod
+    async def get_vacancy_from_hh(
+        cls,
+        vacancy_id: str,
+        priority: HHPriority = HHPriority.INTERACTIVE,
+        use_cache: bool = True
+    ) -> VacancyCreate:
+        """
+        Метод для использования без контекстного менеджера
+        Запрос выполняется через общий клиент процесса
+        """
+        parser = await cls.get_instance()
+        return await parser.get_vacancy(vacancy_id, priority, use_cache)
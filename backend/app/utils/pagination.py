@@ -0,0 +1,107 @@
+import base64
+import binascii
+import enum
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+
+class VacancySortKey(str, enum.Enum):
+    """ Ключ сортировки списка вакансий при постраничной выдаче по курсору """
+    CREATED_AT = "created_at"
+    PUBLISHED_AT = "published_at"
+
+
+class SortOrder(str, enum.Enum):
+    """ Направление сортировки списка """
+    ASC = "asc"
+    DESC = "desc"
+
+
+class InvalidCursorError(ValueError):
+    """ Курсор поврежден или выдан для другой сортировки """
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """
+    Позиция в списке: значение ключа сортировки и id граничной записи
+    backward - курсор на предыдущую страницу (записи перед граничной)
+    """
+    sort: VacancySortKey
+    value: Optional[datetime]
+    id: int
+    backward: bool = False
+    order: SortOrder = SortOrder.DESC
+
+
+def _encode(payload: Dict[str, Any]) -> str:
+    """ Непрозрачное представление курсора для клиента (base64url от JSON) """
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode(token: str) -> Dict[str, Any]:
+    raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    payload = json.loads(raw)
+    if not isinstance(payload, dict):
+        raise TypeError("cursor payload is not an object")
+    return payload
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    """ Курсор списка вакансий для клиента """
+    return _encode({
+        "s": cursor.sort.value,
+        "v": cursor.value.isoformat() if cursor.value is not None else None,
+        "i": cursor.id,
+        "b": int(cursor.backward),
+        "o": cursor.order.value,
+    })
+
+
+def decode_cursor(token: str) -> Cursor:
+    """ Разбор курсора списка вакансий, полученного от клиента """
+    try:
+        payload = _decode(token)
+        return Cursor(
+            sort=VacancySortKey(payload["s"]),
+            value=datetime.fromisoformat(payload["v"]) if payload["v"] is not None else None,
+            id=int(payload["i"]),
+            backward=bool(payload["b"]),
+            order=SortOrder(payload["o"]),
+        )
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+        raise InvalidCursorError(str(e)) from e
+
+
+@dataclass(frozen=True)
+class SearchCursor:
+    """
+    Позиция в результатах полнотекстового поиска: релевантность и id последней выданной записи
+    query - отпечаток поискового запроса, для которого выдан курсор
+    """
+    query: str
+    rank: float
+    id: int
+
+
+def query_fingerprint(query: str) -> str:
+    """ Короткий отпечаток поискового запроса для проверки курсора """
+    return hashlib.sha256(query.strip().lower().encode()).hexdigest()[:16]
+
+
+def encode_search_cursor(cursor: SearchCursor) -> str:
+    """ Курсор результатов поиска для клиента """
+    return _encode({"q": cursor.query, "r": cursor.rank, "i": cursor.id})
+
+
+def decode_search_cursor(token: str) -> SearchCursor:
+    """ Разбор курсора результатов поиска, полученного от клиента """
+    try:
+        payload = _decode(token)
+        return SearchCursor(query=str(payload["q"]), rank=float(payload["r"]), id=int(payload["i"]))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+        raise InvalidCursorError(str(e)) from e
@@ -0,0 +1,118 @@
+import asyncio
+import enum
+import logging
+import time
+from typing import Optional
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis_client import RedisClient
+from app.exceptions.hh_exceptions import HHLocalRateLimitError
+
+
+logger = logging.getLogger(__name__)
+
+
+class HHPriority(str, enum.Enum):
+    """ Приоритет запроса к hh.ru """
+    INTERACTIVE = "interactive"
+    BACKGROUND = "background"
+
+
+# Token bucket с учетом паузы после 429. Время берется из Redis, чтобы процессы не зависели от своих часов.
+# Возвращает 0, если токен получен, иначе - сколько миллисекунд подождать
+_ACQUIRE_SCRIPT = """
+local pause_ttl = redis.call('PTTL', KEYS[2])
+if pause_ttl > 0 then
+    return pause_ttl
+end
+
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local reserve = tonumber(ARGV[3])
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local wait = 0
+if tokens - 1 >= reserve then
+    tokens = tokens - 1
+else
+    wait = math.ceil((reserve + 1 - tokens) / rate)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate) * 2)
+return wait
+"""
+
+
+class HHRateLimiter:
+    """
+    Распределенный ограничитель частоты запросов к hh.ru
+    Общий token bucket в Redis для API и воркеров taskiq. Фоновые запросы не могут занять
+    резерв токенов для интерактивных, после 429 все процессы выжидают паузу с экспоненциальным ростом
+    """
+    BUCKET_KEY = "hh_rate:bucket"
+    PAUSE_KEY = "hh_rate:pause"
+    STRIKES_KEY = "hh_rate:strikes"
+
+    def __init__(self, redis_client: Optional[Redis] = None):
+        self._redis = redis_client or RedisClient.get_client()
+        self._acquire_script = self._redis.register_script(_ACQUIRE_SCRIPT)
+        self._rate_per_ms = settings.HH_RATE_LIMIT_PER_SECOND / 1000
+        self._capacity = settings.HH_RATE_LIMIT_BURST
+        self._interactive_reserve = self._capacity * settings.HH_RATE_LIMIT_INTERACTIVE_RESERVE
+
+    async def acquire(self, priority: HHPriority = HHPriority.INTERACTIVE) -> None:
+        """
+        Получение разрешения на один запрос
+        Интерактивный запрос ждет не дольше HH_RATE_LIMIT_MAX_WAIT, затем HHLocalRateLimitError
+        """
+        reserve = self._interactive_reserve if priority == HHPriority.BACKGROUND else 0
+        deadline = time.monotonic() + settings.HH_RATE_LIMIT_MAX_WAIT
+
+        while True:
+            try:
+                wait_ms = await self._acquire_script(
+                    keys=[self.BUCKET_KEY, self.PAUSE_KEY],
+                    args=[self._rate_per_ms, self._capacity, reserve]
+                )
+            except RedisError as e:
+                # Redis недоступен - не блокируем работу с hh.ru
+                logger.warning("HH rate limiter unavailable, request is not limited: %s", e)
+                return
+
+            if wait_ms <= 0:
+                return
+
+            wait = wait_ms / 1000
+            if priority == HHPriority.INTERACTIVE and time.monotonic() + wait > deadline:
+                raise HHLocalRateLimitError(wait)
+            await asyncio.sleep(wait)
+
+    async def report_throttled(self, retry_after: Optional[float] = None) -> float:
+        """
+        Регистрация ответа 429 от hh.ru: пауза для всех процессов
+        Длительность - Retry-After, если он есть, иначе экспоненциально от числа 429 подряд
+        """
+        try:
+            strikes = await self._redis.incr(self.STRIKES_KEY)
+            await self._redis.expire(self.STRIKES_KEY, int(settings.HH_RATE_LIMIT_BACKOFF_MAX * 5))
+
+            if retry_after is None:
+                retry_after = min(
+                    settings.HH_RATE_LIMIT_BACKOFF_BASE * 2 ** (strikes - 1),
+                    settings.HH_RATE_LIMIT_BACKOFF_MAX
+                )
+            await self._redis.set(self.PAUSE_KEY, 1, px=max(int(retry_after * 1000), 1))
+        except RedisError as e:
+            logger.warning("HH rate limiter unavailable, throttling is not shared: %s", e)
+
+        return retry_after or settings.HH_RATE_LIMIT_BACKOFF_BASE
@@ -0,0 +1,7 @@
+# Снятие блокировки только ее владельцем. KEYS: блокировка, ARGV: значение владельца
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
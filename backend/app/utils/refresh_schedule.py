@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from app.core.config import settings
+
+
+# Обновлений без изменений подряд, после которых интервал перестает расти
+MAX_BACKOFF_STEPS = 3
+
+
+def next_refresh_at(
+    now: datetime,
+    status: Optional[str],
+    published_at: Optional[datetime],
+    unchanged_refreshes: int = 0
+) -> datetime:
+    """
+    Время следующего обновления вакансии с hh.ru
+    Базовый интервал зависит от возраста и статуса: свежие вакансии обновляются чаще,
+    устаревшие - редко. Каждое обновление без изменений подряд удваивает интервал
+    (не больше HH_REFRESH_INTERVAL_MAX), изменение содержимого сбрасывает его
+    """
+    if status == "outdated":
+        return now + timedelta(seconds=settings.HH_REFRESH_INTERVAL_OUTDATED)
+
+    if published_at is not None and published_at.tzinfo is None:
+        published_at = published_at.replace(tzinfo=timezone.utc)
+    age = now - published_at if published_at else None
+    if age is not None and age < timedelta(days=1):
+        interval = settings.HH_REFRESH_INTERVAL_FRESH
+    elif age is None or age < timedelta(weeks=1):
+        interval = settings.HH_REFRESH_INTERVAL_ACTIVE
+    else:
+        interval = settings.HH_REFRESH_INTERVAL_OLD
+
+    interval = min(
+        interval * 2 ** min(unchanged_refreshes, MAX_BACKOFF_STEPS),
+        max(settings.HH_REFRESH_INTERVAL_MAX, interval)
+    )
+    return now + timedelta(seconds=interval)
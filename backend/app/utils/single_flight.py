@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import Awaitable, Callable, Dict, Generic, Optional, TypeVar
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.utils.redis_scripts import RELEASE_SCRIPT
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight(Generic[T]):
+    """
+    Объединение одновременных вызовов с одинаковым ключом в один
+    Внутри процесса ожидающие получают общий результат одной задачи. Между процессами
+    лидер выбирается короткой блокировкой в Redis и передает результат остальным через Redis
+    под ключом со своим токеном, чтобы ведомые не прочитали результат предыдущего лидера
+    """
+    LOCK_PREFIX = "single_flight:lock"
+    RESULT_PREFIX = "single_flight:result"
+
+    def __init__(
+        self,
+        namespace: str,
+        dumps: Callable[[T], str],
+        loads: Callable[[str], T],
+        redis_client: Optional[Redis] = None
+    ):
+        self._namespace = namespace
+        self._dumps = dumps
+        self._loads = loads
+        self._redis = redis_client
+        self._release_script = redis_client.register_script(RELEASE_SCRIPT) if redis_client else None
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """ Выполнение fn не более одного раза для всех одновременных вызовов с ключом key """
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run_distributed(key, fn))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: отмена одного ожидающего не отменяет загрузку для остальных
+        return await asyncio.shield(task)
+
+    async def _run_distributed(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """ Выполнение fn лидером среди процессов, остальные ждут переданный результат """
+        if self._redis is None:
+            return await fn()
+
+        lock_key = f"{self.LOCK_PREFIX}:{self._namespace}:{key}"
+        token = uuid.uuid4().hex
+
+        try:
+            acquired = await self._redis.set(lock_key, token, nx=True, px=int(settings.HH_SINGLE_FLIGHT_LOCK_TTL * 1000))
+            leader_token = None if acquired else await self._redis.get(lock_key)
+        except RedisError as e:
+            logger.warning("Single-flight lock unavailable, running without coordination: %s", e)
+            return await fn()
+
+        if acquired:
+            try:
+                result = await fn()
+                try:
+                    await self._redis.set(
+                        self._result_key(key, token), self._dumps(result), ex=settings.HH_SINGLE_FLIGHT_RESULT_TTL
+                    )
+                except RedisError as e:
+                    # Ведомые не получат результат и выполнят fn сами
+                    logger.warning("Single-flight result publish failed: %s", e)
+                return result
+            finally:
+                await self._release(lock_key, token)
+
+        result = await self._wait_for_leader(key, lock_key, leader_token.decode()) if leader_token else None
+        if result is not None:
+            return result
+        # Лидер не передал результат (ошибка, истекшая блокировка или уже завершился) - выполняем сами
+        return await fn()
+
+    async def _wait_for_leader(self, key: str, lock_key: str, leader_token: str) -> Optional[T]:
+        """ Ожидание результата лидера leader_token, None - если лидер завершился без результата """
+        result_key = self._result_key(key, leader_token)
+        deadline = time.monotonic() + settings.HH_SINGLE_FLIGHT_WAIT
+        try:
+            while time.monotonic() < deadline:
+                await asyncio.sleep(settings.HH_SINGLE_FLIGHT_POLL_INTERVAL)
+                published = await self._redis.get(result_key)
+                if published is not None:
+                    return self._loads(published)
+                current = await self._redis.get(lock_key)
+                if current is None or current.decode() != leader_token:
+                    # Результат мог появиться между двумя чтениями
+                    published = await self._redis.get(result_key)
+                    return self._loads(published) if published is not None else None
+        except RedisError as e:
+            logger.warning("Single-flight result unavailable: %s", e)
+        return None
+
+    def _result_key(self, key: str, token: str) -> str:
+        return f"{self.RESULT_PREFIX}:{self._namespace}:{key}:{token}"
+
+    async def _release(self, lock_key: str, token: str) -> None:
+        try:
+            await self._release_script(keys=[lock_key], args=[token])
+        except RedisError as e:
+            logger.warning("Single-flight lock release failed: %s", e)
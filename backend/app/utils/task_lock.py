@@ -0,0 +1,224 @@
+import asyncio
+import functools
+import json
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis_client import RedisClient
+from app.utils.redis_scripts import RELEASE_SCRIPT
+
+
+logger = logging.getLogger(__name__)
+
+# Продление аренды только ее владельцем
+_RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Снятие блокировки владельцем, если повтор не запрошен; иначе флаг повтора снимается, блокировка остается.
+# KEYS: блокировка, флаг повтора. Возвращает 1 - повтор, 0 - блокировка снята, -1 - блокировка потеряна
+_RELEASE_OR_RERUN_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return -1
+end
+if redis.call('DEL', KEYS[2]) == 1 then
+    return 1
+end
+redis.call('DEL', KEYS[1])
+return 0
+"""
+
+# Захват блокировки, а если она занята - запрос повтора у владельца; атомарно относительно снятия блокировки.
+# KEYS: блокировка, флаг повтора. Возвращает 1 - блокировка захвачена, 0 - запрошен повтор
+_ACQUIRE_OR_REQUEST_RERUN_SCRIPT = """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'PX', ARGV[2]) then
+    redis.call('DEL', KEYS[2])
+    return 1
+end
+redis.call('SET', KEYS[2], 1)
+return 0
+"""
+
+
+class TaskLock:
+    """
+    Распределенная блокировка запуска задачи с арендой в Redis
+    Блокировка выдается на TASK_LOCK_TTL и продлевается фоновым heartbeat, пока задача работает.
+    Если процесс упал, аренда истекает сама и следующий запуск не ждет
+    """
+    KEY_PREFIX = "task_lock"
+    PENDING_PREFIX = "task_lock_pending"
+
+    def __init__(self, name: str, ttl: Optional[int] = None, redis_client: Optional[Redis] = None):
+        self.name = name
+        self._ttl_ms = int((ttl or settings.TASK_LOCK_TTL) * 1000)
+        self._redis = redis_client or RedisClient.get_client()
+        self._renew_script = self._redis.register_script(_RENEW_SCRIPT)
+        self._release_script = self._redis.register_script(RELEASE_SCRIPT)
+        self._release_or_rerun_script = self._redis.register_script(_RELEASE_OR_RERUN_SCRIPT)
+        self._acquire_or_request_rerun_script = self._redis.register_script(_ACQUIRE_OR_REQUEST_RERUN_SCRIPT)
+        self._key = f"{self.KEY_PREFIX}:{name}"
+        self._pending_key = f"{self.PENDING_PREFIX}:{name}"
+        self._value: Optional[str] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+
+    async def acquire(self) -> bool:
+        """ Захват блокировки; False - задача уже выполняется в другом процессе """
+        value = self._new_value()
+        if not await self._redis.set(self._key, value, nx=True, px=self._ttl_ms):
+            return False
+
+        # Запросы повтора, пришедшие до захвата, покрываются этим запуском
+        await self._redis.delete(self._pending_key)
+        self._start(value)
+        return True
+
+    async def acquire_or_request_rerun(self) -> bool:
+        """
+        Захват блокировки; если она занята - просьба владельцу выполнить задачу еще раз после текущего запуска
+        Выполняется одним скриптом, поэтому владелец либо увидит запрос в release_or_rerun,
+        либо уже снял блокировку и она захватывается здесь. False - повтор запрошен
+        """
+        value = self._new_value()
+        if not await self._acquire_or_request_rerun_script(
+            keys=[self._key, self._pending_key], args=[value, self._ttl_ms]
+        ):
+            return False
+        self._start(value)
+        return True
+
+    async def release(self) -> None:
+        """ Остановка heartbeat и снятие блокировки """
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        if self._value is None:
+            return
+        try:
+            await self._release_script(keys=[self._key], args=[self._value])
+        except RedisError as e:
+            logger.warning("Task lock %s release failed, it expires by TTL: %s", self.name, e)
+        self._value = None
+
+    async def release_or_rerun(self) -> bool:
+        """
+        Атомарное снятие блокировки, если повтор не запрошен
+        True - повтор был запрошен (флаг снят), блокировка остается за владельцем для следующего запуска.
+        Запрос повтора не теряется: пришедший до снятия блокировки виден здесь,
+        после снятия acquire_or_request_rerun захватывает блокировку сам
+        """
+        if self._value is None:
+            return False
+        try:
+            rerun = await self._release_or_rerun_script(keys=[self._key, self._pending_key], args=[self._value])
+        except RedisError as e:
+            logger.warning("Task lock %s release failed, it expires by TTL: %s", self.name, e)
+            return False
+        if rerun == 1:
+            return True
+        if rerun == -1:
+            logger.error("Task lock %s lost before release", self.name)
+        self._value = None
+        return False
+
+    def _new_value(self) -> str:
+        return json.dumps({
+            "token": uuid.uuid4().hex,
+            "owner": f"{socket.gethostname()}:{os.getpid()}",
+            "acquired_at": datetime.now(timezone.utc).isoformat(),
+        })
+
+    def _start(self, value: str) -> None:
+        """ Блокировка захвачена: запоминается значение владельца, запускается heartbeat """
+        self._value = value
+        self._heartbeat = asyncio.create_task(self._renew_forever())
+
+    async def _renew_forever(self) -> None:
+        while True:
+            await asyncio.sleep(settings.TASK_LOCK_HEARTBEAT_INTERVAL)
+            try:
+                renewed = await self._renew_script(keys=[self._key], args=[self._value, self._ttl_ms])
+            except RedisError as e:
+                logger.warning("Task lock %s heartbeat failed: %s", self.name, e)
+                continue
+            if not renewed:
+                logger.error("Task lock %s lost, another run may start concurrently", self.name)
+                return
+
+
+class TaskLockMonitor:
+    """ Просмотр блокировок задач для мониторинга """
+    def __init__(self, redis_client: Optional[Redis] = None):
+        self._redis = redis_client or RedisClient.get_client()
+
+    async def get_status(self) -> List[Dict[str, Any]]:
+        """ Текущие блокировки задач: владелец, время захвата, остаток аренды """
+        locks = []
+        async for key in self._redis.scan_iter(match=f"{TaskLock.KEY_PREFIX}:*"):
+            key = key.decode()
+            name = key[len(TaskLock.KEY_PREFIX) + 1:]
+            async with self._redis.pipeline(transaction=False) as pipe:
+                pipe.get(key)
+                pipe.pttl(key)
+                pipe.exists(f"{TaskLock.PENDING_PREFIX}:{name}")
+                value, ttl_ms, pending = await pipe.execute()
+            if value is None:
+                continue
+            info = json.loads(value)
+            locks.append({
+                "name": name,
+                "owner": info.get("owner"),
+                "acquired_at": info.get("acquired_at"),
+                "expires_in": max(ttl_ms, 0) / 1000,
+                "rerun_requested": bool(pending),
+            })
+        return sorted(locks, key=lambda lock: lock["name"])
+
+    async def is_running(self, name_prefix: str) -> bool:
+        """ Удерживается ли хотя бы одна блокировка, имя которой начинается с name_prefix """
+        async for _ in self._redis.scan_iter(match=f"{TaskLock.KEY_PREFIX}:{name_prefix}*"):
+            return True
+        return False
+
+
+def single_run(name: str, ttl: Optional[int] = None, coalesce: bool = False):
+    """
+    Декоратор задачи taskiq: одновременно выполняется не более одного запуска с блокировкой name
+    Пересекающийся запуск пропускается; с coalesce=True он вместо этого просит текущий
+    запуск выполниться еще раз по завершении, так что запросы не теряются и не дублируются
+    """
+    def decorator(fn: Callable[..., Awaitable[Any]]):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            lock = TaskLock(name, ttl)
+            try:
+                acquired = await (lock.acquire_or_request_rerun() if coalesce else lock.acquire())
+            except RedisError as e:
+                logger.warning("Task lock %s unavailable, running without lock: %s", name, e)
+                return await fn(*args, **kwargs)
+
+            if not acquired:
+                logger.info("Task %s is already running, run %s", name, "coalesced" if coalesce else "skipped")
+                return {"status": "coalesced" if coalesce else "skipped", "lock": name}
+
+            try:
+                result = await fn(*args, **kwargs)
+                while coalesce and await lock.release_or_rerun():
+                    result = await fn(*args, **kwargs)
+                return result
+            finally:
+                await lock.release()
+
+        return wrapper
+    return decorator
@@ -3,6 +3,8 @@ import sys
 sys.path.append(os.getcwd())
 
 import pytest
+import pytest_asyncio
+from fakeredis import FakeAsyncRedis
 from datetime import datetime, timezone
 from fastapi.testclient import TestClient
 from unittest.mock import MagicMock, AsyncMock
@@ -79,3 +81,11 @@ def mock_auth_service(mock_db, mock_user):
     service.refresh_token.return_value = {"access_token": "new_mock_access_token", "token_type": "bearer"}
     service.get_current_user_with_token.return_value = mock_user
     return service
+
+
+@pytest_asyncio.fixture
+async def fake_redis():
+    """ Асинхронный Redis в памяти (fakeredis, Lua-скрипты через lupa) """
+    redis_client = FakeAsyncRedis()
+    yield redis_client
+    await redis_client.aclose()
@@ -0,0 +1,64 @@
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+from app.main import app
+from app.api.deps import get_current_active_user, get_hh_search_query_service
+from app.services.hh_search_query_service import HHSearchQueryService
+
+
+@pytest.fixture
+def mock_search_query():
+    """ Мок сохраненного поискового запроса """
+    query = MagicMock()
+    query.id = 1
+    query.name = "python-moscow"
+    query.params = {"text": "python", "area": "1"}
+    query.is_active = True
+    query.watermark = None
+    query.last_crawled_at = None
+    query.created_at = datetime.now(timezone.utc)
+    return query
+
+
+# Тест создания поискового запроса
+@pytest.mark.asyncio
+async def test_create_search_query(client, mock_user, mock_search_query):
+    query_service = AsyncMock(spec=HHSearchQueryService)
+    query_service.create_query.return_value = mock_search_query
+
+    async def override_get_current_active_user():
+        return mock_user
+
+    app.dependency_overrides[get_current_active_user] = override_get_current_active_user
+    app.dependency_overrides[get_hh_search_query_service] = lambda: query_service
+
+    response = client.post(
+        "/api/v1/hh-search-queries/",
+        json={"name": "python-moscow", "params": {"text": "python", "area": "1"}}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["name"] == "python-moscow"
+    assert response.json()["params"] == {"text": "python", "area": "1"}
+
+    query_service.create_query.assert_called_once()
+
+
+# Тест получения списка поисковых запросов
+@pytest.mark.asyncio
+async def test_list_search_queries(client, mock_user, mock_search_query):
+    query_service = AsyncMock(spec=HHSearchQueryService)
+    query_service.get_queries.return_value = [mock_search_query]
+
+    async def override_get_current_active_user():
+        return mock_user
+
+    app.dependency_overrides[get_current_active_user] = override_get_current_active_user
+    app.dependency_overrides[get_hh_search_query_service] = lambda: query_service
+
+    response = client.get("/api/v1/hh-search-queries/")
+
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    assert response.json()[0]["id"] == 1
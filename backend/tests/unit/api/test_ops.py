@@ -0,0 +1,74 @@
+import pytest
+from unittest.mock import AsyncMock
+
+from app.main import app
+from app.api.deps import get_current_active_user, get_hh_circuit_breaker, get_task_lock_monitor
+from app.utils.circuit_breaker import HHCircuitBreaker
+from app.utils.task_lock import TaskLockMonitor
+
+
+# Тест получения состояния выключателя hh.ru
+@pytest.mark.asyncio
+async def test_get_hh_circuit_status(client, mock_user):
+    circuit_breaker = AsyncMock(spec=HHCircuitBreaker)
+    circuit_breaker.get_state.return_value = {"state": "open", "failures": 5, "retry_after": 12.5}
+
+    async def override_get_current_active_user():
+        return mock_user
+
+    app.dependency_overrides[get_current_active_user] = override_get_current_active_user
+    app.dependency_overrides[get_hh_circuit_breaker] = lambda: circuit_breaker
+
+    response = client.get("/api/v1/ops/hh-circuit")
+
+    assert response.status_code == 200
+    assert response.json() == {"state": "open", "failures": 5, "retry_after": 12.5}
+
+    circuit_breaker.get_state.assert_called_once()
+
+
+# Тест состояния выключателя при недоступном Redis
+@pytest.mark.asyncio
+async def test_get_hh_circuit_status_redis_unavailable(client, mock_user):
+    circuit_breaker = AsyncMock(spec=HHCircuitBreaker)
+    circuit_breaker.get_state.return_value = None
+
+    async def override_get_current_active_user():
+        return mock_user
+
+    app.dependency_overrides[get_current_active_user] = override_get_current_active_user
+    app.dependency_overrides[get_hh_circuit_breaker] = lambda: circuit_breaker
+
+    response = client.get("/api/v1/ops/hh-circuit")
+
+    assert response.status_code == 503
+
+
+# Тест получения блокировок задач по расписанию
+@pytest.mark.asyncio
+async def test_get_task_locks(client, mock_user):
+    monitor = AsyncMock(spec=TaskLockMonitor)
+    monitor.get_status.return_value = [{
+        "name": "hh_refresh",
+        "owner": "worker-1:42",
+        "acquired_at": "2025-03-15T10:00:00+00:00",
+        "expires_in": 45.0,
+        "rerun_requested": False
+    }]
+
+    async def override_get_current_active_user():
+        return mock_user
+
+    app.dependency_overrides[get_current_active_user] = override_get_current_active_user
+    app.dependency_overrides[get_task_lock_monitor] = lambda: monitor
+
+    response = client.get("/api/v1/ops/task-locks")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 1
+    assert data[0]["name"] == "hh_refresh"
+    assert data[0]["owner"] == "worker-1:42"
+    assert data[0]["expires_in"] == 45.0
+
+    monitor.get_status.assert_called_once()
@@ -1,8 +1,17 @@
 import pytest
 from fastapi import HTTPException
+from unittest.mock import AsyncMock
 
 from app.main import app
-from app.api.deps import get_current_active_user, get_vacancy_service
+from app.api.deps import (
+    get_current_active_user, get_import_job_service, get_refresh_job_service, get_vacancy_bulk_service,
+    get_vacancy_service
+)
+from app.schemas.vacancy import VacancyListFilter
+from app.services.import_job_service import ImportJobService
+from app.services.refresh_job_service import RefreshJobService
+from app.services.vacancy_bulk_service import VacancyBulkService
+from app.utils.pagination import SortOrder
 
 
 # Тест создания вакансии
@@ -165,7 +174,181 @@ async def test_refresh_vacancy_from_hh_success(client, mock_user, mock_vacancy_s
     assert response.json()["company_name"] == "Test Company"
 
     # Проверяем, что сервис был вызван с правильными параметрами
-    mock_vacancy_service.refresh_vacancy_from_hh.assert_called_once_with(1)
+    mock_vacancy_service.refresh_vacancy_from_hh.assert_called_once_with(1, False)
+
+
+# Тест обновления вакансии с HH.ru в обход кэша
+@pytest.mark.asyncio
+async def test_refresh_vacancy_from_hh_force(client, mock_user, mock_vacancy_service):
+    async def override_get_current_active_user():
+        return mock_user
+
+    async def override_get_vacancy_service():
+        return mock_vacancy_service
+
+    app.dependency_overrides[get_current_active_user] = override_get_current_active_user
+    app.dependency_overrides[get_vacancy_service] = override_get_vacancy_service
+
+    response = client.post(
+        "/api/v1/vacancy/refresh-from-hh/1?force=true"
+    )
+
+    assert response.status_code == 200
+
+    # Проверяем, что сервис был вызван с правильными параметрами
+    mock_vacancy_service.refresh_vacancy_from_hh.assert_called_once_with(1, True)
+
+
+# Тест фонового обновления вакансии с HH.ru
+@pytest.mark.asyncio
+async def test_refresh_vacancy_from_hh_background(client, mock_user, mock_vacancy_service):
+    refresh_job_service = AsyncMock(spec=RefreshJobService)
+    refresh_job_service.enqueue.return_value = "job-1"
+
+    async def override_get_current_active_user():
+        return mock_user
+
+    async def override_get_vacancy_service():
+        return mock_vacancy_service
+
+    app.dependency_overrides[get_current_active_user] = override_get_current_active_user
+    app.dependency_overrides[get_vacancy_service] = override_get_vacancy_service
+    app.dependency_overrides[get_refresh_job_service] = lambda: refresh_job_service
+
+    response = client.post(
+        "/api/v1/vacancy/refresh-from-hh/1?background=true"
+    )
+
+    assert response.status_code == 202
+    assert response.json() == {"job_id": "job-1", "status_url": "/api/v1/vacancy/refresh-jobs/job-1"}
+
+    # Запрос к HH.ru не выполняется в обработчике API
+    refresh_job_service.enqueue.assert_called_once_with(1, False)
+    mock_vacancy_service.refresh_vacancy_from_hh.assert_not_called()
+
+
+# Тест получения состояния фонового обновления
+@pytest.mark.asyncio
+async def test_get_refresh_job_status(client, mock_user):
+    refresh_job_service = AsyncMock(spec=RefreshJobService)
+    refresh_job_service.get_status.return_value = {
+        "job_id": "job-1",
+        "state": "failed",
+        "progress": {"vacancy_id": 1, "stage": "failed"},
+        "status_code": 404,
+        "error": "Вакансия с ID 1 не найдена"
+    }
+
+    async def override_get_current_active_user():
+        return mock_user
+
+    app.dependency_overrides[get_current_active_user] = override_get_current_active_user
+    app.dependency_overrides[get_refresh_job_service] = lambda: refresh_job_service
+
+    response = client.get("/api/v1/vacancy/refresh-jobs/job-1")
+
+    assert response.status_code == 200
+    assert response.json()["state"] == "failed"
+    assert response.json()["status_code"] == 404
+
+    refresh_job_service.get_status.assert_called_once_with("job-1")
+
+
+# Тест массового импорта вакансий с HH.ru
+@pytest.mark.asyncio
+async def test_import_vacancies_from_hh(client, mock_user):
+    import_job_service = AsyncMock(spec=ImportJobService)
+    import_job_service.start_import.return_value = {
+        "job_id": "import-1",
+        "requested": 3,
+        "duplicates": 1,
+        "queued": 2
+    }
+
+    async def override_get_current_active_user():
+        return mock_user
+
+    app.dependency_overrides[get_current_active_user] = override_get_current_active_user
+    app.dependency_overrides[get_import_job_service] = lambda: import_job_service
+
+    response = client.post(
+        "/api/v1/vacancy/import-from-hh",
+        json={"hh_ids": ["1", "2", "3"]}
+    )
+
+    assert response.status_code == 202
+    assert response.json()["job_id"] == "import-1"
+    assert response.json()["queued"] == 2
+    assert response.json()["status_url"] == "/api/v1/vacancy/import-jobs/import-1"
+
+    import_job_service.start_import.assert_called_once_with(["1", "2", "3"])
+
+
+# Тест пакетных изменений вакансий: атомарный пакет с ошибкой не фиксируется
+@pytest.mark.asyncio
+async def test_bulk_vacancies_atomic_conflict(client, mock_user):
+    bulk_service = AsyncMock(spec=VacancyBulkService)
+    bulk_service.apply.return_value = {
+        "committed": False,
+        "results": [
+            {"operation": "update", "index": 0, "id": 1, "status": "rolled_back", "error": None},
+            {"operation": "delete", "index": 0, "id": 99, "status": "error", "error": "Вакансия с ID 99 не найдена"},
+        ]
+    }
+
+    async def override_get_current_active_user():
+        return mock_user
+
+    app.dependency_overrides[get_current_active_user] = override_get_current_active_user
+    app.dependency_overrides[get_vacancy_bulk_service] = lambda: bulk_service
+
+    response = client.post(
+        "/api/v1/vacancy/bulk",
+        json={"update": [{"id": 1, "title": "New title"}], "delete": [99]}
+    )
+
+    assert response.status_code == 409
+    response_data = response.json()
+    assert response_data["committed"] is False
+    assert [result["status"] for result in response_data["results"]] == ["rolled_back", "error"]
+
+    bulk_request = bulk_service.apply.call_args.args[0]
+    assert bulk_request.atomic is True
+    assert bulk_request.update[0].id == 1
+    assert bulk_request.delete == [99]
+
+
+# Тест получения прогресса импорта
+@pytest.mark.asyncio
+async def test_get_import_job_status(client, mock_user):
+    import_job_service = AsyncMock(spec=ImportJobService)
+    import_job_service.get_status.return_value = {
+        "job_id": "import-1",
+        "state": "completed",
+        "requested": 3,
+        "duplicates": 1,
+        "queued": 2,
+        "batches": 1,
+        "batches_done": 1,
+        "imported": 1,
+        "failed": 1,
+        "errors": {"3": "Vacancy 3 not found on HH.ru. Status: 404"}
+    }
+
+    async def override_get_current_active_user():
+        return mock_user
+
+    app.dependency_overrides[get_current_active_user] = override_get_current_active_user
+    app.dependency_overrides[get_import_job_service] = lambda: import_job_service
+
+    response = client.get("/api/v1/vacancy/import-jobs/import-1")
+
+    assert response.status_code == 200
+    assert response.json()["state"] == "completed"
+    assert response.json()["imported"] == 1
+    assert "3" in response.json()["errors"]
+
+    import_job_service.get_status.assert_called_once_with("import-1")
 
 
 # Тесты ошибок
@@ -280,4 +463,4 @@ async def test_get_vacancies_list(client, mock_user, mock_vacancy_service, mock_
     assert response.json()[0]["id"] == 1
     assert response.json()[0]["title"] == "Test Vacancy"
 
-    mock_vacancy_service.get_vacancies_list.assert_called_once_with(0, 100)
+    mock_vacancy_service.get_vacancies_list.assert_called_once_with(0, 100, VacancyListFilter(), SortOrder.ASC, None)
@@ -1,8 +1,11 @@
+from datetime import datetime, timezone
 import pytest
 from fastapi import HTTPException
 
 from app.main import app
 from app.api.deps import get_current_active_user, get_vacancy_service
+from app.schemas.vacancy import VacancyListFilter
+from app.utils.pagination import SortOrder, VacancySortKey
 
 
 # Тест успешного получения списка вакансий
@@ -25,7 +28,153 @@ async def test_list_vacancies_success(client, mock_user, mock_vacancy_service):
     assert len(response_data) == 1
     assert response_data[0]["title"] == "Test Vacancy"
 
-    mock_vacancy_service.get_vacancies_list.assert_called_once_with(0, 100)
+    mock_vacancy_service.get_vacancies_list.assert_called_once_with(0, 100, VacancyListFilter(), SortOrder.ASC, None)
+
+
+# Тест постраничного получения списка по курсору
+@pytest.mark.asyncio
+async def test_list_vacancies_cursor(client, mock_user, mock_vacancy_service, mock_vacancy):
+    mock_vacancy_service.get_vacancies_page.return_value = ([mock_vacancy], "next-token", "prev-token")
+
+    async def override_get_current_active_user():
+        return mock_user
+
+    async def override_get_vacancy_service():
+        return mock_vacancy_service
+
+    app.dependency_overrides[get_current_active_user] = override_get_current_active_user
+    app.dependency_overrides[get_vacancy_service] = override_get_vacancy_service
+
+    response = client.get("/api/v1/vacancies/list?sort=published_at&cursor=abc&limit=20")
+
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    assert response.headers["X-Next-Cursor"] == "next-token"
+    assert response.headers["X-Prev-Cursor"] == "prev-token"
+
+    mock_vacancy_service.get_vacancies_page.assert_called_once_with(
+        20, VacancySortKey.PUBLISHED_AT, "abc", VacancyListFilter(), SortOrder.DESC, None
+    )
+    mock_vacancy_service.get_vacancies_list.assert_not_called()
+
+
+# Тест фильтрации списка вакансий
+@pytest.mark.asyncio
+async def test_list_vacancies_filtered(client, mock_user, mock_vacancy_service):
+    async def override_get_current_active_user():
+        return mock_user
+
+    async def override_get_vacancy_service():
+        return mock_vacancy_service
+
+    app.dependency_overrides[get_current_active_user] = override_get_current_active_user
+    app.dependency_overrides[get_vacancy_service] = override_get_vacancy_service
+
+    response = client.get(
+        "/api/v1/vacancies/list",
+        params={
+            "status": "open",
+            "company_name": "Test Company",
+            "published_from": "2026-01-01T00:00:00+00:00",
+            "order": "desc"
+        }
+    )
+
+    assert response.status_code == 200
+
+    args = mock_vacancy_service.get_vacancies_list.call_args.args
+    assert args[2].dict(exclude_none=True) == {
+        "status": "open",
+        "company_name": "Test Company",
+        "published_from": datetime(2026, 1, 1, tzinfo=timezone.utc)
+    }
+    assert args[3] == SortOrder.DESC
+
+
+# Тест выбора полей списка вакансий
+@pytest.mark.asyncio
+async def test_list_vacancies_fields(client, mock_user, mock_vacancy_service):
+    mock_vacancy_service.get_vacancies_list.return_value = [{"id": 1, "title": "Test Vacancy"}]
+
+    async def override_get_current_active_user():
+        return mock_user
+
+    async def override_get_vacancy_service():
+        return mock_vacancy_service
+
+    app.dependency_overrides[get_current_active_user] = override_get_current_active_user
+    app.dependency_overrides[get_vacancy_service] = override_get_vacancy_service
+
+    response = client.get("/api/v1/vacancies/list", params={"fields": "title, id"})
+
+    assert response.status_code == 200
+    # Незапрошенные поля не попадают в ответ
+    assert response.json() == [{"id": 1, "title": "Test Vacancy"}]
+
+    mock_vacancy_service.get_vacancies_list.assert_called_once_with(
+        0, 100, VacancyListFilter(), SortOrder.ASC, ["title", "id"]
+    )
+
+
+# Тест полнотекстового поиска вакансий
+@pytest.mark.asyncio
+async def test_search_vacancies(client, mock_user, mock_vacancy_service, mock_vacancy):
+    mock_vacancy_service.search_vacancies.return_value = (
+        [{"vacancy": mock_vacancy, "rank": 0.6, "headline": "<mark>Test</mark> description"}],
+        "next-token"
+    )
+
+    async def override_get_current_active_user():
+        return mock_user
+
+    async def override_get_vacancy_service():
+        return mock_vacancy_service
+
+    app.dependency_overrides[get_current_active_user] = override_get_current_active_user
+    app.dependency_overrides[get_vacancy_service] = override_get_vacancy_service
+
+    response = client.get("/api/v1/vacancies/search", params={"q": "test", "limit": 10})
+
+    assert response.status_code == 200
+    response_data = response.json()
+    assert response_data[0]["vacancy"]["title"] == "Test Vacancy"
+    assert response_data[0]["rank"] == 0.6
+    assert response_data[0]["headline"] == "<mark>Test</mark> description"
+    assert response.headers["X-Next-Cursor"] == "next-token"
+
+    mock_vacancy_service.search_vacancies.assert_called_once_with("test", 10, None)
+
+
+# Тест пакетного получения вакансий по списку ID
+@pytest.mark.asyncio
+async def test_get_vacancies_batch(client, mock_user, mock_vacancy_service, mock_vacancy):
+    mock_vacancy_service.get_vacancies_batch.return_value = {"vacancies": [mock_vacancy], "missing": [7]}
+
+    async def override_get_current_active_user():
+        return mock_user
+
+    async def override_get_vacancy_service():
+        return mock_vacancy_service
+
+    app.dependency_overrides[get_current_active_user] = override_get_current_active_user
+    app.dependency_overrides[get_vacancy_service] = override_get_vacancy_service
+
+    response = client.get("/api/v1/vacancies/batch", params={"ids": "1,7"})
+
+    assert response.status_code == 200
+    response_data = response.json()
+    assert [vacancy["id"] for vacancy in response_data["vacancies"]] == [1]
+    assert response_data["missing"] == [7]
+    mock_vacancy_service.get_vacancies_batch.assert_called_once_with([1, 7])
+
+    response = client.post("/api/v1/vacancies/batch", json={"ids": [1, 7]})
+
+    assert response.status_code == 200
+    assert mock_vacancy_service.get_vacancies_batch.call_count == 2
+
+    response = client.get("/api/v1/vacancies/batch", params={"ids": "1,abc"})
+
+    assert response.status_code == 422
 
 
 # Тест получения пустого списка вакансий
@@ -49,7 +198,7 @@ async def test_list_vacancies_empty(client, mock_user, mock_vacancy_service):
     assert isinstance(response_data, list)
     assert len(response_data) == 0
 
-    mock_vacancy_service.get_vacancies_list.assert_called_once_with(0, 100)
+    mock_vacancy_service.get_vacancies_list.assert_called_once_with(0, 100, VacancyListFilter(), SortOrder.ASC, None)
 
 
 # Тесты ошибок
@@ -75,4 +224,4 @@ async def test_list_vacancies_service_error(client, mock_user, mock_vacancy_serv
     assert response.status_code == 500
     assert "Internal Server Error" in response.json()["detail"]
 
-    mock_vacancy_service.get_vacancies_list.assert_called_once_with(0, 100)
+    mock_vacancy_service.get_vacancies_list.assert_called_once_with(0, 100, VacancyListFilter(), SortOrder.ASC, None)
@@ -0,0 +1,21 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+@pytest.fixture
+def mock_session():
+    """ Асинхронная сессия, запоминающая выполненные запросы """
+    session = AsyncMock(spec=AsyncSession)
+    session.execute.return_value = MagicMock()
+    return session
+
+
+@pytest.fixture
+def compile_sql():
+    """ SQL запроса в диалекте PostgreSQL с подставленными параметрами, в одну строку """
+    def compile_statement(stmt) -> str:
+        sql = stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+        return " ".join(str(sql).split())
+    return compile_statement
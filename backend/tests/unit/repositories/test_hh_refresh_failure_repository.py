@@ -0,0 +1,52 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.repositories.hh_refresh_failure_repository import HHRefreshFailureRepository
+
+
+# Тест upsert ошибки обновления: счетчик попыток и отметка dead letter
+@pytest.mark.asyncio
+async def test_record_failure_statement(mock_session, compile_sql):
+    mock_session.execute.return_value.one.return_value = (3, False)
+
+    attempts, dead = await HHRefreshFailureRepository(mock_session).record_failure(
+        1, "10", "timeout", permanent=False, max_attempts=5
+    )
+
+    assert (attempts, dead) == (3, False)
+    sql = compile_sql(mock_session.execute.call_args.args[0])
+    assert "VALUES (1, '10', 1, 'timeout', NULL)" in sql
+    assert "ON CONFLICT (vacancy_id) DO UPDATE SET" in sql
+    # Параметры ON CONFLICT DO UPDATE не подставляются literal_binds
+    assert "attempts = (hh_refresh_failures.attempts + %(attempts_1)s)" in sql
+    assert "WHEN (hh_refresh_failures.dead_lettered_at IS NOT NULL) THEN hh_refresh_failures.dead_lettered_at " \
+           "WHEN (hh_refresh_failures.attempts + %(attempts_2)s >= %(param_1)s) THEN now() " \
+           "ELSE excluded.dead_lettered_at END" in sql
+    params = mock_session.execute.call_args.args[0].compile(dialect=postgresql.dialect()).params
+    assert (params["attempts_1"], params["attempts_2"], params["param_1"]) == (1, 1, 5)
+    assert sql.endswith("RETURNING hh_refresh_failures.attempts, hh_refresh_failures.dead_lettered_at IS NOT NULL AS anon_1")
+
+
+# Постоянная ошибка (вакансия удалена с hh.ru) сразу откладывается
+@pytest.mark.asyncio
+async def test_record_failure_permanent(mock_session, compile_sql):
+    mock_session.execute.return_value.one.return_value = (1, True)
+
+    assert await HHRefreshFailureRepository(mock_session).record_failure(
+        1, "10", "not found", permanent=True, max_attempts=5
+    ) == (1, True)
+    assert "VALUES (1, '10', 1, 'not found', now())" in compile_sql(mock_session.execute.call_args.args[0])
+
+
+# Тест снятия записей после успешного обновления
+@pytest.mark.asyncio
+async def test_clear(mock_session, compile_sql):
+    mock_session.execute.return_value.all.return_value = [(7,)]
+    repository = HHRefreshFailureRepository(mock_session)
+
+    assert await repository.clear([]) == 0
+    mock_session.execute.assert_not_awaited()
+
+    assert await repository.clear([1, 2]) == 1
+    assert "DELETE FROM hh_refresh_failures WHERE hh_refresh_failures.vacancy_id IN (1, 2)" \
+           in compile_sql(mock_session.execute.call_args.args[0])
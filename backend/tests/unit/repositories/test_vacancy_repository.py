@@ -0,0 +1,178 @@
+import pytest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from sqlalchemy.dialects import postgresql
+
+from app.db.models import Vacancy
+from app.repositories.vacancy_repository import VacancyRepository
+
+
+# Условие mark_outdated совпадает с предикатом частичного индекса, иначе PostgreSQL его не использует
+@pytest.mark.asyncio
+async def test_mark_outdated_matches_partial_index(mock_session, compile_sql):
+    mock_session.execute.return_value.all.return_value = [(1,), (2,)]
+
+    updated = await VacancyRepository(mock_session).mark_outdated(datetime(2025, 3, 1, tzinfo=timezone.utc))
+
+    assert updated == 2
+    sql = compile_sql(mock_session.execute.call_args.args[0])
+    index = next(index for index in Vacancy.__table__.indexes if index.name == "ix_vacancies_published_at_not_outdated")
+    predicate = str(index.dialect_options["postgresql"]["where"])
+    assert predicate == "hh_id IS NOT NULL AND status IS DISTINCT FROM 'outdated'"
+    assert "WHERE vacancies.hh_id IS NOT NULL AND vacancies.published_at < '2025-03-01 00:00:00+00:00' " \
+           "AND vacancies.status IS DISTINCT FROM 'outdated'" in sql
+    assert [column.name for column in index.columns] == ["published_at"]
+
+
+def make_row_data(hh_id: str, title: str = "Python Developer") -> dict:
+    return {"hh_id": hh_id, "title": title, "status": "active", "content_hash": f"hash-{hh_id}"}
+
+
+# Создание без обновления существующей: ON CONFLICT DO NOTHING, только запрошенные колонки
+@pytest.mark.asyncio
+async def test_upsert_create_only(mock_session, compile_sql):
+    mock_session.execute.return_value.first.return_value = None
+
+    vacancy = await VacancyRepository(mock_session).upsert(
+        make_row_data("123"), update_existing=False, columns=("id", "title")
+    )
+
+    assert vacancy is None
+    sql = compile_sql(mock_session.execute.call_args.args[0])
+    assert sql.endswith("ON CONFLICT (hh_id) DO NOTHING RETURNING vacancies.id, vacancies.title")
+    assert "search_vector" not in sql
+
+
+# Обновление существующей: строка перезаписывается только при изменившемся content_hash
+@pytest.mark.asyncio
+async def test_upsert_update_existing(mock_session, compile_sql):
+    mock_session.execute.return_value.first.return_value = ("row",)
+
+    assert await VacancyRepository(mock_session).upsert(make_row_data("123")) == ("row",)
+
+    sql = compile_sql(mock_session.execute.call_args.args[0])
+    assert "ON CONFLICT (hh_id) DO UPDATE SET updated_at = now(), status = excluded.status, " \
+           "title = excluded.title, content_hash = excluded.content_hash " \
+           "WHERE vacancies.content_hash IS DISTINCT FROM excluded.content_hash RETURNING vacancies.id" in sql
+    assert "hh_id = excluded.hh_id" not in sql
+
+
+# Пакетный upsert: одна версия на hh_id, признак создания из xmax
+@pytest.mark.asyncio
+async def test_bulk_upsert(mock_session, compile_sql):
+    mock_session.execute.return_value = [
+        SimpleNamespace(hh_id="1", inserted=True),
+        SimpleNamespace(hh_id="2", inserted=False),
+    ]
+    repository = VacancyRepository(mock_session)
+
+    assert await repository.bulk_upsert([]) == []
+    mock_session.execute.assert_not_awaited()
+
+    result = await repository.bulk_upsert([
+        make_row_data("1"), make_row_data("2", "Old"), make_row_data("2", "New"), make_row_data("3")
+    ])
+
+    assert result == [("1", True), ("2", False)]
+    stmt = mock_session.execute.call_args.args[0]
+    sql = compile_sql(stmt)
+    assert "'New'" in sql and "'Old'" not in sql
+    assert sql.count("'hash-") == 3
+    assert sql.endswith("RETURNING vacancies.hh_id, xmax = 0 AS inserted")
+
+
+# Пакетный upsert без обновления существующих
+@pytest.mark.asyncio
+async def test_bulk_upsert_create_only(mock_session, compile_sql):
+    mock_session.execute.return_value = [SimpleNamespace(hh_id="1", inserted=True)]
+
+    assert await VacancyRepository(mock_session).bulk_upsert([make_row_data("1")], update_existing=False) == [("1", True)]
+    assert "ON CONFLICT (hh_id) DO NOTHING" in compile_sql(mock_session.execute.call_args.args[0])
+
+
+# Обновление одним UPDATE ... RETURNING; skip_unchanged пропускает строку без изменений
+@pytest.mark.asyncio
+async def test_update(mock_session, compile_sql):
+    mock_session.execute.return_value.scalars.return_value.first.return_value = None
+    repository = VacancyRepository(mock_session)
+
+    assert await repository.update(1, {"title": "New", "status": None}, skip_unchanged=True, reset=("content_hash",)) is None
+
+    sql = compile_sql(mock_session.execute.call_args.args[0])
+    assert sql.startswith("UPDATE vacancies SET updated_at=")
+    assert "title='New', content_hash=NULL WHERE" in sql
+    assert "WHERE vacancies.id = 1 AND vacancies.title IS DISTINCT FROM 'New' RETURNING vacancies.id," in sql
+    assert "status" not in sql.split("RETURNING")[0]
+
+    # Переданное значение колонки из reset не сбрасывается
+    await repository.update(1, {"hh_id": "456", "hh_etag": '"v2"'}, reset=("content_hash", "hh_etag", "hh_last_modified"))
+    sql = compile_sql(mock_session.execute.call_args.args[0])
+    assert "hh_etag='\"v2\"'" in sql
+    assert "hh_last_modified=NULL" in sql and "content_hash=NULL" in sql
+
+    # Нет изменяемых полей - запрос не выполняется
+    mock_session.execute.reset_mock()
+    assert await repository.update(1, {"status": None}, skip_unchanged=True) is None
+    mock_session.execute.assert_not_awaited()
+
+
+# Удаление одним DELETE ... RETURNING: результат - была ли строка
+@pytest.mark.asyncio
+async def test_delete(mock_session, compile_sql):
+    repository = VacancyRepository(mock_session)
+
+    mock_session.execute.return_value.first.return_value = (1,)
+    assert await repository.delete(1) is True
+    assert compile_sql(mock_session.execute.call_args.args[0]) == \
+        "DELETE FROM vacancies WHERE vacancies.id = 1 RETURNING vacancies.id"
+
+    mock_session.execute.return_value.first.return_value = None
+    assert await repository.delete(2) is False
+
+
+# Пакетное обновление одним executemany, число строк - размер пакета
+@pytest.mark.asyncio
+async def test_bulk_update(mock_session):
+    repository = VacancyRepository(mock_session)
+
+    assert await repository.bulk_update([]) == 0
+    mock_session.execute.assert_not_awaited()
+
+    assert await repository.bulk_update([{"id": 1, "title": "A"}, {"id": 2, "title": "B"}]) == 2
+    stmt, params = mock_session.execute.call_args.args
+    assert stmt.is_dml and stmt.table.name == "vacancies"
+    assert [(row["id"], row["title"]) for row in params] == [(1, "A"), (2, "B")]
+    assert params[0]["updated_at"] == params[1]["updated_at"]
+
+
+# Пакетная запись расписания не меняет updated_at
+@pytest.mark.asyncio
+async def test_bulk_update_schedule(mock_session, compile_sql):
+    next_refresh_at = datetime(2025, 3, 15, 12, 0, tzinfo=timezone.utc)
+
+    assert await VacancyRepository(mock_session).bulk_update_schedule([{
+        "id": 1, "next_refresh_at": next_refresh_at, "unchanged_refreshes": 2, "hh_etag": '"v2"', "hh_last_modified": None
+    }]) == 1
+
+    stmt, params = mock_session.execute.call_args.args
+    assert "SET updated_at=vacancies.updated_at," in " ".join(
+        str(stmt.compile(dialect=postgresql.dialect())).split()
+    )
+    assert params == [{
+        "b_id": 1, "b_next_refresh_at": next_refresh_at, "b_unchanged_refreshes": 2,
+        "b_hh_etag": '"v2"', "b_hh_last_modified": None
+    }]
+
+
+# Пакетное удаление одним DELETE ... WHERE id = ANY, возвращаются удаленные ID
+@pytest.mark.asyncio
+async def test_bulk_delete(mock_session, compile_sql):
+    mock_session.execute.return_value.scalars.return_value.all.return_value = [1, 3]
+    repository = VacancyRepository(mock_session)
+
+    assert await repository.bulk_delete([]) == []
+    mock_session.execute.assert_not_awaited()
+
+    assert await repository.bulk_delete([1, 2, 3]) == [1, 3]
+    assert compile_sql(mock_session.execute.call_args.args[0]) == \
+        "DELETE FROM vacancies WHERE vacancies.id = ANY (ARRAY[1, 2, 3]) RETURNING vacancies.id"
@@ -0,0 +1,32 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.db.unit_of_work import UnitOfWork, UnitOfWorkFactory
+from app.repositories.hh_refresh_failure_repository import HHRefreshFailureRepository
+from app.repositories.vacancy_repository import VacancyRepository
+
+
+@pytest.fixture
+def repositories():
+    """ Моки репозиториев, общие для всех Unit of Work теста """
+    return {
+        VacancyRepository: AsyncMock(spec=VacancyRepository),
+        HHRefreshFailureRepository: AsyncMock(spec=HHRefreshFailureRepository),
+    }
+
+
+@pytest.fixture
+def mock_uow(repositories):
+    """ Unit of Work с моками репозиториев; ошибка внутри контекста не подавляется """
+    uow = MagicMock(spec=UnitOfWork)
+    uow.__aenter__ = AsyncMock(return_value=uow)
+    uow.__aexit__ = AsyncMock(return_value=False)
+    uow.get_repository.side_effect = lambda repository_class: repositories[repository_class]
+    return uow
+
+
+@pytest.fixture
+def mock_uow_factory(mock_uow):
+    factory = MagicMock(spec=UnitOfWorkFactory)
+    factory.create.return_value = mock_uow
+    return factory
@@ -0,0 +1,63 @@
+import pytest
+from fastapi import HTTPException
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from app.repositories.refresh_job_repository import RefreshJobRepository
+from app.services import refresh_job_service as refresh_job_module
+from app.services.refresh_job_service import RefreshJobService
+
+
+@pytest.fixture
+def result_backend(monkeypatch):
+    """ Бэкенд результатов taskiq без результата и прогресса """
+    backend = AsyncMock()
+    backend.get_progress.return_value = None
+    backend.is_result_ready.return_value = False
+    monkeypatch.setattr(refresh_job_module.broker, "result_backend", backend)
+    return backend
+
+
+@pytest.fixture
+def refresh_job_service(fake_redis, result_backend, monkeypatch):
+    kiq = AsyncMock(return_value=SimpleNamespace(task_id="job-1"))
+    monkeypatch.setattr(refresh_job_module.refresh_vacancy_job, "kiq", kiq)
+    return RefreshJobService(RefreshJobRepository(fake_redis))
+
+
+# Поставленная задача до начала выполнения - pending
+@pytest.mark.asyncio
+async def test_get_status_pending(refresh_job_service, fake_redis):
+    job_id = await refresh_job_service.enqueue(1, force=True)
+
+    assert job_id == "job-1"
+    assert await fake_redis.get("hh_refresh_job:job-1") == b"1"
+    assert await refresh_job_service.get_status(job_id) == {"job_id": "job-1", "state": "pending"}
+
+
+# Неизвестная задача - 404, а не вечный pending
+@pytest.mark.asyncio
+async def test_get_status_unknown_job(refresh_job_service, result_backend):
+    with pytest.raises(HTTPException) as exc_info:
+        await refresh_job_service.get_status("unknown")
+
+    assert exc_info.value.status_code == 404
+    result_backend.get_progress.assert_not_awaited()
+
+
+# Завершенная задача возвращает результат обновления
+@pytest.mark.asyncio
+async def test_get_status_success(refresh_job_service, result_backend):
+    await refresh_job_service.enqueue(1)
+    result_backend.get_progress.return_value = SimpleNamespace(meta={"vacancy_id": 1, "stage": "done"})
+    result_backend.is_result_ready.return_value = True
+    result_backend.get_result.return_value = SimpleNamespace(
+        is_err=False, return_value={"status": "success", "vacancy": {"id": 1}}
+    )
+
+    assert await refresh_job_service.get_status("job-1") == {
+        "job_id": "job-1",
+        "state": "success",
+        "progress": {"vacancy_id": 1, "stage": "done"},
+        "vacancy": {"id": 1},
+    }
@@ -0,0 +1,145 @@
+import pytest
+from unittest.mock import AsyncMock
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repositories.vacancy_cache_repository import VacancyCacheRepository
+from app.repositories.vacancy_repository import VacancyRepository
+from app.schemas.vacancy import VacancyBulkRequest, VacancyBulkUpdateItem, VacancyCreate
+from app.services.vacancy_bulk_service import VacancyBulkService
+
+
+class FakeSavepoint:
+    """ SAVEPOINT сессии: await - начало, async with - откат при исключении, иначе фиксация """
+    def __init__(self):
+        self.state = "open"
+
+    def __await__(self):
+        yield from []
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await (self.rollback() if exc_type else self.commit())
+        return False
+
+    async def commit(self):
+        self.state = "committed"
+
+    async def rollback(self):
+        self.state = "rolled_back"
+
+
+@pytest.fixture
+def savepoints(mock_uow):
+    """ Сессия Unit of Work с записью открытых SAVEPOINT; первый - весь пакет """
+    opened = []
+    session = AsyncMock(spec=AsyncSession)
+    session.begin_nested.side_effect = lambda: opened.append(FakeSavepoint()) or opened[-1]
+    mock_uow.session = session
+    mock_uow.savepoint.side_effect = lambda: session.begin_nested()
+    return opened
+
+
+@pytest.fixture
+def vacancy_repo(repositories):
+    vacancy_repo = repositories[VacancyRepository]
+    vacancy_repo.get_existing_hh_ids.return_value = set()
+    vacancy_repo.get_existing_ids.return_value = {1, 2}
+    vacancy_repo.bulk_delete.return_value = [1]
+    return vacancy_repo
+
+
+def make_create(title: str) -> VacancyCreate:
+    return VacancyCreate(
+        title=title,
+        company_name="Test Company",
+        company_address="Moscow",
+        company_logo="",
+        description="Python",
+        status="active"
+    )
+
+
+def integrity_error() -> IntegrityError:
+    return IntegrityError("INSERT INTO vacancies", {}, Exception("value too long"))
+
+
+def make_request(atomic: bool) -> VacancyBulkRequest:
+    return VacancyBulkRequest(
+        create=[make_create("A"), make_create("Bad"), make_create("C")],
+        update=[VacancyBulkUpdateItem(id=1, title="New")],
+        delete=[1],
+        atomic=atomic
+    )
+
+
+async def bulk_create(rows):
+    """ INSERT падает целиком, если в пакете есть ошибочная строка """
+    if any(row["title"] == "Bad" for row in rows):
+        raise integrity_error()
+    return [ord(row["title"]) for row in rows]
+
+
+# Ошибка одной операции повторяет группу по одной: остальные операции группы выполняются
+@pytest.mark.asyncio
+async def test_bad_item_does_not_fail_its_group(mock_uow, savepoints, vacancy_repo):
+    vacancy_repo.bulk_create.side_effect = bulk_create
+    cache = AsyncMock(spec=VacancyCacheRepository)
+
+    result = await VacancyBulkService(mock_uow, cache).apply(make_request(atomic=False))
+
+    assert result["committed"] is True
+    assert [(r["operation"], r["index"], r["id"], r["status"]) for r in result["results"]] == [
+        ("create", 0, ord("A"), "ok"),
+        ("create", 1, None, "error"),
+        ("create", 2, ord("C"), "ok"),
+        ("update", 0, 1, "ok"),
+        ("delete", 0, 1, "ok"),
+    ]
+    assert result["results"][1]["error"] == "value too long"
+    assert vacancy_repo.bulk_create.await_count == 4
+
+    # Пакет, группа create, по SAVEPOINT на каждую операцию, группы update и delete
+    batch, group, *items, update, delete = savepoints
+    assert [sp.state for sp in items] == ["committed", "rolled_back", "committed"]
+    assert (batch.state, group.state, update.state, delete.state) == ("committed", "rolled_back", "committed", "committed")
+    assert list(cache.invalidate.await_args.args[0]) == [1, 1]
+
+
+# atomic: при ошибке откатывается весь пакет, успешные операции помечаются rolled_back
+@pytest.mark.asyncio
+async def test_atomic_rolls_back_everything(mock_uow, savepoints, vacancy_repo):
+    vacancy_repo.bulk_create.side_effect = bulk_create
+    cache = AsyncMock(spec=VacancyCacheRepository)
+
+    result = await VacancyBulkService(mock_uow, cache).apply(make_request(atomic=True))
+
+    assert result["committed"] is False
+    assert [r["status"] for r in result["results"]] == ["rolled_back", "error", "rolled_back", "rolled_back", "rolled_back"]
+    assert savepoints[0].state == "rolled_back"
+    cache.invalidate.assert_not_awaited()
+
+
+# Ошибки проверки (не базы данных) не повторяют группу по одной: каждая группа - один вызов репозитория
+@pytest.mark.asyncio
+async def test_groups_run_in_single_calls(mock_uow, savepoints, vacancy_repo):
+    vacancy_repo.bulk_create.return_value = [10, 11]
+    request = VacancyBulkRequest(create=[make_create("A"), make_create("B")], update=[
+        VacancyBulkUpdateItem(id=1, title="New"), VacancyBulkUpdateItem(id=3, title="Missing")
+    ], atomic=False)
+
+    result = await VacancyBulkService(mock_uow).apply(request)
+
+    assert result["committed"] is True
+    assert [(r["id"], r["status"]) for r in result["results"]] == [
+        (10, "ok"), (11, "ok"), (1, "ok"), (3, "error")
+    ]
+    vacancy_repo.bulk_create.assert_awaited_once()
+    vacancy_repo.bulk_update.assert_awaited_once()
+    assert vacancy_repo.bulk_update.await_args.args[0] == [
+        {"id": 1, "title": "New", "content_hash": None, "hh_etag": None, "hh_last_modified": None}
+    ]
+    assert len(savepoints) == 3
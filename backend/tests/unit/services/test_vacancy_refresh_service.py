@@ -0,0 +1,318 @@
+import asyncio
+import pytest
+from dataclasses import replace
+from datetime import datetime, timezone, timedelta
+from types import SimpleNamespace
+from typing import Dict, Optional, Union
+
+from app.core.config import settings
+from app.exceptions.hh_exceptions import (
+    HHCircuitOpenError, HHRateLimitError, HHUnavailableError, HHVacancyNotFoundError
+)
+from app.repositories.hh_refresh_failure_repository import HHRefreshFailureRepository
+from app.repositories.vacancy_repository import VacancyRepository
+from app.schemas.vacancy import VacancyCreate
+from app.services.vacancy_refresh_service import RefreshStats, VacancyRefreshService
+from app.utils.content_hash import vacancy_content_hash
+from app.utils.hh_parser import HHVacancyResult
+
+
+def make_vacancy(hh_id: str, title: Optional[str] = None) -> VacancyCreate:
+    return VacancyCreate(
+        title=title or f"Vacancy {hh_id}",
+        company_name="Test Company",
+        company_address="Moscow",
+        company_logo="",
+        description="Python",
+        status="active",
+        hh_id=hh_id,
+        published_at=datetime(2025, 3, 15, 10, 0, tzinfo=timezone.utc)
+    )
+
+
+def make_row(vacancy_id: int, content_hash: Optional[str] = None) -> SimpleNamespace:
+    """ Строка порции VacancyRepository.get_hh_linked_chunk """
+    return SimpleNamespace(
+        id=vacancy_id,
+        hh_id=str(vacancy_id * 10),
+        hh_etag=None,
+        hh_last_modified=None,
+        content_hash=content_hash,
+        status="active",
+        published_at=datetime(2025, 3, 15, 10, 0, tzinfo=timezone.utc),
+        unchanged_refreshes=0
+    )
+
+
+class StubHHParser:
+    """ HHParser с заранее заданными ответами по hh_id и подсчетом одновременных запросов """
+    def __init__(self, responses: Dict[str, Union[HHVacancyResult, Exception]]):
+        self.responses = responses
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def is_available(self) -> bool:
+        return True
+
+    async def fetch_vacancy(self, vacancy_id, etag=None, last_modified=None, priority=None) -> HHVacancyResult:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.in_flight -= 1
+        response = self.responses[vacancy_id]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+class RecordingScheduler:
+    """ Планировщик повторов, запоминающий (vacancy_id, delay) """
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, vacancy_id: int, delay: int) -> None:
+        self.calls.append((vacancy_id, delay))
+
+
+# Тест параллельной загрузки пакета и записи одним executemany
+@pytest.mark.asyncio
+async def test_refresh_batch(mock_uow_factory, repositories):
+    unchanged = make_vacancy("30")
+    rows = [make_row(1), make_row(2), make_row(3, content_hash=vacancy_content_hash(unchanged)), make_row(4)]
+    repositories[VacancyRepository].get_hh_linked_chunk.return_value = rows
+    hh_parser = StubHHParser({
+        "10": HHVacancyResult(make_vacancy("10"), etag='"v2"'),
+        "20": HHVacancyResult(make_vacancy("20"), last_modified="Sat, 15 Mar 2025 10:00:00 GMT"),
+        "30": HHVacancyResult(unchanged),
+        "40": HHVacancyResult(None, etag='"v1"'),
+    })
+    service = VacancyRefreshService(mock_uow_factory, hh_parser, concurrency=2, batch_size=10)
+
+    stats = await service.refresh()
+
+    assert hh_parser.max_in_flight == 2
+    repositories[VacancyRepository].get_hh_linked_chunk.assert_awaited_once()
+    assert repositories[VacancyRepository].get_hh_linked_chunk.call_args.kwargs["after_id"] == 0
+
+    vacancy_repo = repositories[VacancyRepository]
+    vacancy_repo.bulk_update.assert_awaited_once()
+    written = vacancy_repo.bulk_update.call_args.args[0]
+    assert [row["id"] for row in written] == [1, 2]
+    assert written[0]["hh_etag"] == '"v2"'
+    assert written[0]["content_hash"] == vacancy_content_hash(make_vacancy("10"))
+    assert written[0]["unchanged_refreshes"] == 0
+
+    schedule = vacancy_repo.bulk_update_schedule.call_args.args[0]
+    assert [row["id"] for row in schedule] == [3, 4]
+    assert all(row["unchanged_refreshes"] == 1 for row in schedule)
+    # Валидаторы ответа сохраняются и без изменения содержимого
+    assert schedule[1]["hh_etag"] == '"v1"'
+
+    repositories[HHRefreshFailureRepository].clear.assert_awaited_once_with([1, 2, 3, 4])
+    assert (stats["total"], stats["changed"], stats["unchanged"], stats["failed"]) == (4, 2, 2, 0)
+
+
+# Тест постраничного чтения: следующая порция начинается после последнего id
+@pytest.mark.asyncio
+async def test_refresh_reads_chunks(mock_uow_factory, repositories):
+    repositories[VacancyRepository].get_hh_linked_chunk.side_effect = [[make_row(1), make_row(2)], [make_row(5)]]
+    hh_parser = StubHHParser({hh_id: HHVacancyResult(None) for hh_id in ("10", "20", "50")})
+    service = VacancyRefreshService(mock_uow_factory, hh_parser, concurrency=5, batch_size=2)
+
+    stats = await service.refresh(id_from=1, id_to=9)
+
+    calls = repositories[VacancyRepository].get_hh_linked_chunk.call_args_list
+    assert [(call.kwargs["after_id"], call.kwargs["id_to"]) for call in calls] == [(0, 9), (2, 9)]
+    # Порция читается и пакет пишется каждый в своей транзакции
+    assert mock_uow_factory.create.call_count == 4
+    assert stats["total"] == 3
+    assert stats["unchanged"] == 3
+
+
+# Тест записи по одной после ошибки пакетной записи
+@pytest.mark.asyncio
+async def test_refresh_batch_write_fallback(mock_uow_factory, repositories):
+    repositories[VacancyRepository].get_hh_linked_chunk.return_value = [make_row(1), make_row(2), make_row(3)]
+    hh_parser = StubHHParser({hh_id: HHVacancyResult(make_vacancy(hh_id)) for hh_id in ("10", "20", "30")})
+
+    async def bulk_update(rows):
+        if any(row["id"] == 2 for row in rows):
+            raise ValueError("value too long for type character varying(255)")
+
+    repositories[VacancyRepository].bulk_update.side_effect = bulk_update
+    repositories[HHRefreshFailureRepository].record_failure.return_value = (1, False)
+    retry_scheduler = RecordingScheduler()
+    service = VacancyRefreshService(
+        mock_uow_factory, hh_parser, concurrency=3, batch_size=10, retry_scheduler=retry_scheduler
+    )
+
+    stats = await service.refresh()
+
+    written = [call.args[0] for call in repositories[VacancyRepository].bulk_update.call_args_list]
+    assert [[row["id"] for row in rows] for rows in written] == [[1, 2, 3], [1], [2], [3]]
+
+    failure = repositories[HHRefreshFailureRepository].record_failure.call_args
+    assert failure.args[:2] == (2, "20")
+    assert failure.kwargs["permanent"] is False
+    assert retry_scheduler.calls == [(2, 60)]
+    assert (stats["total"], stats["changed"], stats["failed"], stats["retried"]) == (3, 2, 1, 1)
+
+
+# Тест учета ошибок загрузки: пропуск при разомкнутом выключателе, dead letter и повтор
+@pytest.mark.asyncio
+async def test_refresh_stats_accounting(mock_uow_factory, repositories):
+    repositories[VacancyRepository].get_hh_linked_chunk.return_value = [make_row(1), make_row(2), make_row(3)]
+    hh_parser = StubHHParser({
+        "10": HHCircuitOpenError(30),
+        "20": HHVacancyNotFoundError("Vacancy not found"),
+        "30": HHUnavailableError("timeout"),
+    })
+    repositories[HHRefreshFailureRepository].record_failure.side_effect = [(1, True), (1, False)]
+    retry_scheduler = RecordingScheduler()
+    service = VacancyRefreshService(
+        mock_uow_factory, hh_parser, concurrency=3, batch_size=10, retry_scheduler=retry_scheduler
+    )
+
+    stats = await service.refresh()
+
+    permanent = [call.kwargs["permanent"] for call in repositories[HHRefreshFailureRepository].record_failure.call_args_list]
+    assert permanent == [True, False]
+    repositories[VacancyRepository].bulk_update.assert_not_awaited()
+    assert [vacancy_id for vacancy_id, _ in retry_scheduler.calls] == [3]
+    assert stats["total"] == 3
+    assert stats["skipped"] == 1
+    assert stats["failed"] == 2
+    assert stats["dead_lettered"] == 1
+    assert stats["retried"] == 1
+    assert stats["changed"] == stats["unchanged"] == 0
+    assert stats["paused"] is False
+
+
+
+# Тест разбиения на шарды по границам id
+@pytest.mark.asyncio
+async def test_get_shards(mock_uow_factory, repositories):
+    repositories[VacancyRepository].get_hh_id_bounds.return_value = (1, 10)
+    service = VacancyRefreshService(mock_uow_factory, StubHHParser({}))
+
+    assert await service.get_shards(3) == [(1, 3), (4, 6), (7, 10)]
+    assert await service.get_shards(20) == [(id_, id_) for id_ in range(1, 11)]
+
+    repositories[VacancyRepository].get_hh_id_bounds.return_value = None
+    assert await service.get_shards(3) == []
+
+
+# Тест некорректного числа шардов
+@pytest.mark.asyncio
+async def test_get_shards_invalid_count(mock_uow_factory):
+    service = VacancyRefreshService(mock_uow_factory, StubHHParser({}))
+
+    with pytest.raises(ValueError):
+        await service.get_shards(0)
+
+
+# Тест сведения статистики шардов
+def test_merge_stats():
+    started_at = datetime(2025, 3, 15, 10, 0, tzinfo=timezone.utc)
+    first = RefreshStats(total=10, changed=4, unchanged=5, failed=1, retried=1).as_dict()
+    second = RefreshStats(total=6, changed=1, unchanged=2, skipped=3, dead_lettered=1, paused=True).as_dict()
+
+    stats = VacancyRefreshService.merge_stats([first, second], started_at, duration=8.0)
+
+    assert {key: stats[key] for key in (
+        "total", "changed", "unchanged", "failed", "skipped", "retried", "dead_lettered", "paused"
+    )} == {
+        "total": 16, "changed": 5, "unchanged": 7, "failed": 1,
+        "skipped": 3, "retried": 1, "dead_lettered": 1, "paused": True
+    }
+    assert stats["started_at"] == started_at.isoformat()
+    assert stats["duration_seconds"] == pytest.approx(8.0, abs=0.1)
+    assert stats["throughput_per_second"] == pytest.approx(2.0, abs=0.1)
+
+
+# Тест кривой задержки повтора: удвоение до HH_REFRESH_RETRY_BACKOFF_MAX, не меньше Retry-After
+@pytest.mark.parametrize("attempts, error, expected", [
+    (1, HHUnavailableError("timeout"), 60),
+    (2, HHUnavailableError("timeout"), 120),
+    (4, HHUnavailableError("timeout"), 480),
+    (6, HHUnavailableError("timeout"), 1920),
+    (7, HHUnavailableError("timeout"), 3600),
+    (12, HHUnavailableError("timeout"), 3600),
+    (1, HHRateLimitError(90.5), 91),
+    (3, HHRateLimitError(90.5), 240),
+    (1, HHRateLimitError(), 60),
+])
+def test_retry_delay(monkeypatch, attempts, error, expected):
+    monkeypatch.setattr(
+        "app.services.vacancy_refresh_service.settings",
+        replace(
+            settings,
+            HH_REFRESH_RETRY_BACKOFF_BASE=60,
+            HH_REFRESH_RETRY_BACKOFF_MAX=3600,
+            RABBITMQ_DELAYED_MESSAGE_EXCHANGE=True
+        )
+    )
+
+    assert VacancyRefreshService._retry_delay(attempts, error) == expected
+
+
+# Без плагина отложенных сообщений задержка повтора фиксированная
+@pytest.mark.parametrize("attempts, error", [
+    (1, HHUnavailableError("timeout")),
+    (4, HHUnavailableError("timeout")),
+    (3, HHRateLimitError(90.5)),
+])
+def test_retry_delay_fixed_without_delayed_exchange(monkeypatch, attempts, error):
+    monkeypatch.setattr(
+        "app.services.vacancy_refresh_service.settings",
+        replace(settings, HH_REFRESH_RETRY_BACKOFF_BASE=60, RABBITMQ_DELAYED_MESSAGE_EXCHANGE=False)
+    )
+
+    assert VacancyRefreshService._retry_delay(attempts, error) == 60
+
+
+# Тест регистрации ошибки (попытки, отложенное плановое обновление) и ее снятия после успеха
+@pytest.mark.asyncio
+async def test_refresh_failure_recorded_and_cleared(mock_uow_factory, repositories):
+    vacancy_repo, failure_repo = repositories[VacancyRepository], repositories[HHRefreshFailureRepository]
+    vacancy_repo.get_hh_linked_chunk.return_value = [make_row(1)]
+    failure_repo.record_failure.return_value = (2, False)
+    hh_parser = StubHHParser({"10": HHUnavailableError("timeout")})
+    retry_scheduler = RecordingScheduler()
+    service = VacancyRefreshService(mock_uow_factory, hh_parser, batch_size=10, retry_scheduler=retry_scheduler)
+
+    stats = await service.refresh()
+
+    failure_repo.record_failure.assert_awaited_once()
+    assert failure_repo.record_failure.call_args.args == (1, "10", "timeout")
+    assert failure_repo.record_failure.call_args.kwargs["max_attempts"] == settings.HH_REFRESH_RETRY_MAX_ATTEMPTS
+    delay = VacancyRefreshService._retry_delay(2, HHUnavailableError("timeout"))
+    assert retry_scheduler.calls == [(1, delay)]
+    schedule = vacancy_repo.bulk_update_schedule.call_args.args[0]
+    assert schedule[0]["next_refresh_at"] - datetime.fromisoformat(stats["started_at"]) >= timedelta(seconds=delay)
+    failure_repo.clear.assert_not_awaited()
+
+    # Успешное обновление снимает запись об ошибке
+    hh_parser.responses["10"] = HHVacancyResult(make_vacancy("10"))
+    await service.refresh()
+
+    failure_repo.clear.assert_awaited_once_with([1])
+
+
+# Тест перевода в dead letter: повтор не ставится, плановое обновление не назначается
+@pytest.mark.asyncio
+async def test_refresh_failure_dead_lettered(mock_uow_factory, repositories):
+    repositories[VacancyRepository].get_hh_linked_chunk.return_value = [make_row(1)]
+    repositories[HHRefreshFailureRepository].record_failure.return_value = (5, True)
+    retry_scheduler = RecordingScheduler()
+    service = VacancyRefreshService(
+        mock_uow_factory, StubHHParser({"10": HHUnavailableError("timeout")}), retry_scheduler=retry_scheduler
+    )
+
+    stats = await service.refresh()
+
+    assert retry_scheduler.calls == []
+    repositories[VacancyRepository].bulk_update_schedule.assert_not_awaited()
+    assert (stats["failed"], stats["dead_lettered"], stats["retried"]) == (1, 1, 0)
@@ -0,0 +1,102 @@
+import pytest
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from app.repositories.hh_refresh_failure_repository import HHRefreshFailureRepository
+from app.repositories.vacancy_cache_repository import VacancyCacheRepository
+from app.repositories.vacancy_repository import VacancyRepository
+from app.schemas.vacancy import VacancyCreate, VacancyUpdate
+from app.services.vacancy_service import VacancyService
+from app.utils.content_hash import vacancy_content_hash
+from app.utils.hh_parser import HHParser, HHVacancyResult
+
+
+def make_vacancy_data(title: str = "Python Developer") -> VacancyCreate:
+    return VacancyCreate(
+        title=title,
+        company_name="Test Company",
+        company_address="Moscow",
+        company_logo="",
+        description="Python",
+        status="active",
+        hh_id="123",
+        published_at=datetime(2025, 3, 15, 10, 0, tzinfo=timezone.utc)
+    )
+
+
+@pytest.fixture
+def stored_vacancy(repositories):
+    vacancy = SimpleNamespace(
+        id=1,
+        hh_id="123",
+        hh_etag='"v1"',
+        hh_last_modified=None,
+        content_hash=vacancy_content_hash(make_vacancy_data()),
+        status="active",
+        published_at=datetime(2025, 3, 15, 10, 0, tzinfo=timezone.utc),
+        unchanged_refreshes=1
+    )
+    repositories[VacancyRepository].get_by_id.return_value = vacancy
+    return vacancy
+
+
+@pytest.fixture
+def hh_parser():
+    return AsyncMock(spec=HHParser)
+
+
+# Ответ с тем же содержимым: пишутся только расписание и новые валидаторы
+@pytest.mark.asyncio
+@pytest.mark.parametrize("hh_result", [
+    HHVacancyResult(make_vacancy_data(), etag='"v2"', last_modified="Sat, 15 Mar 2025 10:00:00 GMT"),
+    HHVacancyResult(None, etag='"v2"', last_modified="Sat, 15 Mar 2025 10:00:00 GMT"),
+], ids=["same_content_hash", "not_modified"])
+async def test_refresh_vacancy_unchanged_saves_validators(mock_uow, repositories, stored_vacancy, hh_parser, hh_result):
+    hh_parser.fetch_vacancy.return_value = hh_result
+    cache = AsyncMock(spec=VacancyCacheRepository)
+
+    vacancy = await VacancyService(mock_uow, hh_parser, cache).refresh_vacancy_from_hh(1)
+
+    assert vacancy is stored_vacancy
+    hh_parser.fetch_vacancy.assert_awaited_once_with("123", '"v1"', None, use_cache=True)
+    repositories[VacancyRepository].update.assert_not_awaited()
+    schedule = repositories[VacancyRepository].bulk_update_schedule.call_args.args[0]
+    assert schedule[0]["id"] == 1
+    assert schedule[0]["unchanged_refreshes"] == 2
+    assert schedule[0]["hh_etag"] == '"v2"'
+    assert schedule[0]["hh_last_modified"] == "Sat, 15 Mar 2025 10:00:00 GMT"
+    repositories[HHRefreshFailureRepository].clear.assert_awaited_once_with([1])
+    cache.invalidate.assert_not_awaited()
+
+
+# Изменившееся содержимое записывается целиком, интервал сбрасывается; force - запрос без валидаторов
+@pytest.mark.asyncio
+async def test_refresh_vacancy_changed(mock_uow, repositories, stored_vacancy, hh_parser):
+    hh_parser.fetch_vacancy.return_value = HHVacancyResult(make_vacancy_data("Senior Python Developer"), etag='"v2"')
+    cache = AsyncMock(spec=VacancyCacheRepository)
+
+    await VacancyService(mock_uow, hh_parser, cache).refresh_vacancy_from_hh(1, force=True)
+
+    hh_parser.fetch_vacancy.assert_awaited_once_with("123", None, None, use_cache=False)
+    update_data = repositories[VacancyRepository].update.call_args.args[1]
+    assert update_data["title"] == "Senior Python Developer"
+    assert update_data["hh_etag"] == '"v2"'
+    assert update_data["unchanged_refreshes"] == 0
+    repositories[VacancyRepository].bulk_update_schedule.assert_not_awaited()
+    cache.invalidate.assert_awaited_once_with([1])
+
+
+# Ручное изменение сбрасывает content_hash и валидаторы: следующее обновление получит данные HH.ru полностью
+@pytest.mark.asyncio
+async def test_update_vacancy_resets_validators(mock_uow, repositories, stored_vacancy, hh_parser):
+    repositories[VacancyRepository].update.return_value = stored_vacancy
+    cache = AsyncMock(spec=VacancyCacheRepository)
+
+    await VacancyService(mock_uow, hh_parser, cache).update_vacancy(1, VacancyUpdate(title="Local title"))
+
+    repositories[VacancyRepository].update.assert_awaited_once_with(
+        1, {"title": "Local title"}, skip_unchanged=True, reset=("content_hash", "hh_etag", "hh_last_modified")
+    )
+    hh_parser.fetch_vacancy.assert_not_awaited()
+    cache.invalidate.assert_awaited_once_with([1])
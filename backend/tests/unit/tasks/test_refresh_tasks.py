@@ -0,0 +1,74 @@
+import pytest
+
+from app.core.redis_client import RedisClient
+from app.tasks import taskiq
+from app.utils.task_lock import TaskLock
+
+
+@pytest.fixture
+def redis_client(fake_redis, monkeypatch):
+    """ Общий клиент Redis задач подменяется на fakeredis """
+    monkeypatch.setattr(RedisClient, "_client", fake_redis)
+    return fake_redis
+
+
+class StubRefreshService:
+    def __init__(self, redis_client):
+        self._redis = redis_client
+        self.calls = []
+
+    async def refresh(self, id_from, id_to, due_only=False):
+        # Во время обновления блокировка шарда удерживается
+        self.calls.append((id_from, id_to, due_only, await self._redis.exists("task_lock:hh_refresh_shard:1-50")))
+        return {"total": 0}
+
+
+# Тест блокировки шарда на время обновления
+@pytest.mark.asyncio
+async def test_refresh_shard_holds_lock(redis_client, monkeypatch):
+    refresh_service = StubRefreshService(redis_client)
+
+    async def get_refresh_service():
+        return refresh_service
+
+    monkeypatch.setattr(taskiq, "get_refresh_service", get_refresh_service)
+
+    assert await taskiq.refresh_vacancies_shard.original_func(1, 50, True) == {"total": 0}
+    assert refresh_service.calls == [(1, 50, True, 1)]
+    assert not await redis_client.exists("task_lock:hh_refresh_shard:1-50")
+
+
+# Тест пропуска прогона, пока выполняются шарды предыдущего
+@pytest.mark.asyncio
+async def test_sharded_refresh_waits_for_previous_shards(redis_client, monkeypatch):
+    shard_lock = TaskLock("hh_refresh_shard:1-50", redis_client=redis_client)
+    assert await shard_lock.acquire()
+
+    async def get_refresh_service():
+        raise AssertionError("refresh must not start")
+
+    monkeypatch.setattr(taskiq, "get_refresh_service", get_refresh_service)
+    try:
+        result = await taskiq.run_sharded_refresh(due_only=True)
+    finally:
+        await shard_lock.release()
+
+    assert result == {"status": "skipped", "lock": "hh_refresh_shard"}
+
+
+# Шард, блокировку которого держит другой воркер, не обновляется повторно
+@pytest.mark.asyncio
+async def test_refresh_shard_skips_locked_shard(redis_client, monkeypatch):
+    shard_lock = TaskLock("hh_refresh_shard:1-50", redis_client=redis_client)
+    assert await shard_lock.acquire()
+
+    async def get_refresh_service():
+        raise AssertionError("refresh must not start")
+
+    monkeypatch.setattr(taskiq, "get_refresh_service", get_refresh_service)
+    try:
+        result = await taskiq.refresh_vacancies_shard.original_func(1, 50, True)
+    finally:
+        await shard_lock.release()
+
+    assert result == {"status": "skipped", "lock": "hh_refresh_shard:1-50"}
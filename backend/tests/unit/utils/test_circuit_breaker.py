@@ -0,0 +1,103 @@
+import pytest
+from dataclasses import replace
+from unittest.mock import MagicMock
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.core.config import settings
+from app.exceptions.hh_exceptions import HHCircuitOpenError, HHLocalRateLimitError, HHUnavailableError
+from app.utils.circuit_breaker import CircuitState, HHCircuitBreaker
+from app.utils.hh_parser import HHParser
+
+
+@pytest.fixture(autouse=True)
+def circuit_settings(monkeypatch):
+    """ Выключатель размыкается после 3 ошибок """
+    monkeypatch.setattr(
+        "app.utils.circuit_breaker.settings",
+        replace(settings, HH_CIRCUIT_FAILURE_THRESHOLD=3, HH_CIRCUIT_RESET_TIMEOUT=30, HH_CIRCUIT_PROBE_TIMEOUT=20)
+    )
+
+
+async def open_breaker(circuit_breaker: HHCircuitBreaker, fake_redis) -> None:
+    """ Размыкание выключателя и истечение HH_CIRCUIT_RESET_TIMEOUT """
+    for _ in range(3):
+        assert await circuit_breaker.before_call() is False
+        await circuit_breaker.record_failure(False)
+    await fake_redis.delete(HHCircuitBreaker.OPEN_KEY)
+
+
+# Тест переходов closed -> open -> half_open -> closed
+@pytest.mark.asyncio
+async def test_circuit_breaker_transitions(fake_redis):
+    circuit_breaker = HHCircuitBreaker(fake_redis)
+
+    for _ in range(2):
+        assert await circuit_breaker.before_call() is False
+        await circuit_breaker.record_failure(False)
+    assert (await circuit_breaker.get_state())["state"] == CircuitState.CLOSED
+
+    await circuit_breaker.record_failure(False)
+    state = await circuit_breaker.get_state()
+    assert state["state"] == CircuitState.OPEN
+    assert 29 < state["retry_after"] <= 30
+    with pytest.raises(HHCircuitOpenError):
+        await circuit_breaker.before_call()
+    assert await circuit_breaker.is_open() is True
+
+    # По истечении HH_CIRCUIT_RESET_TIMEOUT пропускается один пробный запрос
+    await fake_redis.delete(HHCircuitBreaker.OPEN_KEY)
+    assert (await circuit_breaker.get_state())["state"] == CircuitState.HALF_OPEN
+    assert await circuit_breaker.before_call() is True
+    with pytest.raises(HHCircuitOpenError):
+        await circuit_breaker.before_call()
+
+    await circuit_breaker.record_success(True)
+    assert await circuit_breaker.get_state() == {"state": CircuitState.CLOSED, "failures": 0, "retry_after": 0.0}
+    assert await circuit_breaker.before_call() is False
+
+
+# Ошибка пробного запроса снова размыкает выключатель
+@pytest.mark.asyncio
+async def test_circuit_breaker_probe_failure(fake_redis):
+    circuit_breaker = HHCircuitBreaker(fake_redis)
+    await open_breaker(circuit_breaker, fake_redis)
+
+    assert await circuit_breaker.before_call() is True
+    await circuit_breaker.record_failure(True)
+
+    assert (await circuit_breaker.get_state())["state"] == CircuitState.OPEN
+
+
+# Запрос, отклоненный локальным ограничителем, не замыкает выключатель и освобождает пробу
+@pytest.mark.asyncio
+async def test_guarded_local_rate_limit_releases_probe(fake_redis):
+    circuit_breaker = HHCircuitBreaker(fake_redis)
+    await open_breaker(circuit_breaker, fake_redis)
+    parser = HHParser(circuit_breaker=circuit_breaker)
+
+    async def rejected():
+        raise HHLocalRateLimitError(1.0)
+
+    with pytest.raises(HHLocalRateLimitError):
+        await parser._guarded(rejected)
+    assert (await circuit_breaker.get_state())["state"] == CircuitState.HALF_OPEN
+
+    # Следующий запрос становится пробным, его сбой размыкает выключатель
+    async def unavailable():
+        raise HHUnavailableError("timeout")
+
+    with pytest.raises(HHUnavailableError):
+        await parser._guarded(unavailable)
+    assert (await circuit_breaker.get_state())["state"] == CircuitState.OPEN
+
+
+# Недоступный Redis: запросы пропускаются, состояние не определено
+@pytest.mark.asyncio
+async def test_circuit_breaker_redis_unavailable():
+    redis_client = MagicMock()
+    redis_client.register_script.return_value = MagicMock(side_effect=RedisConnectionError("down"))
+    redis_client.pipeline.side_effect = RedisConnectionError("down")
+    circuit_breaker = HHCircuitBreaker(redis_client)
+
+    assert await circuit_breaker.before_call() is False
+    assert await circuit_breaker.get_state() is None
@@ -0,0 +1,41 @@
+from datetime import datetime, timezone
+
+from app.schemas.vacancy import VacancyCreate
+from app.utils.content_hash import vacancy_content_hash
+
+
+def make_vacancy(**overrides) -> VacancyCreate:
+    data = {
+        "title": "Python Developer",
+        "company_name": "Test Company",
+        "company_address": "Moscow",
+        "company_logo": "",
+        "description": "<p>Python</p>",
+        "status": "active",
+        "hh_id": "123",
+        "published_at": datetime(2025, 3, 15, 10, 0, tzinfo=timezone.utc),
+    }
+    return VacancyCreate(**{**data, **overrides})
+
+
+# Дайджест - SHA-256 в hex, одинаковый для одинакового содержимого
+def test_content_hash_stable():
+    content_hash = vacancy_content_hash(make_vacancy())
+
+    assert len(content_hash) == 64
+    assert content_hash == vacancy_content_hash(make_vacancy())
+
+
+# Пробелы по краям строк не меняют дайджест
+def test_content_hash_normalization():
+    assert vacancy_content_hash(make_vacancy(title="  Python Developer\n")) == vacancy_content_hash(make_vacancy())
+    assert vacancy_content_hash(make_vacancy(company_name="Test Company ")) == vacancy_content_hash(make_vacancy())
+
+
+# Любое изменение содержимого меняет дайджест
+def test_content_hash_changes():
+    base = vacancy_content_hash(make_vacancy())
+
+    assert vacancy_content_hash(make_vacancy(description="<p>Python, Django</p>")) != base
+    assert vacancy_content_hash(make_vacancy(status="archived")) != base
+    assert vacancy_content_hash(make_vacancy(published_at=None)) != base
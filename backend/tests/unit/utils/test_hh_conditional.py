@@ -0,0 +1,75 @@
+import pytest
+import pytest_asyncio
+from dataclasses import replace
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.core.config import settings
+from app.utils.hh_parser import HHParser
+
+
+VACANCY = {
+    "id": "123",
+    "name": "Python Developer",
+    "employer": {"name": "Test Company", "logo_urls": None},
+    "address": {"raw": "Moscow"},
+    "description": "<p>Python</p>",
+    "published_at": "2025-03-15T10:00:00+0300",
+}
+
+
+@pytest_asyncio.fixture
+async def hh_stub(monkeypatch):
+    """ Локальный API вакансий hh.ru с условными запросами по ETag """
+    requests = []
+
+    async def vacancy(request: web.Request) -> web.Response:
+        requests.append(dict(request.headers))
+        if request.headers.get("If-None-Match") == '"v2"':
+            return web.Response(status=304, headers={"ETag": '"v2"'})
+        return web.json_response(
+            VACANCY, headers={"ETag": '"v2"', "Last-Modified": "Sat, 15 Mar 2025 10:00:00 GMT"}
+        )
+
+    app = web.Application()
+    app.router.add_get("/vacancies/{vacancy_id}", vacancy)
+    server = TestServer(app, host="127.0.0.1")
+    await server.start_server()
+    monkeypatch.setattr("app.utils.hh_parser.settings", replace(settings, HH_API_URL=str(server.make_url("/vacancies/"))))
+    yield requests
+    await server.close()
+
+
+# Тест ответа 200: данные и валидаторы из заголовков
+@pytest.mark.asyncio
+async def test_fetch_vacancy_modified(hh_stub):
+    async with HHParser() as parser:
+        result = await parser.fetch_vacancy("123", etag='"v1"', last_modified="Fri, 14 Mar 2025 10:00:00 GMT")
+
+    assert not result.not_modified
+    assert result.vacancy.title == "Python Developer"
+    assert result.validators() == {"hh_etag": '"v2"', "hh_last_modified": "Sat, 15 Mar 2025 10:00:00 GMT"}
+    assert hh_stub[0]["If-None-Match"] == '"v1"'
+    assert hh_stub[0]["If-Modified-Since"] == "Fri, 14 Mar 2025 10:00:00 GMT"
+
+
+# Тест ответа 304: без данных, отсутствующий Last-Modified сохраняется из запроса
+@pytest.mark.asyncio
+async def test_fetch_vacancy_not_modified(hh_stub):
+    async with HHParser() as parser:
+        result = await parser.fetch_vacancy("123", etag='"v2"', last_modified="Sat, 15 Mar 2025 10:00:00 GMT")
+
+    assert result.not_modified
+    assert result.vacancy is None
+    assert result.validators() == {"hh_etag": '"v2"', "hh_last_modified": "Sat, 15 Mar 2025 10:00:00 GMT"}
+
+
+# Без валидаторов запрос безусловный
+@pytest.mark.asyncio
+async def test_fetch_vacancy_unconditional(hh_stub):
+    async with HHParser() as parser:
+        result = await parser.fetch_vacancy("123")
+
+    assert result.vacancy.hh_id == "123"
+    assert "If-None-Match" not in hh_stub[0]
+    assert "If-Modified-Since" not in hh_stub[0]
@@ -0,0 +1,119 @@
+import pytest
+import pytest_asyncio
+from dataclasses import replace
+from datetime import datetime, timezone
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.core.config import settings
+from app.utils import hh_parser
+from app.utils.hh_parser import HHParser
+
+
+def make_item(hh_id: int) -> dict:
+    return {
+        "id": str(hh_id),
+        "name": f"Vacancy {hh_id}",
+        "employer": {"name": "Test Company", "logo_urls": None},
+        "address": None,
+        "snippet": {"requirement": "Python", "responsibility": "Backend"},
+        "published_at": "2025-03-15T10:00:00+0300",
+    }
+
+
+@pytest_asyncio.fixture
+async def hh_stub(monkeypatch):
+    """ Локальный сервер поиска hh.ru: 5 вакансий по 2 на страницу """
+    requests = []
+
+    async def search(request: web.Request) -> web.Response:
+        requests.append(dict(request.query))
+        page, per_page = int(request.query["page"]), 2
+        items = [make_item(hh_id) for hh_id in range(1, 6)][page * per_page:(page + 1) * per_page]
+        return web.json_response({"items": items, "found": 5, "pages": 3, "page": page, "per_page": per_page})
+
+    app = web.Application()
+    app.router.add_get("/vacancies", search)
+    server = TestServer(app, host="127.0.0.1")
+    await server.start_server()
+    monkeypatch.setattr(
+        "app.utils.hh_parser.settings",
+        replace(settings, HH_SEARCH_URL=str(server.make_url("/vacancies")), HH_SEARCH_PER_PAGE=2)
+    )
+    yield requests
+    await server.close()
+
+
+# Тест постраничного обхода поиска hh.ru
+@pytest.mark.asyncio
+async def test_iter_search_pages(hh_stub):
+    date_from = datetime(2025, 3, 14, 12, 0, tzinfo=timezone.utc)
+
+    async with HHParser() as parser:
+        pages = [page async for page in parser.iter_search_pages({"text": "python"}, date_from=date_from)]
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert [vacancy.hh_id for page in pages for vacancy in page] == ["1", "2", "3", "4", "5"]
+    assert pages[0][0].description == "Python\nBackend"
+
+    # Параметры запроса и отметка date_from передаются в каждый запрос страницы
+    assert [request["page"] for request in hh_stub] == ["0", "1", "2"]
+    assert hh_stub[0]["text"] == "python"
+    assert hh_stub[0]["per_page"] == "2"
+    assert hh_stub[0]["date_from"] == "2025-03-14T12:00:00+0000"
+
+
+# Тест обхода выдачи глубже предела hh.ru окнами date_to
+@pytest.mark.asyncio
+async def test_iter_search_pages_depth_limit(monkeypatch):
+    published = {hh_id: datetime(2025, 3, 15, 10 - hh_id, 0, tzinfo=timezone.utc) for hh_id in range(1, 6)}
+    requests = []
+
+    async def search(request: web.Request) -> web.Response:
+        requests.append(dict(request.query))
+        page, per_page = int(request.query["page"]), 2
+        date_to = request.query.get("date_to")
+        items = [
+            {**make_item(hh_id), "published_at": published[hh_id].strftime("%Y-%m-%dT%H:%M:%S%z")}
+            for hh_id in range(1, 6)
+            if date_to is None or published[hh_id] <= datetime.strptime(date_to, "%Y-%m-%dT%H:%M:%S%z")
+        ]
+        pages = (len(items) + per_page - 1) // per_page
+        return web.json_response({
+            "items": items[page * per_page:(page + 1) * per_page],
+            "found": len(items), "pages": pages, "page": page, "per_page": per_page
+        })
+
+    app = web.Application()
+    app.router.add_get("/vacancies", search)
+    server = TestServer(app, host="127.0.0.1")
+    await server.start_server()
+    monkeypatch.setattr(
+        "app.utils.hh_parser.settings",
+        replace(
+            settings, HH_SEARCH_URL=str(server.make_url("/vacancies")), HH_SEARCH_PER_PAGE=2, HH_SEARCH_MAX_PAGES=1
+        )
+    )
+    try:
+        async with HHParser() as parser:
+            pages = [page async for page in parser.iter_search_pages({"text": "python"})]
+    finally:
+        await server.close()
+
+    # Каждое следующее окно начинается с самой старой вакансии предыдущего (повтор пропускается при вставке)
+    assert [[vacancy.hh_id for vacancy in page] for page in pages] == [["1", "2"], ["2", "3"], ["3", "4"], ["4", "5"]]
+    assert [request.get("date_to") for request in requests] == [
+        None, "2025-03-15T08:00:00+0000", "2025-03-15T07:00:00+0000", "2025-03-15T06:00:00+0000"
+    ]
+
+
+# Тест выключенного обхода при HH_SEARCH_MAX_PAGES <= 0
+@pytest.mark.asyncio
+async def test_iter_search_pages_disabled(hh_stub, monkeypatch):
+    monkeypatch.setattr("app.utils.hh_parser.settings", replace(hh_parser.settings, HH_SEARCH_MAX_PAGES=0))
+
+    async with HHParser() as parser:
+        pages = [page async for page in parser.iter_search_pages({"text": "python"})]
+
+    assert pages == []
+    assert hh_stub == []
@@ -0,0 +1,76 @@
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.repositories.hh_vacancy_cache_repository import HHVacancyCacheRepository
+from app.schemas.vacancy import VacancyCreate
+from app.utils.hh_parser import HHParser, HHVacancyResult
+
+
+def make_result(title: str = "Python Developer") -> HHVacancyResult:
+    vacancy = VacancyCreate(
+        title=title,
+        company_name="Test Company",
+        company_address="Moscow",
+        company_logo="",
+        description="Python",
+        status="active",
+        hh_id="123",
+        published_at=datetime(2025, 3, 15, 10, 0, tzinfo=timezone.utc)
+    )
+    return HHVacancyResult(vacancy, etag='"v1"', last_modified="Sat, 15 Mar 2025 10:00:00 GMT")
+
+
+@pytest.fixture
+def parser(fake_redis):
+    """ HHParser с кэшем в fakeredis; запрос к hh.ru подменен """
+    hh_parser = HHParser(cache=HHVacancyCacheRepository(fake_redis, ttl=60))
+    hh_parser._request_vacancy = AsyncMock(return_value=make_result())
+    return hh_parser
+
+
+# Тест ответа из кэша: повторный запрос к hh.ru не выполняется
+@pytest.mark.asyncio
+async def test_fetch_vacancy_cache_hit(parser, fake_redis):
+    first = await parser.fetch_vacancy("123")
+    second = await parser.fetch_vacancy("123")
+
+    parser._request_vacancy.assert_awaited_once()
+    assert second == first
+    assert 0 < await fake_redis.ttl("hh_vacancy:123") <= 60
+
+    # Закэшированная версия совпадает с валидатором клиента - результат без данных, как 304
+    not_modified = await parser.fetch_vacancy("123", etag='"v1"')
+    assert not_modified.not_modified
+    assert not_modified.etag == '"v1"'
+    parser._request_vacancy.assert_awaited_once()
+
+
+# Тест принудительного запроса (force): кэш не читается, но обновляется
+@pytest.mark.asyncio
+async def test_fetch_vacancy_force_bypasses_cache(parser):
+    await parser.fetch_vacancy("123")
+    parser._request_vacancy.return_value = make_result(title="Senior Python Developer")
+
+    result = await parser.fetch_vacancy("123", use_cache=False)
+
+    assert parser._request_vacancy.await_count == 2
+    assert result.vacancy.title == "Senior Python Developer"
+    assert (await parser.fetch_vacancy("123")).vacancy.title == "Senior Python Developer"
+    assert parser._request_vacancy.await_count == 2
+
+
+# Тест недоступного Redis: запрос идет в hh.ru
+@pytest.mark.asyncio
+async def test_fetch_vacancy_cache_unavailable():
+    redis_client = AsyncMock()
+    redis_client.get.side_effect = RedisConnectionError("down")
+    redis_client.setex.side_effect = RedisConnectionError("down")
+    parser = HHParser(cache=HHVacancyCacheRepository(redis_client, ttl=60))
+    parser._request_vacancy = AsyncMock(return_value=make_result())
+
+    result = await parser.fetch_vacancy("123")
+
+    assert result.vacancy.title == "Python Developer"
+    parser._request_vacancy.assert_awaited_once()
@@ -0,0 +1,94 @@
+import pytest
+from dataclasses import replace
+from unittest.mock import AsyncMock, MagicMock
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from app.core.config import settings
+from app.exceptions.hh_exceptions import HHRateLimitError
+from app.utils.rate_limiter import HHPriority, HHRateLimiter
+
+
+class WaitRequired(Exception):
+    """ Ограничитель попытался ждать токен """
+
+
+@pytest.fixture
+def limiter_settings(monkeypatch):
+    """ Бюджет 10 токенов, 1 токен/с, резерв интерактивных запросов - 3 токена """
+    test_settings = replace(
+        settings,
+        HH_RATE_LIMIT_PER_SECOND=1,
+        HH_RATE_LIMIT_BURST=10,
+        HH_RATE_LIMIT_INTERACTIVE_RESERVE=0.3,
+        HH_RATE_LIMIT_MAX_WAIT=1,
+        HH_RATE_LIMIT_BACKOFF_BASE=2,
+        HH_RATE_LIMIT_BACKOFF_MAX=5,
+    )
+    monkeypatch.setattr("app.utils.rate_limiter.settings", test_settings)
+
+    async def no_sleep(delay):
+        raise WaitRequired(delay)
+
+    monkeypatch.setattr("app.utils.rate_limiter.asyncio.sleep", no_sleep)
+    return test_settings
+
+
+# Фоновые запросы не занимают резерв интерактивных
+@pytest.mark.asyncio
+async def test_acquire_interactive_reserve(fake_redis, limiter_settings, monkeypatch):
+    limiter = HHRateLimiter(fake_redis)
+
+    for _ in range(7):
+        await limiter.acquire(HHPriority.BACKGROUND)
+    with pytest.raises(WaitRequired):
+        await limiter.acquire(HHPriority.BACKGROUND)
+
+    # Резерв из 3 токенов доступен интерактивным запросам без ожидания
+    for _ in range(3):
+        await limiter.acquire(HHPriority.INTERACTIVE)
+
+    # Бюджет исчерпан: ожидание дольше HH_RATE_LIMIT_MAX_WAIT - HHRateLimitError
+    monkeypatch.setattr(
+        "app.utils.rate_limiter.settings", replace(limiter_settings, HH_RATE_LIMIT_MAX_WAIT=0.1)
+    )
+    with pytest.raises(HHRateLimitError):
+        await limiter.acquire(HHPriority.INTERACTIVE)
+
+
+# Пауза после 429 действует на все запросы
+@pytest.mark.asyncio
+async def test_report_throttled_pauses_requests(fake_redis, limiter_settings):
+    limiter = HHRateLimiter(fake_redis)
+
+    assert await limiter.report_throttled(retry_after=3) == 3
+
+    with pytest.raises(HHRateLimitError) as exc_info:
+        await limiter.acquire(HHPriority.INTERACTIVE)
+    assert 2 < exc_info.value.retry_after <= 3
+
+    # Фоновый запрос ждет паузу, а не получает ошибку
+    with pytest.raises(WaitRequired):
+        await limiter.acquire(HHPriority.BACKGROUND)
+
+
+# Без Retry-After пауза растет экспоненциально до HH_RATE_LIMIT_BACKOFF_MAX
+@pytest.mark.asyncio
+async def test_report_throttled_backoff(fake_redis, limiter_settings):
+    limiter = HHRateLimiter(fake_redis)
+
+    assert [await limiter.report_throttled() for _ in range(3)] == [2, 4, 5]
+    assert 4000 < await fake_redis.pttl(HHRateLimiter.PAUSE_KEY) <= 5000
+
+
+# Недоступный Redis не блокирует запросы к hh.ru
+@pytest.mark.asyncio
+async def test_rate_limiter_fails_open(limiter_settings):
+    redis_client = MagicMock()
+    redis_client.register_script.return_value = AsyncMock(side_effect=RedisConnectionError("down"))
+    redis_client.incr = AsyncMock(side_effect=RedisConnectionError("down"))
+    limiter = HHRateLimiter(redis_client)
+
+    await limiter.acquire(HHPriority.INTERACTIVE)
+    await limiter.acquire(HHPriority.BACKGROUND)
+    assert await limiter.report_throttled(retry_after=7) == 7
+    assert await limiter.report_throttled() == limiter_settings.HH_RATE_LIMIT_BACKOFF_BASE
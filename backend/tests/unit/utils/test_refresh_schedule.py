@@ -0,0 +1,54 @@
+import pytest
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+from app.utils.refresh_schedule import next_refresh_at
+
+
+NOW = datetime(2025, 3, 15, 12, 0, tzinfo=timezone.utc)
+HOUR = 3600
+
+
+@pytest.fixture(autouse=True)
+def schedule_settings(monkeypatch):
+    monkeypatch.setattr("app.utils.refresh_schedule.settings", replace(
+        settings,
+        HH_REFRESH_INTERVAL_FRESH=HOUR,
+        HH_REFRESH_INTERVAL_ACTIVE=4 * HOUR,
+        HH_REFRESH_INTERVAL_OLD=12 * HOUR,
+        HH_REFRESH_INTERVAL_OUTDATED=7 * 24 * HOUR,
+        HH_REFRESH_INTERVAL_MAX=24 * HOUR,
+    ))
+
+
+# Базовый интервал по возрасту и статусу вакансии
+@pytest.mark.parametrize("status, published_at, expected", [
+    ("active", NOW - timedelta(hours=2), HOUR),
+    ("active", NOW - timedelta(days=3), 4 * HOUR),
+    ("active", None, 4 * HOUR),
+    ("active", NOW - timedelta(days=10), 12 * HOUR),
+    ("active", (NOW - timedelta(hours=2)).replace(tzinfo=None), HOUR),
+    ("outdated", NOW - timedelta(hours=2), 7 * 24 * HOUR),
+])
+def test_next_refresh_at_base_interval(status, published_at, expected):
+    assert next_refresh_at(NOW, status, published_at) == NOW + timedelta(seconds=expected)
+
+
+# Интервал удваивается за каждое обновление без изменений, не больше HH_REFRESH_INTERVAL_MAX
+@pytest.mark.parametrize("unchanged_refreshes, expected", [
+    (0, 4 * HOUR),
+    (1, 8 * HOUR),
+    (2, 16 * HOUR),
+    (3, 24 * HOUR),
+    (10, 24 * HOUR),
+])
+def test_next_refresh_at_backoff(unchanged_refreshes, expected):
+    published_at = NOW - timedelta(days=3)
+
+    assert next_refresh_at(NOW, "active", published_at, unchanged_refreshes) == NOW + timedelta(seconds=expected)
+
+
+# Базовый интервал больше HH_REFRESH_INTERVAL_MAX не сокращается
+def test_next_refresh_at_outdated_not_capped():
+    assert next_refresh_at(NOW, "outdated", None, 5) == NOW + timedelta(days=7)
@@ -0,0 +1,138 @@
+import asyncio
+import pytest
+from dataclasses import replace
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.utils.single_flight import SingleFlight
+
+
+@pytest.fixture(autouse=True)
+def single_flight_settings(monkeypatch):
+    monkeypatch.setattr(
+        "app.utils.single_flight.settings",
+        replace(settings, HH_SINGLE_FLIGHT_WAIT=2, HH_SINGLE_FLIGHT_POLL_INTERVAL=0.01)
+    )
+
+
+def make_single_flight(redis_client=None) -> SingleFlight[str]:
+    return SingleFlight("test", dumps=lambda value: value, loads=lambda data: data.decode(), redis_client=redis_client)
+
+
+class Call:
+    """ Вызов, завершающийся по сигналу, со счетчиком запусков """
+    def __init__(self, value: str):
+        self.value = value
+        self.calls = 0
+        self.started = asyncio.Event()
+        self.finish = asyncio.Event()
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        self.started.set()
+        await self.finish.wait()
+        return self.value
+
+
+# Тест объединения одновременных вызовов внутри процесса
+@pytest.mark.asyncio
+async def test_single_flight_in_process():
+    single_flight = make_single_flight()
+    call = Call("result")
+
+    waiters = [asyncio.ensure_future(single_flight.run("123", call)) for _ in range(5)]
+    await call.started.wait()
+    call.finish.set()
+
+    assert await asyncio.gather(*waiters) == ["result"] * 5
+    assert call.calls == 1
+
+    # После завершения следующий вызов выполняется заново
+    assert await single_flight.run("123", call) == "result"
+    assert call.calls == 2
+
+
+# Тест передачи результата лидера ведомому процессу через Redis
+@pytest.mark.asyncio
+async def test_single_flight_leader_follower(fake_redis):
+    leader, follower = make_single_flight(fake_redis), make_single_flight(fake_redis)
+    leader_call, follower_call = Call("from leader"), Call("from follower")
+    follower_call.finish.set()
+
+    leading = asyncio.ensure_future(leader.run("123", leader_call))
+    await leader_call.started.wait()
+    following = asyncio.ensure_future(follower.run("123", follower_call))
+    await asyncio.sleep(0.05)
+    leader_call.finish.set()
+
+    assert await leading == "from leader"
+    assert await following == "from leader"
+    assert follower_call.calls == 0
+    assert not await fake_redis.exists("single_flight:lock:test:123")
+
+
+# Ведомый не получает результат предыдущего лидера, пока текущий не закончил
+@pytest.mark.asyncio
+async def test_single_flight_ignores_previous_result(fake_redis):
+    first, second, follower = (make_single_flight(fake_redis) for _ in range(3))
+    stale = Call("stale")
+    stale.finish.set()
+    assert await first.run("123", stale) == "stale"
+
+    fresh = Call("fresh")
+    leading = asyncio.ensure_future(second.run("123", fresh))
+    await fresh.started.wait()
+    following = asyncio.ensure_future(follower.run("123", Call("own")))
+    await asyncio.sleep(0.05)
+    assert not following.done()
+    fresh.finish.set()
+
+    assert await leading == "fresh"
+    assert await following == "fresh"
+
+
+# Лидер завершился с ошибкой - ведомый выполняет вызов сам
+@pytest.mark.asyncio
+async def test_single_flight_leader_failure(fake_redis):
+    leader, follower = make_single_flight(fake_redis), make_single_flight(fake_redis)
+    started = asyncio.Event()
+    fail = asyncio.Event()
+
+    async def failing() -> str:
+        started.set()
+        await fail.wait()
+        raise RuntimeError("hh.ru is down")
+
+    own = Call("own")
+    own.finish.set()
+
+    leading = asyncio.ensure_future(leader.run("123", failing))
+    await started.wait()
+    following = asyncio.ensure_future(follower.run("123", own))
+    await asyncio.sleep(0.05)
+    fail.set()
+
+    with pytest.raises(RuntimeError):
+        await leading
+    assert await following == "own"
+    assert own.calls == 1
+
+
+# Ошибка Redis при публикации результата не ломает уже выполненный вызов лидера
+@pytest.mark.asyncio
+async def test_single_flight_publish_failure(fake_redis, monkeypatch):
+    single_flight = make_single_flight(fake_redis)
+    call = Call("result")
+    call.finish.set()
+
+    async def set_result(name, *args, **kwargs):
+        if name.startswith("single_flight:result:"):
+            raise RedisError("connection lost")
+        return await original_set(name, *args, **kwargs)
+
+    original_set = fake_redis.set
+    monkeypatch.setattr(fake_redis, "set", set_result)
+
+    assert await single_flight.run("123", call) == "result"
+    assert call.calls == 1
+    assert not await fake_redis.exists("single_flight:lock:test:123")
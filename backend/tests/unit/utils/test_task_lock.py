@@ -0,0 +1,98 @@
+import asyncio
+import pytest
+
+from app.core.redis_client import RedisClient
+from app.utils.task_lock import TaskLock, single_run
+
+
+@pytest.fixture
+def redis_client(fake_redis, monkeypatch):
+    """ Общий клиент Redis блокировок подменяется на fakeredis """
+    monkeypatch.setattr(RedisClient, "_client", fake_redis)
+    return fake_redis
+
+
+class Task:
+    """ Задача, завершающаяся по сигналу, со счетчиком запусков """
+    def __init__(self):
+        self.calls = 0
+        self.started = asyncio.Event()
+        self.finish = asyncio.Event()
+
+    async def __call__(self) -> dict:
+        self.calls += 1
+        self.started.set()
+        await self.finish.wait()
+        return {"status": "success", "run": self.calls}
+
+
+# Тест пропуска пересекающегося запуска
+@pytest.mark.asyncio
+async def test_single_run_skip(redis_client):
+    task = Task()
+    run = single_run("test_task")(task)
+
+    running = asyncio.ensure_future(run())
+    await task.started.wait()
+
+    assert await run() == {"status": "skipped", "lock": "test_task"}
+    task.finish.set()
+    assert await running == {"status": "success", "run": 1}
+    assert task.calls == 1
+    assert not await redis_client.exists("task_lock:test_task")
+
+
+# Тест объединения: пересекающиеся запуски выполняются одним повтором после текущего
+@pytest.mark.asyncio
+async def test_single_run_coalesce(redis_client):
+    task = Task()
+    run = single_run("test_task", coalesce=True)(task)
+
+    running = asyncio.ensure_future(run())
+    await task.started.wait()
+
+    assert await run() == {"status": "coalesced", "lock": "test_task"}
+    assert await run() == {"status": "coalesced", "lock": "test_task"}
+    task.finish.set()
+
+    assert await running == {"status": "success", "run": 2}
+    assert task.calls == 2
+    assert not await redis_client.exists("task_lock:test_task")
+    assert not await redis_client.exists("task_lock_pending:test_task")
+
+
+# Запрос повтора непосредственно перед снятием блокировки не теряется
+@pytest.mark.asyncio
+async def test_release_or_rerun(redis_client):
+    lock = TaskLock("test_task")
+    assert await lock.acquire()
+
+    assert await TaskLock("test_task").acquire_or_request_rerun() is False
+    assert await lock.release_or_rerun() is True
+    assert await redis_client.exists("task_lock:test_task")
+
+    assert await lock.release_or_rerun() is False
+    assert not await redis_client.exists("task_lock:test_task")
+    await lock.release()
+
+    # После снятия блокировки запрос повтора захватывает ее сам и выполняет задачу
+    next_lock = TaskLock("test_task")
+    assert await next_lock.acquire_or_request_rerun() is True
+    assert not await redis_client.exists("task_lock_pending:test_task")
+    await next_lock.release()
+
+
+# Запуск с coalesce после снятия блокировки текущим выполняет задачу сам, а не только запрашивает повтор
+@pytest.mark.asyncio
+async def test_single_run_coalesce_after_release(redis_client):
+    task = Task()
+    task.finish.set()
+    run = single_run("test_task", coalesce=True)(task)
+
+    lock = TaskLock("test_task")
+    assert await lock.acquire()
+    assert await lock.release_or_rerun() is False
+    await lock.release()
+
+    assert await run() == {"status": "success", "run": 1}
+    assert not await redis_client.exists("task_lock_pending:test_task")
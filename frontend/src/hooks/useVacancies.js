@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react';
 import { vacancyService } from '../services/api';
 
-export const useVacancies = () => {
+export const useVacancies = (filters = {}) => {
   const [vacancies, setVacancies] = useState([]);
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -9,8 +9,9 @@ export const useVacancies = () => {
   const loadVacancies = async () => {
     setIsLoading(true);
     try {
-      const data = await vacancyService.getAll();
-      setVacancies(data.sort((a, b) => new Date(a.created_at) - new Date(b.created_at)));
+      // Фильтрация и сортировка выполняются на сервере
+      const data = await vacancyService.getAll({ sort: 'created_at', order: 'asc', ...filters });
+      setVacancies(data);
       setError('');
     } catch (err) {
       setError('Failed to load vacancies. Please try again later.');
@@ -34,7 +35,7 @@ export const useVacancies = () => {
 
   useEffect(() => {
     loadVacancies();
-  }, []);
+  }, [JSON.stringify(filters)]);
 
   return {
     vacancies,
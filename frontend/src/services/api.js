@@ -78,8 +78,8 @@ export const authService = {
 
 // Сервис для работы с вакансиями
 export const vacancyService = {
-    getAll: async () => {
-        const response = await api.get('/api/v1/vacancies/list');
+    getAll: async (params = {}) => {
+        const response = await api.get('/api/v1/vacancies/list', { params });
         return response.data;
     },
 